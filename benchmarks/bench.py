@@ -0,0 +1,267 @@
+"""Benchmarks of route table build, match and path_for.
+
+Usage::
+
+    PYTHONPATH=src python benchmarks/bench.py -o results.json
+    PYTHONPATH=src python benchmarks/bench.py -b results.json
+    PYTHONPATH=src python benchmarks/bench.py -B -s 50000 -k mixed -n 0,10
+    PYTHONPATH=src python benchmarks/bench.py -s 1000 -R path,frozen,compact
+
+Results are written as JSON, every metric is a time in
+microseconds or memory in kilobytes, so less is better. Given a
+baseline, the metrics that got worse by more than tolerance are
+reported and exit status is 1.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import re
+import sys
+import timeit
+import tracemalloc
+
+from tables import KINDS, make_table
+
+from wheezy.routing import PathRouter
+from wheezy.routing.trie import TrieRouter
+
+MISS = "missing/path"
+
+
+def fused(router):
+    router.fuse()
+    return router
+
+
+# router backend => function that turns a built router into a matcher
+ROUTERS = {
+    "path": lambda router: router,
+    "fused": fused,
+    "trie": lambda router: router,
+    "frozen": PathRouter.freeze,
+    "compact": PathRouter.compact,
+    "generated": PathRouter.generate,
+}
+
+
+def timing(func, number=0, repeat=3):
+    """Returns the best time of a ``func`` call in microseconds.
+    ``number`` of calls per repeat is found automatically if 0.
+    """
+    t = timeit.Timer(func)
+    if not number:
+        number = t.autorange()[0]
+    return min(t.repeat(repeat, number)) / number * 1e6
+
+
+def build(routes, backend="path"):
+    # patterns compiled by previous builds must not be reused
+    re.purge()
+    router = backend == "trie" and TrieRouter() or PathRouter()
+    router.add_routes(routes)
+    return ROUTERS[backend](router)
+
+
+def memory(routes, backend="path"):
+    """Returns the size of a route table in kilobytes."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        router = build(routes, backend)  # noqa: F841
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return size / 1024.0
+
+
+def bench_table(
+    size,
+    kind="mixed",
+    nested=0,
+    number=0,
+    repeat=3,
+    build_only=False,
+    backend="path",
+):
+    """Returns a dict of metrics for the route table matched by
+    ``backend``, one of ``ROUTERS``.
+    """
+    routes, samples = make_table(size, kind, nested)
+    metrics = {
+        "build": timing(lambda: build(routes, backend), 1, repeat),
+        "memory": memory(routes, backend),
+    }
+    if build_only:
+        return metrics
+    router = build(routes, backend)
+    match = router.match
+    path_for = router.path_for
+    metrics["match_miss"] = timing(lambda: match(MISS), number, repeat)
+    positions = (("first", 0), ("middle", size // 2), ("last", size - 1))
+    for position, i in positions:
+        name, path, kwargs = samples[i]
+        assert match(path)[1]["route_name"] == name, path
+        metrics["match_" + position] = timing(
+            lambda path=path: match(path), number, repeat
+        )
+    samples = samples[:1000]
+    paths = [path for name, path, kwargs in samples]
+
+    def match_all():
+        for path in paths:
+            match(path)
+
+    metrics["match_all"] = timing(match_all, number, repeat) / len(paths)
+    metrics["match_many"] = timing(
+        lambda: list(router.match_many(paths)), number, repeat
+    ) / len(paths)
+
+    def path_for_all():
+        for name, _, kwargs in samples:
+            path_for(name, **kwargs)
+
+    path_for_all_time = timing(path_for_all, number, repeat)
+    metrics["path_for"] = path_for_all_time / len(samples)
+    return metrics
+
+
+def table_key(size, kind, nested, backend="path"):
+    """
+    >>> table_key(100, 'curly', 0)
+    'curly/100'
+    >>> table_key(100, 'mixed', 10)
+    'mixed/100/nested10'
+    >>> table_key(100, 'mixed', 10, 'frozen')
+    'mixed/100/nested10/frozen'
+    """
+    key = "%s/%d" % (kind, size)
+    if nested:
+        key += "/nested%d" % nested
+    if backend != "path":
+        key += "/" + backend
+    return key
+
+
+def run(
+    sizes,
+    kinds,
+    nesting,
+    number=0,
+    repeat=3,
+    out=None,
+    build_only=False,
+    backends=("path",),
+):
+    """Returns a dict with results of benchmarks for every
+    combination of table size, kind, nesting and router backend.
+    """
+    results = {}
+    for kind in kinds:
+        for nested in nesting:
+            for size in sizes:
+                for backend in backends:
+                    key = table_key(size, kind, nested, backend)
+                    metrics = bench_table(
+                        size, kind, nested, number, repeat, build_only, backend
+                    )
+                    results[key] = metrics
+                    if out:
+                        out.write(
+                            "%-36s %s\n" % (key, format_metrics(metrics))
+                        )
+    python = platform.python_implementation(), platform.python_version()
+    return {"python": " ".join(python), "results": results}
+
+
+def format_metrics(metrics):
+    """
+    >>> format_metrics({'match': 0.234, 'build': 10})
+    'build=10.00 match=0.23'
+    """
+    return " ".join(["%s=%.2f" % item for item in sorted(metrics.items())])
+
+
+def compare(results, baseline, tolerance=0.1):
+    """Returns a list of (key, metric, baseline, value) for
+    metrics that are worse than in baseline by more than
+    ``tolerance``.
+
+    >>> compare({'results': {'a': {'x': 1.2, 'y': 1.0}}},
+    ...         {'results': {'a': {'x': 1.0, 'y': 2.0}, 'b': {}}})
+    [('a', 'x', 1.0, 1.2)]
+    """
+    regressions = []
+    base_results = baseline["results"]
+    for key, metrics in sorted(results["results"].items()):
+        base_metrics = base_results.get(key)
+        if not base_metrics:
+            continue
+        for metric, value in sorted(metrics.items()):
+            base = base_metrics.get(metric)
+            if base is not None and value > base * (1.0 + tolerance):
+                regressions.append((key, metric, base, value))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "-s", "--sizes", default="10,100,1000,10000", help="table sizes"
+    )
+    parser.add_argument(
+        "-k",
+        "--kinds",
+        default=",".join(("mixed",) + KINDS),
+        help="route kinds",
+    )
+    parser.add_argument(
+        "-n", "--nested", default="0,10", help="routes per include"
+    )
+    parser.add_argument(
+        "-R",
+        "--routers",
+        default="path",
+        help="router backends: %s" % ", ".join(ROUTERS),
+    )
+    parser.add_argument(
+        "-N", "--number", type=int, default=0, help="calls per repeat"
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", help="write results to JSON file")
+    parser.add_argument("-b", "--baseline", help="compare with JSON file")
+    parser.add_argument("-t", "--tolerance", type=float, default=0.1)
+    parser.add_argument(
+        "-B", "--build", action="store_true", help="build and memory only"
+    )
+    args = parser.parse_args(argv)
+    results = run(
+        [int(s) for s in args.sizes.split(",")],
+        args.kinds.split(","),
+        [int(n) for n in args.nested.split(",")],
+        args.number,
+        args.repeat,
+        out=sys.stdout,
+        build_only=args.build,
+        backends=args.routers.split(","),
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for key, metric, base, value in regressions:
+            sys.stdout.write(
+                "%-36s %s: %.2f => %.2f (%+.0f%%)\n"
+                % (key, metric, base, value, (value / base - 1) * 100)
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Synthetic route tables."""
+
+KINDS = ("plain", "choice", "curly", "regex")
+
+
+def handler(environ, start_response):  # pragma: nocover
+    return []
+
+
+def make_route(kind, i):
+    """Returns a tupple of (pattern, path, kwargs) for route ``i``,
+    ``path`` matches the route and ``kwargs`` are used to build it.
+    """
+    if kind == "plain":
+        return "plain%d/page" % i, "plain%d/page" % i, {}
+    if kind == "choice":
+        return (
+            "choice%d/{locale:(en|ru|uk)}" % i,
+            "choice%d/uk" % i,
+            {"locale": "uk"},
+        )
+    if kind == "curly":
+        return (
+            "curly%d/{id:i}/{slug}" % i,
+            "curly%d/12/post" % i,
+            {"id": 12, "slug": "post"},
+        )
+    return (
+        "regex%d/(?P<year>\\d\\d\\d\\d)/(?P<month>\\d\\d)" % i,
+        "regex%d/2011/09" % i,
+        {"year": 2011, "month": "09"},
+    )
+
+
+def make_table(size, kind="mixed", nested=0):
+    """Returns a tupple of (routes, samples) for a route table
+    with ``size`` routes of ``kind`` (one of ``KINDS`` or ``mixed``).
+
+    If ``nested`` is positive, routes are grouped by that many into
+    sections included by a plain prefix.
+
+    ``samples`` is a list of (name, path, kwargs) in table order.
+
+    >>> routes, samples = make_table(4)
+    >>> [r[0] for r in routes] # doctest: +NORMALIZE_WHITESPACE
+    ['plain0/page', 'choice1/{locale:(en|ru|uk)}', 'curly2/{id:i}/{slug}',
+     'regex3/(?P<year>\\\\d\\\\d\\\\d\\\\d)/(?P<month>\\\\d\\\\d)']
+    >>> routes, samples = make_table(3, 'plain', nested=2)
+    >>> [r[0] for r in routes]
+    ['section0/', 'section1/']
+    >>> samples[2]
+    ('r2', 'section1/plain2/page', {})
+    """
+    routes = []
+    samples = []
+    for i in range(size):
+        k = kind == "mixed" and KINDS[i % len(KINDS)] or kind
+        pattern, path, kwargs = make_route(k, i)
+        name = "r%d" % i
+        routes.append((pattern, handler, None, name))
+        samples.append((name, path, kwargs))
+    if nested > 0:
+        sections = []
+        for i in range(0, size, nested):
+            prefix = "section%d/" % (i // nested)
+            end = i + nested
+            sections.append((prefix, routes[i:end]))
+            for j in range(i, min(end, size)):
+                name, path, kwargs = samples[j]
+                samples[j] = name, prefix + path, kwargs
+        routes = sections
+    return routes, samples
@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+import unittest
+
+
+class BenchTestCase(unittest.TestCase):
+    def test_run(self):
+        from bench import run
+
+        results = run([10], ["mixed"], [0, 3], number=1, repeat=1)
+        assert ["mixed/10", "mixed/10/nested3"] == sorted(results["results"])
+        metrics = results["results"]["mixed/10"]
+        assert {
+            "build",
+            "memory",
+            "match_first",
+            "match_middle",
+            "match_last",
+            "match_miss",
+            "match_all",
+            "match_many",
+            "path_for",
+        } == set(metrics)
+
+    def test_run_routers(self):
+        from bench import ROUTERS, run
+
+        results = run([10], ["mixed"], [3], 1, 1, backends=list(ROUTERS))
+        keys = ["mixed/10/nested3"] + [
+            "mixed/10/nested3/" + b for b in ROUTERS if b != "path"
+        ]
+        assert sorted(keys) == sorted(results["results"])
+
+    def test_run_build_only(self):
+        from bench import run
+
+        results = run([10], ["curly"], [0], 1, 1, build_only=True)
+        assert {"build", "memory"} == set(results["results"]["curly/10"])
+
+    def test_main_baseline(self):
+        from bench import main
+
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            argv = ["-s", "10", "-k", "plain", "-n", "0", "-N", "1", "-r", "1"]
+            assert 0 == main(argv + ["-o", path])
+            with open(path) as f:
+                baseline = json.load(f)
+            for metrics in baseline["results"].values():
+                for metric in metrics:
+                    metrics[metric] = 1e-6
+            with open(path, "w") as f:
+                json.dump(baseline, f)
+            assert 1 == main(argv + ["-b", path])
+        finally:
+            os.remove(path)
@@ -0,0 +1,73 @@
+from itertools import islice
+from os.path import commonprefix
+
+from wheezy.routing.cache import LRUCache
+from wheezy.routing.order import literal_prefix as regex_prefix, route_prefixes
+from wheezy.routing.regex import RegexRoute
+
+# regex pattern => literal prefix
+prefix_cache = LRUCache(1024)
+
+
+def literal_prefix(match):
+    """Returns a prefix of every path (from the match position) the
+    route of ``match`` can match, it is empty if not known.
+    """
+    route = getattr(match, "__self__", None)
+    if not isinstance(route, RegexRoute):
+        return commonprefix(route_prefixes(match))
+    pattern = route.regex.pattern
+    prefix = prefix_cache.get(pattern)
+    if prefix is None:
+        prefix = regex_prefix(pattern)
+        prefix_cache.put(pattern, prefix)
+    return prefix
+
+
+def next_prefix(prefix):
+    """Returns the least string that is greater than any string that
+    starts with ``prefix``.
+
+    >>> next_prefix('ab/')
+    'ab0'
+    """
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def match_each(match, paths, pos=0):
+    """Returns a dict of path to a tupple of (handler, kwargs) that
+    ``match`` finds for each path.
+    """
+    return {path: match(path, pos) for path in paths}
+
+
+def match_many(match_batch, paths, window=1024):
+    """Yields a tupple of (handler, kwargs) for each path of iterable
+    ``paths`` in order. Paths are read by ``window`` at a time, a
+    path repeated within a window is matched once by ``match_batch``,
+    the repeats get a copy of kwargs.
+
+    >>> from wheezy.routing import PathRouter
+    >>> r = PathRouter()
+    >>> r.add_routes([('posts/{id}', 'post')])
+    >>> [h for h, kwargs in match_many(r.match_batch, ['posts/1', 'x'])]
+    ['post', None]
+    """
+    assert window > 0
+    paths = iter(paths)
+    while True:
+        chunk = list(islice(paths, window))
+        if not chunk:
+            return
+        results = match_batch(dict.fromkeys(chunk))
+        if len(results) == len(chunk):
+            yield from map(results.__getitem__, chunk)
+            continue
+        seen = set()
+        for path in chunk:
+            if path in seen:
+                handler, kwargs = results[path]
+                yield handler, kwargs and kwargs.copy()
+            else:
+                seen.add(path)
+                yield results[path]
@@ -1,12 +1,101 @@
-def build_route(pattern, finishing, kwargs, name, route_builders):
+import re
+
+from wheezy.routing import config
+from wheezy.routing.choice import prefix_free
+from wheezy.routing.order import overlaps, route_prefixes
+from wheezy.routing.plain import PlainRoute
+from wheezy.routing.regex import RegexRoute, literals
+
+# a group per kind of pattern in order of default route builders:
+# plain, choice, curly and regex; mirrors the checks of builders
+RE_CLASSIFY = re.compile(
+    r"(?:\Z|[\w\./-]+$)()"
+    r"|[\w/]*(?:\{\w+:\([\w|]+\)\}[\w/]*)+$()"
+    r"|(?=(?s:.)*?\{[\w:]+.*?\})()"
+    r"|()"
+)
+
+KNOWN_ROUTE_BUILDERS = (
+    tuple(config.route_builders),
+    tuple(config.lazy_route_builders),
+)
+
+
+def classify(pattern):
+    """Returns an index of the default route builder for the
+    ``pattern`` found with a single regex match.
+
+    >>> [classify(p) for p in ('', 'a/b', '{locale:(en|ru)}/', '{id}', '.*')]
+    [0, 0, 1, 2, 3]
+    """
+    return RE_CLASSIFY.match(pattern).lastindex - 1
+
+
+def build_route(pattern, finishing, kwargs, name, route_builders, mapping=()):
     """Try to find suitable route builder to create a route.
     Raises ``LookupError`` if none found.
+
+    A string pattern for the default route builders is classified
+    once rather than tried by every builder in turn. ``mapping`` is
+    the route table the route is added to, see ``promote``.
     """
     if not finishing:
         assert not name
+    if (
+        isinstance(pattern, str)
+        and tuple(route_builders[:4]) in KNOWN_ROUTE_BUILDERS
+    ):
+        try_build_route = route_builders[classify(pattern)]
+        route = try_build_route(pattern, finishing, kwargs, name)
+        return promote(route, finishing, kwargs, name, mapping)
     for try_build_route in route_builders:
         route = try_build_route(pattern, finishing, kwargs, name)
         if route:
+            if isinstance(pattern, str):
+                route = promote(route, finishing, kwargs, name, mapping)
             return route
     else:
         raise LookupError("No matching route factory found")
+
+
+def promote(route, finishing, kwargs, name, mapping=()):
+    """Returns a plain route for a regex route that matches a single
+    literal path with no named groups, e.g. ``^about$``. A regex route
+    that matches a few literal paths, e.g. ``(?P<locale>en|ru)/home``,
+    gets them as exact matches. Otherwise the route is returned as is.
+
+    Exact paths are looked up before route table ``mapping``, so a
+    route is not promoted if a route of ``mapping`` can match one of
+    its paths, the route added first still wins.
+
+    >>> promote(RegexRoute(r'help\\.html'), True, None, 'help').pattern
+    'help.html'
+    >>> r = promote(RegexRoute('(?P<x>a|b)/', False), False, None, None)
+    >>> r.exact_matches
+    [('a/', {'x': 'a'}), ('b/', {'x': 'b'})]
+    >>> mapping = [(RegexRoute('(?P<x>\\\\w+)').match, 'x')]
+    >>> r = promote(RegexRoute('about'), True, None, 'a', mapping)
+    >>> r.__class__.__name__, r.exact_matches
+    ('RegexRoute', None)
+    """
+    if not isinstance(route, RegexRoute):
+        return route
+    pattern = route.regex.pattern
+    if finishing:
+        pattern = pattern[:-1]
+    paths = literals(pattern)
+    if not paths or not finishing and not prefix_free(paths):
+        return route
+    for match, _ in mapping:
+        if overlaps(paths, route_prefixes(match)):
+            return route
+    pairs = []
+    for path in paths:
+        matched, kw = route.match(path)
+        if matched != len(path):
+            return route
+        pairs.append((path, kw))
+    if len(paths) == 1 and "(?P<" not in pattern:
+        return PlainRoute(paths[0], finishing, kwargs, name)
+    route.exact_matches = route.literals = pairs
+    return route
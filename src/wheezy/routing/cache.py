@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache(object):
+    """Bounded mapping that evicts the least recently used item
+    once it holds more than ``size`` items. Counts hits, misses
+    and evictions.
+
+    Items and counters are guarded by a lock, so the cache can be
+    shared by threads.
+
+    >>> c = LRUCache(2)
+    >>> c.put('a', 1)
+    >>> c.put('b', 2)
+    >>> c.get('a')
+    1
+    >>> c.put('c', 3)
+    >>> c.get('b')
+    >>> c.hits, c.misses, c.evictions
+    (1, 1, 1)
+    """
+
+    __slots__ = ("size", "items", "hits", "misses", "evictions", "lock")
+
+    def __init__(self, size):
+        assert size > 0
+        self.size = size
+        self.items = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+        self.lock = Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key):
+        """Returns the value for ``key`` and marks it as recently
+        used or ``None`` if there is no such key.
+        """
+        items = self.items
+        with self.lock:
+            try:
+                value = items[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            items.move_to_end(key)
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Adds the ``value`` for ``key`` evicting the least
+        recently used item if the cache is full.
+        """
+        items = self.items
+        with self.lock:
+            items[key] = value
+            if len(items) > self.size:
+                items.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, predicate):
+        """Removes items for which ``predicate(key, value)`` is true,
+        counters are left as is.
+        """
+        items = self.items
+        with self.lock:
+            for key, value in list(items.items()):
+                if predicate(key, value):
+                    del items[key]
+
+    def clear(self):
+        """Removes all items, counters are left as is."""
+        with self.lock:
+            self.items.clear()
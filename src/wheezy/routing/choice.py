@@ -1,8 +1,13 @@
 import re
+from itertools import product
+from math import prod
 
-RE_CHOICE_ROUTE = re.compile(
-    r"^(?P<p>[\w/]*)" r"\{(?P<n>\w+):\((?P<c>[\w|]+)\)\}" r"(?P<s>[\w/]*)$"
-)
+RE_CHOICE_ROUTE = re.compile(r"^[\w/]*(?:\{\w+:\([\w|]+\)\}[\w/]*)+$")
+RE_CHOICE = re.compile(r"\{(\w+):\(([\w|]+)\)\}")
+
+# a route with more combinations of choices of several groups is
+# matched group by group rather than registered as exact paths
+max_choices = 256
 
 
 def try_build_choice_route(pattern, finishing=True, kwargs=None, name=None):
@@ -17,38 +22,246 @@ def try_build_choice_route(pattern, finishing=True, kwargs=None, name=None):
     return None
 
 
+def parse_choices(pattern):
+    """Returns a tupple of (texts, names, choices) of a choice
+    ``pattern``, literal texts surround choice groups.
+
+    >>> parse_choices('{locale:(en|de)}/{section:(news|blog)}/')
+    (['', '/', '/'], ['locale', 'section'], [['en', 'de'], ['news', 'blog']])
+    """
+    parts = RE_CHOICE.split(pattern)
+    return parts[::3], parts[1::3], [c.split("|") for c in parts[2::3]]
+
+
+def expandable(choices):
+    """Checks if ``choices`` of groups are expanded into exact paths,
+    a single group always is.
+
+    >>> expandable([['en', 'de'], ['news', 'blog']])
+    True
+    >>> expandable([['x'] * 20, ['y'] * 20])
+    False
+    """
+    return len(choices) == 1 or prod(map(len, choices)) <= max_choices
+
+
+def expand_choices(texts, names, choices, kwargs=None):
+    """Returns a list of (path, kwargs) for every combination of
+    ``choices`` in order.
+
+    >>> expand_choices(['', '/', ''], ['a', 'b'], [['x', 'y'], ['z']])
+    [('x/z', {'a': 'x', 'b': 'z'}), ('y/z', {'a': 'y', 'b': 'z'})]
+    """
+    kwargs = kwargs or {}
+    return [
+        (
+            "".join([t + c for t, c in zip(texts, values)]) + texts[-1],
+            dict(kwargs, **dict(zip(names, values))),
+        )
+        for values in product(*choices)
+    ]
+
+
 class ChoiceRoute(object):
     """Route based on choice match, e.g. {locale:(en|ru)}."""
 
-    __slots__ = ("kwargs", "name", "exact_matches", "patterns", "path_format")
+    __slots__ = (
+        "kwargs",
+        "names",
+        "finishing",
+        "exact_matches",
+        "patterns",
+        "path_format",
+        "choices",
+        "lengths",
+        "prefix",
+        "groups",
+        "match",
+    )
 
     def __init__(self, pattern, finishing=True, kwargs=None, name=None):
         kwargs = kwargs and kwargs.copy() or {}
         if name:
             kwargs["route_name"] = name
         self.kwargs = kwargs
-        m = RE_CHOICE_ROUTE.match(pattern)
-        prefix, self.name, choice, suffix = m.groups()
-        choices = choice.split("|")
-        self.exact_matches = [
-            (prefix + c + suffix, dict(kwargs, **{self.name: c}))
-            for c in choices
-        ]
+        self.finishing = finishing
+        texts, self.names, choices = parse_choices(pattern)
+        self.path_format = texts[0] + "".join(
+            ["%%(%s)s%s" % (n, t) for n, t in zip(self.names, texts[1:])]
+        )
+        self.exact_matches = self.patterns = None
+        self.choices = self.lengths = None
+        self.prefix = self.groups = None
+        # Choose match strategy
+        if not expandable(choices):
+            self.prefix = texts[0]
+            groups = zip(self.names, choices, texts[1:])
+            if separated(texts, finishing):
+                # a choice is the rest of path segment
+                self.groups = tuple(
+                    [(n, {c: c for c in cs}, t) for n, cs, t in groups]
+                )
+                self.match = self.segment_match
+            else:
+                self.groups = tuple([choice_group(*g) for g in groups])
+                self.match = self.groups_match
+            return
+        self.exact_matches = expand_choices(texts, self.names, choices, kwargs)
         self.patterns = [(p, (len(p), kw)) for p, kw in self.exact_matches]
-        self.path_format = prefix + "%s" + suffix
+        # a path can start with at most one of prefix-free patterns,
+        # so it is looked up by each length
+        self.choices = dict(reversed(self.patterns))
+        self.lengths = tuple(sorted({n for n, kw in self.choices.values()}))
+        if prefix_free(self.choices):
+            self.match = self.lookup_match
+        else:
+            self.match = self.scan_match
 
-    def match(self, path):
-        """If the ``path`` matches, return the end of
-        substring matched and kwargs. Otherwise
-        return ``(-1, None)``.
+    def lookup_match(self, path, pos=0):
+        """If the ``path`` at position ``pos`` starts with one of
+        patterns, return the end of substring matched and kwargs.
+        Otherwise return ``(-1, None)``. The cost does not depend
+        on the number of choices.
+        """
+        choices = self.choices
+        for n in self.lengths:
+            end = pos + n
+            result = choices.get(path[pos:end])
+            if result is not None:
+                if pos:
+                    return end, result[1]
+                return result
+        return (-1, None)
+
+    def scan_match(self, path, pos=0):
+        """If the ``path`` matches at position ``pos``, return
+        the end of substring matched and kwargs of the first
+        matching pattern. Otherwise return ``(-1, None)``.
         """
         for pattern, result in self.patterns:
-            if path.startswith(pattern):
+            if path.startswith(pattern, pos):
+                if pos:
+                    return pos + result[0], result[1]
                 return result
         return (-1, None)
 
+    def segment_match(self, path, pos=0):
+        """If the ``path`` matches at position ``pos`` segment by
+        segment, return the end of substring matched and kwargs.
+        Otherwise return ``(-1, None)``.
+        """
+        prefix = self.prefix
+        if not path.startswith(prefix, pos):
+            return (-1, None)
+        pos += len(prefix)
+        kwargs = self.kwargs.copy()
+        for name, choices, text in self.groups:
+            if text:
+                end = path.find("/", pos)
+                if end < 0 or not path.startswith(text, end):
+                    return (-1, None)
+            else:
+                end = len(path)
+            choice = choices.get(path[pos:end])
+            if choice is None:
+                return (-1, None)
+            kwargs[name] = choice
+            pos = end + len(text)
+        if self.finishing and pos != len(path):
+            return (-1, None)
+        return pos, kwargs
+
+    def groups_match(self, path, pos=0):
+        """If the ``path`` matches at position ``pos`` group by
+        group, return the end of substring matched and kwargs.
+        Otherwise return ``(-1, None)``.
+        """
+        if not path.startswith(self.prefix, pos):
+            return (-1, None)
+        kwargs = self.kwargs.copy()
+        pos += len(self.prefix)
+        end = match_groups(self.groups, 0, path, pos, kwargs, self.finishing)
+        if end < 0:
+            return (-1, None)
+        return end, kwargs
+
     def path(self, values=None):
         """Build the path for given route."""
-        if not values or self.name not in values:
-            values = self.kwargs
-        return self.path_format % values[self.name]
+        kwargs = self.kwargs
+        if values:
+            values = {
+                n: values[n] if n in values else kwargs[n] for n in self.names
+            }
+        else:
+            values = kwargs
+        return self.path_format % values
+
+
+def separated(texts, finishing):
+    """Checks if every choice group is followed by ``/``, the last one
+    may end the path of a finishing route.
+
+    >>> separated(['', '/', '/'], False), separated(['', '/', ''], True)
+    (True, True)
+    >>> separated(['', '', '/'], True), separated(['', '/', ''], False)
+    (False, False)
+    """
+    if not all(t.startswith("/") for t in texts[1:-1]):
+        return False
+    return texts[-1].startswith("/") or finishing and not texts[-1]
+
+
+def choice_group(name, choices, text):
+    """Returns a tupple of (name, keys, lookup, lengths) of a choice
+    group followed by literal ``text``. A key is a choice with the
+    text, ``lookup`` maps prefix-free keys to choices, otherwise it
+    is ``None`` and keys are tried in order.
+
+    >>> name, keys, lookup, lengths = choice_group('a', ['x', 'xy'], '/')
+    >>> keys, lookup['xy/'], lengths
+    ([('x/', 'x'), ('xy/', 'xy')], 'xy', (2, 3))
+    >>> choice_group('a', ['x', 'xy'], '')[2]
+    """
+    keys = [(c + text, c) for c in choices]
+    lookup = dict(reversed(keys))
+    lengths = tuple(sorted({len(k) for k in lookup}))
+    if not prefix_free(lookup):
+        lookup = None
+    return name, keys, lookup, lengths
+
+
+def match_groups(groups, i, path, pos, values, finishing):
+    """Returns the end of ``path`` matched by choice ``groups``
+    starting with ``i`` at position ``pos`` or -1. Choices are
+    tried in order and matched ones are set in ``values``.
+    """
+    if i == len(groups):
+        return -1 if finishing and pos != len(path) else pos
+    name, keys, lookup, lengths = groups[i]
+    if lookup is None:
+        candidates = [k for k in keys if path.startswith(k[0], pos)]
+    else:
+        ends = [pos + n for n in lengths]
+        candidates = [
+            (key, lookup[key])
+            for key in [path[pos:end] for end in ends]
+            if key in lookup
+        ]
+    for key, choice in candidates:
+        end = match_groups(
+            groups, i + 1, path, pos + len(key), values, finishing
+        )
+        if end >= 0:
+            values[name] = choice
+            return end
+    return -1
+
+
+def prefix_free(patterns):
+    """Checks if no pattern is a prefix of another one.
+
+    >>> prefix_free(['en/', 'ru/']), prefix_free(['a', 'ab'])
+    (True, False)
+    """
+    patterns = sorted(patterns)
+    return not any(b.startswith(a) for a, b in zip(patterns, patterns[1:]))
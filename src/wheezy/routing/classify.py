@@ -0,0 +1,333 @@
+"""Classifies request paths of an access log by route.
+
+Usage::
+
+    python -m wheezy.routing.classify myapp.urls:all_urls access.log.gz
+    python -m wheezy.routing.classify -j 8 -f -1 myapp.urls.router *.log
+
+Routes are given by a dotted name of a list of routes or a router.
+Logs are plain or gzip files (``-`` is stdin) in common or combined
+log format, or a path per line. Lines are read in chunks classified by
+a pool of ``jobs`` processes, at most two chunks per process are in
+flight, so memory stays bounded. Reported per route: requests, share
+of requests, cumulative share and percentiles of a value, that is the
+response size or a numeric ``field`` of the line, e.g. request time.
+"""
+
+import argparse
+import gzip
+import json
+import re
+import sys
+from collections import deque
+from itertools import islice
+from math import floor, log
+from multiprocessing import Pool, cpu_count
+
+from wheezy.routing.lazy import import_name
+from wheezy.routing.router import PathRouter
+from wheezy.routing.utils import route_name
+
+RE_REQUEST = re.compile(
+    r'"[A-Z]+ (?P<path>[^ ?"]*)[^"]*" \d{3} (?P<size>\d+|-)'
+)
+
+# percentiles are found within a bucket of histogram, each bucket
+# is by that factor wider than the previous one
+BASE = 1.1
+NO_MATCH = "-"
+PERCENTILES = (50, 90, 99)
+
+# a tupple of (router, strip, field) of a worker process
+state = None
+
+
+def load_router(name):
+    """Returns a router by dotted ``name`` of a list of routes or
+    a router.
+    """
+    routes = import_name(name)
+    if hasattr(routes, "match"):
+        return routes
+    router = PathRouter()
+    router.add_routes(routes)
+    return router
+
+
+def parse_line(line, field=None):
+    """Returns a tupple of (path, value) of a log line or ``None``.
+    The value is the response size or a numeric ``field`` of the
+    line split by whitespace, ``None`` if there is no such value.
+
+    >>> parse_line('::1 - - [08/Mar/2019:10:00:00 +0000] '
+    ...            '"GET /posts/1?page=2 HTTP/1.1" 200 512 "-" "-" 0.003')
+    ('/posts/1', 512)
+    >>> parse_line('/posts/1 0.003', field=-1)
+    ('/posts/1', 0.003)
+    >>> parse_line('')
+    """
+    m = RE_REQUEST.search(line)
+    if m is not None:
+        path, size = m.group("path", "size")
+    else:
+        parts = line.split(None, 1)
+        if not parts:
+            return None
+        path = parts[0].split("?", 1)[0]
+        size = "-"
+    if field is None:
+        return path, None if size == "-" else int(size)
+    try:
+        return path, float(line.split()[field])
+    except (IndexError, ValueError):
+        return path, None
+
+
+def bucket(value):
+    """Returns the index of histogram bucket for ``value``.
+
+    >>> bucket(0), bucket(1), bucket(100)
+    (None, 0, 48)
+    """
+    if value <= 0:
+        return None
+    return int(floor(log(value, BASE)))
+
+
+def bucket_value(index):
+    """Returns the middle of histogram bucket at ``index``."""
+    if index is None:
+        return 0
+    return BASE**index * (1 + BASE) / 2
+
+
+class Summary(object):
+    """Requests counted by route name, each with a histogram of
+    values. The number of histogram buckets grows with the logarithm
+    of the value range, so the memory is bounded by routes.
+    """
+
+    __slots__ = ("routes", "skipped")
+
+    def __init__(self):
+        self.routes = {}
+        self.skipped = 0
+
+    def add(self, name, value=None):
+        """Counts a request of route ``name``."""
+        routes = self.routes
+        if name in routes:
+            route = routes[name]
+        else:
+            route = routes[name] = [0, {}]
+        route[0] += 1
+        if value is not None:
+            buckets = route[1]
+            i = bucket(value)
+            buckets[i] = buckets.get(i, 0) + 1
+
+    def update(self, other):
+        """Adds counts of ``other`` summary."""
+        self.skipped += other.skipped
+        routes = self.routes
+        for name, (count, buckets) in other.routes.items():
+            if name not in routes:
+                routes[name] = [count, buckets]
+                continue
+            route = routes[name]
+            route[0] += count
+            merged = route[1]
+            for i, n in buckets.items():
+                merged[i] = merged.get(i, 0) + n
+
+    def report(self, percentiles=PERCENTILES):
+        """Returns a list of dicts, one per route, by requests in
+        descending order.
+        """
+        total = sum(count for count, buckets in self.routes.values())
+        rows = []
+        cumulative = 0
+        for name, (count, buckets) in sorted(
+            self.routes.items(), key=lambda item: (-item[1][0], item[0])
+        ):
+            cumulative += count
+            row = {
+                "route": name,
+                "requests": count,
+                "share": count * 100.0 / total,
+                "cumulative": cumulative * 100.0 / total,
+            }
+            for p in percentiles:
+                row["p%g" % p] = percentile(buckets, p)
+            rows.append(row)
+        return rows
+
+
+def percentile(buckets, p):
+    """Returns ``p`` percentile of values in histogram ``buckets`` or
+    ``None`` if it is empty. The value is the middle of a bucket,
+    within 5% of the actual one.
+
+    >>> h = {bucket(10): 9, bucket(100): 1}
+    >>> [round(percentile(h, p)) for p in (50, 99)]
+    [10, 102]
+    """
+    total = sum(buckets.values())
+    if not total:
+        return None
+    rank = total * p / 100.0
+    seen = 0
+    for i in sorted(buckets, key=lambda i: -1 if i is None else i):
+        seen += buckets[i]
+        if seen >= rank:
+            break
+    return bucket_value(i)
+
+
+def init_worker(routes, strip="/", field=None):
+    """Loads the router of the current process."""
+    global state
+    state = load_router(routes), strip, field
+
+
+def classify_lines(lines):
+    """Returns a summary of log ``lines`` by route."""
+    router, strip, field = state
+    summary = Summary()
+    paths = []
+    values = []
+    for line in lines:
+        parsed = parse_line(line, field)
+        if parsed is None:
+            summary.skipped += 1
+            continue
+        path, value = parsed
+        paths.append(path.lstrip(strip))
+        values.append(value)
+    if hasattr(router, "match_many"):
+        matches = router.match_many(paths)
+    else:
+        matches = map(router.match, paths)
+    for (handler, kwargs), value in zip(matches, values):
+        if handler is None:
+            name = NO_MATCH
+        else:
+            name = kwargs and kwargs.get("route_name") or route_name(handler)
+        summary.add(name, value)
+    return summary
+
+
+def read_lines(filenames):
+    """Yields lines of plain or gzip files, ``-`` is stdin."""
+    for filename in filenames:
+        if filename == "-":
+            yield from sys.stdin
+            continue
+        with open(filename, "rb") as f:
+            gzipped = f.read(2) == b"\x1f\x8b"
+        opener = gzipped and gzip.open or open
+        with opener(filename, "rt", encoding="utf-8", errors="replace") as f:
+            yield from f
+
+
+def classify(
+    routes, filenames, jobs=1, chunk_size=10000, strip="/", field=None
+):
+    """Returns a summary of log files by route. Chunks of
+    ``chunk_size`` lines are classified by a pool of ``jobs``
+    processes or by the current one if ``jobs`` is 1.
+    """
+    lines = read_lines(filenames)
+    chunks = iter(lambda: list(islice(lines, chunk_size)), [])
+    summary = Summary()
+    if jobs <= 1:
+        init_worker(routes, strip, field)
+        for chunk in chunks:
+            summary.update(classify_lines(chunk))
+        return summary
+    with Pool(jobs, init_worker, (routes, strip, field)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(classify_lines, (chunk,)))
+            if len(pending) >= jobs * 2:
+                summary.update(pending.popleft().get())
+        while pending:
+            summary.update(pending.popleft().get())
+    return summary
+
+
+def format_report(rows, percentiles=PERCENTILES):
+    """Returns lines of a text table with the report ``rows``.
+
+    >>> s = Summary()
+    >>> s.add('posts', 0.5)
+    >>> for line in format_report(s.report(), [50]):
+    ...     print(line)
+    route                                requests   share   cumul        p50
+    posts                                       1  100.0%  100.0%     0.4898
+    """
+    columns = ["p%g" % p for p in percentiles]
+    lines = [
+        "%-32s %12s %7s %7s" % ("route", "requests", "share", "cumul")
+        + "".join(" %10s" % c for c in columns)
+    ]
+    for row in rows:
+        lines.append(
+            "%-32s %12d %6.1f%% %6.1f%%"
+            % (row["route"], row["requests"], row["share"], row["cumulative"])
+            + "".join(
+                " %10s" % ("-" if row[c] is None else "%.4g" % row[c])
+                for c in columns
+            )
+        )
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "routes", help="dotted name of routes, e.g. myapp.urls:all_urls"
+    )
+    parser.add_argument("logs", nargs="+", help="log files, - for stdin")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=cpu_count(), help="processes"
+    )
+    parser.add_argument(
+        "-c", "--chunk-size", type=int, default=10000, help="lines per task"
+    )
+    parser.add_argument(
+        "-s", "--strip", default="/", help="characters to strip from path"
+    )
+    parser.add_argument(
+        "-f", "--field", type=int, help="index of the value field"
+    )
+    parser.add_argument("-p", "--percentiles", default="50,90,99")
+    parser.add_argument("--json", action="store_true", help="JSON output")
+    args = parser.parse_args(argv)
+    percentiles = [float(p) for p in args.percentiles.split(",")]
+    summary = classify(
+        args.routes,
+        args.logs,
+        args.jobs,
+        args.chunk_size,
+        args.strip,
+        args.field,
+    )
+    rows = summary.report(percentiles)
+    if args.json:
+        json.dump(
+            {"routes": rows, "skipped": summary.skipped},
+            sys.stdout,
+            indent=2,
+        )
+        sys.stdout.write("\n")
+    else:
+        for line in format_report(rows, percentiles):
+            sys.stdout.write(line + "\n")
+        if summary.skipped:
+            sys.stdout.write("skipped lines: %d\n" % summary.skipped)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
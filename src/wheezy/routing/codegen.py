@@ -0,0 +1,237 @@
+import linecache
+
+from wheezy.routing.batch import match_each, match_many
+from wheezy.routing.choice import ChoiceRoute
+from wheezy.routing.frozen import merge
+from wheezy.routing.fused import match_empty
+from wheezy.routing.methods import resolve_method
+from wheezy.routing.plain import PlainRoute
+from wheezy.routing.regex import LazyRegex, RegexRoute
+
+FILENAME = "<wheezy.routing.codegen %d>"
+
+
+class Generator(object):
+    """Writes the source of a match function for a route table.
+    Objects the source refers to are kept in ``namespace``.
+    """
+
+    __slots__ = ("lines", "namespace")
+
+    def __init__(self):
+        self.lines = []
+        self.namespace = {"merge": merge}
+
+    def const(self, value):
+        name = "c%d" % len(self.namespace)
+        self.namespace[name] = value
+        return name
+
+    def emit(self, indent, line):
+        self.lines.append("    " * indent + line)
+
+    def function(self, router):
+        """Writes ``match(path, pos=0)`` for the ``router``."""
+        self.emit(0, "def match(path, pos=0):")
+        if router.match_map:
+            mm = self.const(router.match_map)
+            self.emit(1, "hit = %s.get(path[pos:] if pos else path)" % mm)
+            self.emit(1, "if hit is not None:")
+            self.emit(2, "return hit")
+        self.emit(1, "p0 = pos")
+        self.entries(router.mapping, 1, 0, ())
+        self.emit(1, "return None, {}")
+
+    def entries(self, mapping, indent, level, outer):
+        """Writes checks of route table ``mapping`` at nesting
+        ``level``. ``outer`` is a tuple of names of kwargs of
+        intermediate routes.
+        """
+        for match, handler in mapping:
+            if not hasattr(handler, "match"):
+                if level and not handler:
+                    # ``scan`` of a nested router treats it as no match
+                    continue
+                inner, kw = self.route(match, indent, level, False)
+                self.success(inner, self.const(handler), kw, outer)
+                continue
+            inner, kw = self.route(match, indent, level, True)
+            p = "p%d" % (level + 1)
+            outer_inner = kw and outer + (kw,) or outer
+            if hasattr(handler, "mapping") and hasattr(handler, "match_map"):
+                if handler.match_map:
+                    mm = self.const(handler.match_map)
+                    self.emit(inner, "hit = %s.get(path[%s:])" % (mm, p))
+                    self.emit(inner, "if hit is not None and hit[0]:")
+                    self.success(inner + 1, "hit[0]", "hit[1]", outer_inner)
+                self.entries(handler.mapping, inner, level + 1, outer_inner)
+            else:
+                m = self.const(handler.match)
+                self.emit(inner, "h, kw = %s(path, %s)" % (m, p))
+                self.emit(inner, "if h:")
+                self.success(inner + 1, "h", "kw", outer_inner)
+
+    def route(self, match, indent, level, intermediate):
+        """Writes a check of the route. Returns a tupple of (indent,
+        kwargs) for the block where the route matched: an intermediate
+        route sets the end position and kwargs of the next level, a
+        finishing one sets ``kw``. kwargs is ``None`` if they are
+        known to be empty.
+        """
+        p = "p%d" % level
+        end = "p%d" % (level + 1)
+        kw = intermediate and "k%d" % (level + 1) or "kw"
+        inner = indent + 1
+        route = getattr(match, "__self__", None)
+        func = getattr(match, "__func__", None)
+        if match is match_empty:
+            self.emit(indent, "%s = %s" % (end, p))
+            return indent, None
+        if isinstance(route, RegexRoute) and not route.converters:
+            regex = route.regex
+            if isinstance(regex, LazyRegex):
+                regex = regex.compile()
+            regex_match = self.const(regex.match)
+            self.emit(indent, "m = %s(path, %s)" % (regex_match, p))
+            self.emit(indent, "if m:")
+            if intermediate:
+                self.emit(inner, "%s = m.end()" % end)
+            if func is RegexRoute.match_with_kwargs:
+                defaults = self.const(route.kwargs)
+                self.emit(
+                    inner, "%s = dict(%s, **m.groupdict())" % (kw, defaults)
+                )
+            else:
+                self.emit(inner, "%s = m.groupdict()" % kw)
+                if func is RegexRoute.match_no_kwargs_finishing:
+                    name = route.name
+                    self.emit(inner, "%s['route_name'] = %r" % (kw, name))
+        elif intermediate and func is PlainRoute.startswith_match:
+            prefix = route.pattern
+            self.emit(indent, "if path.startswith(%r, %s):" % (prefix, p))
+            self.emit(inner, "%s = %s + %d" % (end, p, route.matched))
+            if not route.kwargs:
+                return inner, None
+            self.emit(inner, "%s = %s" % (kw, self.const(route.kwargs)))
+        elif intermediate and func in (
+            ChoiceRoute.lookup_match,
+            ChoiceRoute.scan_match,
+        ):
+            self.choice(route, indent, level)
+        else:
+            # any other route is called as is
+            if not intermediate:
+                end = "e"
+            match = self.const(match)
+            self.emit(indent, "%s, %s = %s(path, %s)" % (end, kw, match, p))
+            self.emit(indent, "if %s >= 0:" % end)
+        return inner, kw
+
+    def choice(self, route, indent, level):
+        """Writes a check of an intermediate choice route that sets
+        the end position and kwargs of the next level.
+        """
+        p = "p%d" % level
+        end = "p%d" % (level + 1)
+        kw = "k%d" % (level + 1)
+        keyword = "if"
+        if route.match.__func__ is ChoiceRoute.lookup_match:
+            choices = self.const(route.choices)
+            for n in route.lengths:
+                self.emit(
+                    indent,
+                    "%s (c := %s.get(path[%s : %s + %d])) is not None:"
+                    % (keyword, choices, p, p, n),
+                )
+                self.emit(
+                    indent + 1, "%s, %s = %s + %d, c[1]" % (end, kw, p, n)
+                )
+                keyword = "elif"
+        else:
+            for pattern, (n, kwargs) in route.patterns:
+                self.emit(
+                    indent,
+                    "%s path.startswith(%r, %s):" % (keyword, pattern, p),
+                )
+                kwargs = self.const(kwargs)
+                self.emit(
+                    indent + 1,
+                    "%s, %s = %s + %d, %s" % (end, kw, p, n, kwargs),
+                )
+                keyword = "elif"
+        self.emit(indent, "else:")
+        self.emit(indent + 1, "%s = -1" % end)
+        self.emit(indent, "if %s >= 0:" % end)
+
+    def success(self, indent, handler, kwargs, outer):
+        for k in reversed(outer):
+            kwargs = "merge(%s, %s)" % (k, kwargs)
+        self.emit(indent, "return %s, %s" % (handler, kwargs))
+
+
+def generate(router):
+    """Returns a tupple of (source, namespace) of a match function
+    for the ``router``.
+    """
+    g = Generator()
+    g.function(router)
+    return "\n".join(g.lines) + "\n", g.namespace
+
+
+class GeneratedRouter(object):
+    """Read-only matcher built by ``PathRouter.generate``. The
+    route table is compiled into the source of a single ``match``
+    function: literal prefixes become inline ``startswith`` checks,
+    regex routes call precompiled regex objects and nested route
+    tables are inlined, so there are no calls per route.
+
+    If ``debug`` is true the generated source is kept in ``source``
+    and is shown in tracebacks.
+    """
+
+    __slots__ = ("match", "path_map", "source")
+
+    def __init__(self, router, debug=False):
+        source, namespace = generate(router)
+        filename = FILENAME % id(self)
+        code = compile(source, filename, "exec")
+        exec(code, namespace)  # nosec
+        self.match = namespace["match"]
+        self.path_map = router.compile_paths()
+        self.source = None
+        if debug:
+            self.source = source
+            linecache.cache[filename] = (
+                len(source),
+                None,
+                source.splitlines(True),
+                filename,
+            )
+
+    def match_many(self, paths, window=1024):
+        """Yields a tupple of (handler, kwargs) for each path of
+        iterable ``paths``. A path repeated within ``window`` paths
+        is matched once.
+        """
+        return match_many(self.match_batch, paths, window)
+
+    def match_batch(self, paths, pos=0):
+        """Returns a dict of path to a tupple of (handler, kwargs)."""
+        return match_each(self.match, paths, pos)
+
+    def match_method(self, path, method, pos=0):
+        """Tries to find a match for the given path and HTTP method.
+        Returns a tupple of (handler, kwargs, allowed)
+        """
+        return resolve_method(self.match(path, pos), method)
+
+    def path_for(self, name, **kwargs):
+        """Returns the url for the given route name."""
+        return self.path_map[name](kwargs)
+
+    def path_for_many(self, items):
+        """Returns a list of urls for the given iterable of tupples
+        (name, kwargs).
+        """
+        path_map = self.path_map
+        return [path_map[name](kwargs or {}) for name, kwargs in items]
@@ -0,0 +1,252 @@
+from sys import intern
+
+from wheezy.routing import frozen
+from wheezy.routing.batch import match_each
+from wheezy.routing.frozen import FOREIGN, LEAF, NESTED, PREFIX, merge
+from wheezy.routing.fused import (
+    FusedRouter,
+    flush,
+    fuse_patterns,
+    is_fusable_pattern,
+    match_none,
+)
+from wheezy.routing.regex import LazyRegex, RegexRoute, convert_groups
+
+# kinds of compact entries, in addition to the frozen ones
+REGEX = 4  # (REGEX, regex, kwargs, handler)
+FUSED = 5  # (FUSED, regex, branches, None)
+TYPED = 6  # (TYPED, regex, (kwargs, converters), handler)
+
+
+def share(kwargs, shared):
+    """Returns kwargs equal to ``kwargs`` that are shared by all
+    routes with such kwargs. Strings are interned.
+    """
+    if not kwargs:
+        return kwargs
+    kwargs = {
+        intern(k): intern(v) if isinstance(v, str) else v
+        for k, v in kwargs.items()
+    }
+    try:
+        key = tuple(sorted(kwargs.items()))
+        return shared.setdefault(key, kwargs)
+    except TypeError:
+        return kwargs
+
+
+def compact_map(match_map, shared):
+    """Returns a copy of exact paths with interned keys and shared
+    kwargs.
+    """
+    return {
+        intern(path): (handler, share(kwargs, shared))
+        for path, (handler, kwargs) in match_map.items()
+    }
+
+
+def regex_entry(match, handler, shared):
+    """Returns a REGEX entry for a finishing regex route, or a TYPED
+    one if the route has converters, otherwise ``None``.
+    """
+    route = getattr(match, "__self__", None)
+    if not isinstance(route, RegexRoute):
+        return None
+    if route.converters:
+        kwargs = route.defaults
+        if not kwargs:
+            return None
+    elif match == route.match_no_kwargs_finishing:
+        kwargs = {"route_name": route.name}
+    elif match == route.match_with_kwargs:
+        kwargs = route.kwargs
+    else:  # pragma: nocover
+        return None
+    regex = route.regex
+    if isinstance(regex, LazyRegex):
+        regex = regex.compile()
+    kwargs = share(kwargs, shared)
+    if route.converters:
+        return (TYPED, regex, (kwargs, route.converters), handler)
+    return (REGEX, regex, kwargs, handler)
+
+
+def compact_entries(entries, shared):
+    """Converts frozen entries into compact ones: finishing regex
+    routes are kept as compiled regex and kwargs with no route
+    object, adjacent ones are fused into a single pattern.
+    """
+    result = []
+    run = []
+    for kind, a, b, c in expand(entries):
+        entry = None
+        if kind == LEAF:
+            entry = regex_entry(a, b, shared)
+        if entry is not None and is_fusable_pattern(entry[1].pattern):
+            run.append(entry)
+            continue
+        flush(run, result, 2, fused_entry)
+        run = []
+        if entry is not None:
+            result.append(entry)
+            continue
+        if kind == PREFIX:
+            entry = (
+                PREFIX,
+                intern(a),
+                share(b, shared),
+                compact_entries(c, shared),
+            )
+        elif kind == NESTED:
+            entry = (
+                NESTED,
+                a,
+                compact_map(b, shared),
+                compact_entries(c, shared),
+            )
+        else:
+            entry = (kind, a, b, c)
+        result.append(entry)
+    flush(run, result, 2, fused_entry)
+    return tuple(result)
+
+
+def expand(entries):
+    """Yields frozen entries with branches of fused routers as
+    leaves.
+    """
+    for entry in entries:
+        inner = entry[0] == FOREIGN and getattr(entry[2], "__self__", None)
+        if isinstance(inner, FusedRouter):
+            for match, handler in inner.entries:
+                if match is not match_none:
+                    yield LEAF, match, handler, None
+        else:
+            yield entry
+
+
+def fused_entry(run):
+    regex = fuse_patterns([entry[1].pattern for entry in run])
+    # branches are indexed by marker group
+    branches = [None]
+    for kind, r, kwargs, handler in run:
+        converters = None
+        if kind == TYPED:
+            kwargs, converters = kwargs
+        branches.append((r, kwargs, handler, converters))
+    return FUSED, regex, tuple(branches), None
+
+
+def match_branches(branches, start, path, pos=0):
+    """Tries fused ``branches`` in turn starting at index ``start``,
+    the first one that matches and whose values are converted wins.
+    Returns a tupple of (handler, kwargs).
+    """
+    for i in range(start, len(branches)):
+        regex, kwargs, handler, converters = branches[i]
+        m = regex.match(path, pos)
+        if m is None:
+            continue
+        if converters is None:
+            return handler, dict(kwargs, **m.groupdict())
+        values = convert_groups(m, converters)
+        if values is not None:
+            return handler, dict(kwargs, **values)
+    return None, {}
+
+
+def match_compact(entries, path, pos=0):  # noqa: C901
+    """Tries to find a match for the given path in compact entries
+    starting at position ``pos``. Returns a tupple of (handler, kwargs)
+    """
+    for kind, a, b, c in entries:
+        if kind == REGEX:
+            m = a.match(path, pos)
+            if m is not None:
+                return c, dict(b, **m.groupdict())
+            continue
+        if kind == FUSED:
+            m = a.match(path, pos)
+            if m is None:
+                continue
+            regex, kwargs, handler, converters = b[m.lastindex]
+            if converters is None:
+                m = regex.match(path, pos)
+                return handler, dict(kwargs, **m.groupdict())
+            handler, kwargs = match_branches(b, m.lastindex, path, pos)
+            if handler:
+                return handler, kwargs
+            continue
+        if kind == LEAF:
+            matched, kwargs = a(path, pos)
+            if matched >= 0:
+                return b, kwargs
+            continue
+        if kind == TYPED:
+            m = a.match(path, pos)
+            if m is not None:
+                values = convert_groups(m, b[1])
+                if values is not None:
+                    return c, dict(b[0], **values)
+            continue
+        if kind == PREFIX:
+            if not path.startswith(a, pos):
+                continue
+            kwargs = b
+            handler, kwargs_inner = match_compact(c, path, pos + len(a))
+        else:
+            matched, kwargs = a(path, pos)
+            if matched < 0:
+                continue
+            if kind == FOREIGN:
+                handler, kwargs_inner = b(path, matched)
+            elif b and path[matched:] in b:
+                handler, kwargs_inner = b[path[matched:]]
+            else:
+                handler, kwargs_inner = match_compact(c, path, matched)
+        if handler:
+            return handler, merge(kwargs, kwargs_inner)
+    return None, {}
+
+
+class CompactRouter(frozen.FrozenRouter):
+    """Frozen router with fewer objects per route, built by
+    ``PathRouter.compact``. It is meant for servers that build the
+    route table before fork, e.g. gunicorn with ``preload_app``::
+
+        router = r.compact()
+        gc.freeze()
+
+    A worker that matches a path changes reference counts of every
+    object it touches, so the memory page with the object is copied.
+    Finishing regex routes are kept as a compiled regex, kwargs and
+    converters (adjacent ones are fused into a single pattern), route
+    objects are not touched by ``match``. Strings are interned and equal
+    kwargs are shared. ``gc.freeze()`` moves all objects to the
+    permanent generation, so the garbage collector does not touch
+    them either.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, frozen):
+        shared = {}
+        self.match_map = compact_map(frozen.match_map, shared)
+        self.entries = compact_entries(frozen.entries, shared)
+        self.path_map = {
+            intern(name): path for name, path in frozen.path_map.items()
+        }
+
+    def match(self, path, pos=0):
+        """Tries to find a match for the given path in route table
+        starting at position ``pos``. Returns a tupple of
+        (handler, kwargs)
+        """
+        key = path[pos:] if pos else path
+        if key in self.match_map:
+            return self.match_map[key]
+        return match_compact(self.entries, path, pos)
+
+    def match_batch(self, paths, pos=0):
+        """Returns a dict of path to a tupple of (handler, kwargs)."""
+        return match_each(self.match, paths, pos)
@@ -3,9 +3,13 @@ from wheezy.routing.curly import (
     default_pattern as curly_default_pattern,
     patterns as curly_patterns,
     try_build_curly_route,
+    try_build_lazy_curly_route,
 )
 from wheezy.routing.plain import try_build_plain_route
-from wheezy.routing.regex import try_build_regex_route
+from wheezy.routing.regex import (
+    try_build_lazy_regex_route,
+    try_build_regex_route,
+)
 
 assert curly_default_pattern
 assert curly_patterns
@@ -16,3 +20,11 @@ route_builders = [
     try_build_curly_route,
     try_build_regex_route,
 ]
+
+# regex routes are compiled on the first match attempt
+lazy_route_builders = [
+    try_build_plain_route,
+    try_build_choice_route,
+    try_build_lazy_curly_route,
+    try_build_lazy_regex_route,
+]
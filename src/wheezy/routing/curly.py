@@ -1,5 +1,8 @@
 import re
+from datetime import date
+from uuid import UUID
 
+from wheezy.routing.cache import LRUCache
 from wheezy.routing.regex import RegexRoute
 from wheezy.routing.utils import outer_split
 
@@ -13,7 +16,24 @@ def try_build_curly_route(pattern, finishing=True, kwargs=None, name=None):
     if isinstance(pattern, RegexRoute):
         return pattern
     if RE_SPLIT.search(pattern):
-        return RegexRoute(convert(pattern), finishing, kwargs, name)
+        regex, converters = translate(pattern)
+        return RegexRoute(regex, finishing, kwargs, name, converters)
+    return None
+
+
+def try_build_lazy_curly_route(
+    pattern, finishing=True, kwargs=None, name=None
+):
+    """Same as ``try_build_curly_route`` but the regex is compiled
+    on the first match attempt.
+    """
+    if isinstance(pattern, RegexRoute):
+        return pattern
+    if RE_SPLIT.search(pattern):
+        regex, converters = translate(pattern)
+        return RegexRoute(
+            regex, finishing, kwargs, name, converters, lazy=True
+        )
     return None
 
 
@@ -35,10 +55,77 @@ patterns = {
     "a": r".+",
     "any": r".+",
     "rest": r".+",
+    # word characters and ``-``
+    "slug": r"[\w-]+",
+    # e.g. 2c5ea4c0-4067-11e9-8bad-9b1deb4d3b7d
+    "uuid": r"[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}",
+    # e.g. 2019-03-08
+    "date": r"\d{4}-\d{2}-\d{2}",
 }
 
 default_pattern = "s"
 
+# curly expression => (regex, converters)
+translate_cache = LRUCache(1024)
+
+# pattern name => (to_python, to_path), values of other patterns
+# are kept as strings
+converters = {
+    "int": (int, str),
+    "uuid": (UUID, str),
+    "date": (date.fromisoformat, date.isoformat),
+}
+
+
+def register_converter(name, pattern, to_python, to_path=str):
+    """Registers a curly pattern ``name`` with regex ``pattern``
+    whose values are converted by ``to_python`` on match and by
+    ``to_path`` when a path is built. Routes added later use it.
+
+    >>> register_converter('hex', r'[0-9a-f]+', lambda s: int(s, 16),
+    ...                    lambda n: '%x' % n)
+    >>> translate('{n:hex}')[0]
+    '(?P<n>[0-9a-f]+)'
+    >>> del patterns['hex'], converters['hex']
+    >>> translate_cache.clear()
+    """
+    patterns[name] = pattern
+    converters[name] = (to_python, to_path)
+    translate_cache.clear()
+
+
+def translate(s):
+    """Returns a tupple of (regex, converters) for curly expression
+    ``s``. Results are cached, so identical patterns are converted
+    once; clear ``translate_cache`` once ``patterns`` are changed.
+
+    >>> translate('{id:i}')
+    ('(?P<id>\\\\d+)', {})
+    >>> translate('{id:int}')
+    ('(?P<id>\\\\d+)', {'id': (<class 'int'>, <class 'str'>)})
+    """
+    result = translate_cache.get(s)
+    if result is None:
+        result = convert(s), find_converters(s)
+        translate_cache.put(s, result)
+    return result
+
+
+def find_converters(s):
+    """Returns a dict of group name to converter for every
+    curly expression in ``s`` that has a converter registered
+    for its pattern name.
+
+    >>> find_converters('{id:uuid}/{n}')
+    {'id': (<class 'uuid.UUID'>, <class 'str'>)}
+    """
+    result = {}
+    for val in RE_SPLIT.findall(s):
+        group_name, pattern_name = parse(val[1:-1])
+        if pattern_name in converters:
+            result[group_name] = converters[pattern_name]
+    return result
+
 
 def convert(s):
     """Convert curly expression into regex with
@@ -0,0 +1,246 @@
+from wheezy.routing.batch import match_many
+from wheezy.routing.choice import ChoiceRoute, prefix_free
+from wheezy.routing.methods import resolve_method
+from wheezy.routing.order import route_prefixes
+from wheezy.routing.plain import PlainRoute
+from wheezy.routing.regex import RegexRoute
+
+# kinds of frozen entries
+LEAF = 0  # (LEAF, match, handler, None)
+NESTED = 1  # (NESTED, match, match_map, entries)
+PREFIX = 2  # (PREFIX, prefix, kwargs, entries)
+FOREIGN = 3  # (FOREIGN, match, inner_match, None)
+
+# a route table with fewer entries is scanned with no index
+min_index_size = 8
+
+# an index is not built if it holds more than that many entries per
+# entry of route table, e.g. a lot of routes with no literal prefix
+max_index_ratio = 4
+
+
+def freeze_entries(mapping):
+    """Converts the mapping of a router into a tuple of frozen
+    entries. Nested routers included by literal prefixes (plain,
+    choice or regex routes) are flattened, so a chain of such
+    includes becomes a single ``startswith`` check.
+    """
+    entries = []
+    for match, handler in mapping:
+        inner_match = getattr(handler, "match", None)
+        if not inner_match:
+            entries.append((LEAF, match, handler, None))
+            continue
+        if not hasattr(handler, "mapping"):
+            entries.append((FOREIGN, match, inner_match, None))
+            continue
+        inner = freeze_entries(handler.mapping)
+        prefixes = include_prefixes(getattr(match, "__self__", None))
+        if not prefixes or handler.match_map:
+            entries.append((NESTED, match, handler.match_map.copy(), inner))
+            continue
+        for prefix, kwargs in prefixes:
+            nested = inner
+            if len(inner) == 1 and inner[0][0] == PREFIX:
+                kind, p, kw, nested = inner[0]
+                prefix += p
+                kwargs = dict(kwargs, **kw)
+            entries.append((PREFIX, prefix, kwargs, nested))
+    return tuple(entries)
+
+
+def include_prefixes(route):
+    """Returns a list of tupples (prefix, kwargs) of an intermediate
+    ``route`` that matches a path by one of literal prefixes, or
+    ``None``. A path can start with at most one of the prefixes, so
+    trying them in turn is the same as a match of the route.
+
+    >>> include_prefixes(ChoiceRoute('{locale:(en|ru)}/', False))
+    [('en/', {'locale': 'en'}), ('ru/', {'locale': 'ru'})]
+    >>> include_prefixes(ChoiceRoute('{x:(a|ab)}', False))
+    """
+    if isinstance(route, PlainRoute):
+        return [(route.pattern, route.kwargs)]
+    if isinstance(route, ChoiceRoute) and route.patterns:
+        pairs = [(p, kwargs) for p, (n, kwargs) in route.patterns]
+    elif isinstance(route, RegexRoute) and route.literals:
+        pairs = route.literals
+    else:
+        return None
+    if not prefix_free([p for p, kwargs in pairs]):
+        return None
+    return pairs
+
+
+def first_segments(entry):
+    """Returns a list of first path segments one of which starts
+    any path that a frozen ``entry`` matches, or ``None`` if it is
+    not known.
+    """
+    kind, a = entry[0], entry[1]
+    prefixes = (a,) if kind == PREFIX else route_prefixes(a)
+    segments = []
+    for prefix in prefixes:
+        segment, sep, rest = prefix.partition("/")
+        if not sep:
+            return None
+        segments.append(segment)
+    return segments
+
+
+def index_entries(entries):
+    """Returns a dict of the first path segment to entries that can
+    match a path with that segment, or ``None`` if the index does
+    not pay off. Entries with no known first segment are kept in
+    every list, so each list is in route table order.
+    """
+    if len(entries) < min_index_size:
+        return None
+    index = {}
+    rest = []
+    size = 0
+    for entry in entries:
+        segments = first_segments(entry)
+        if segments is None:
+            rest.append(entry)
+            for bucket in index.values():
+                bucket.append(entry)
+            size += len(index)
+        else:
+            for segment in dict.fromkeys(segments):
+                bucket = index.get(segment)
+                if bucket is None:
+                    bucket = index[segment] = list(rest)
+                    size += len(rest)
+                bucket.append(entry)
+                size += 1
+        if size > max_index_ratio * len(entries):
+            return None
+    if len(index) < 2:
+        return None
+    return {segment: tuple(bucket) for segment, bucket in index.items()}
+
+
+def merge(kwargs, kwargs_inner):
+    """Merges kwargs of an intermediate route with kwargs of
+    nested match the way ``PathRouter.scan`` does.
+    """
+    if not kwargs:
+        return kwargs_inner
+    if kwargs_inner:
+        return dict(kwargs, **kwargs_inner)
+    return kwargs
+
+
+def match_entries(entries, path, pos=0):
+    """Tries to find a match for the given path in frozen entries
+    starting at position ``pos``. Returns a tupple of (handler, kwargs)
+    """
+    for kind, a, b, c in entries:
+        if kind == LEAF:
+            matched, kwargs = a(path, pos)
+            if matched >= 0:
+                return b, kwargs
+            continue
+        if kind == PREFIX:
+            if not path.startswith(a, pos):
+                continue
+            kwargs = b
+            handler, kwargs_inner = match_entries(c, path, pos + len(a))
+        else:
+            matched, kwargs = a(path, pos)
+            if matched < 0:
+                continue
+            if kind == FOREIGN:
+                handler, kwargs_inner = b(path, matched)
+            elif b and path[matched:] in b:
+                handler, kwargs_inner = b[path[matched:]]
+            else:
+                handler, kwargs_inner = match_entries(c, path, matched)
+        if handler:
+            return handler, merge(kwargs, kwargs_inner)
+    return None, {}
+
+
+class FrozenRouter(object):
+    """Read-only matcher built by ``PathRouter.freeze``. It has
+    no route builders and keeps the route table in tuples with
+    nested routers flattened.
+
+    Entries are indexed by the first segment of their literal
+    prefix, so a path is tried only with entries that can match it,
+    see ``index_entries``.
+    """
+
+    __slots__ = ("match_map", "entries", "path_map", "index", "rest")
+
+    def __init__(self, router):
+        self.match_map = router.match_map.copy()
+        self.entries = freeze_entries(router.mapping)
+        self.path_map = router.compile_paths()
+        self.index = index_entries(self.entries)
+        if self.index is None:
+            self.rest = self.entries
+        else:
+            self.rest = tuple(
+                [e for e in self.entries if first_segments(e) is None]
+            )
+
+    def match(self, path, pos=0):
+        """Tries to find a match for the given path in route table
+        starting at position ``pos``. Returns a tupple of
+        (handler, kwargs)
+        """
+        key = path[pos:] if pos else path
+        if key in self.match_map:
+            return self.match_map[key]
+        index = self.index
+        if index is None:
+            return match_entries(self.entries, path, pos)
+        entries = index.get(key.partition("/")[0], self.rest)
+        return match_entries(entries, path, pos)
+
+    def match_many(self, paths, window=1024):
+        """Yields a tupple of (handler, kwargs) for each path of
+        iterable ``paths``. A path repeated within ``window`` paths
+        is matched once.
+        """
+        return match_many(self.match_batch, paths, window)
+
+    def match_batch(self, paths, pos=0):
+        """Returns a dict of path to a tupple of (handler, kwargs).
+        Exact paths are looked up at once, paths that share the first
+        segment are tried with the same entries.
+        """
+        match_map = self.match_map
+        results = {}
+        pending = {}
+        for path in paths:
+            key = path[pos:] if pos else path
+            if key in match_map:
+                results[path] = match_map[key]
+            else:
+                pending.setdefault(key.partition("/")[0], []).append(path)
+        index = self.index or {}
+        for segment, group in pending.items():
+            entries = index.get(segment, self.rest)
+            for path in group:
+                results[path] = match_entries(entries, path, pos)
+        return results
+
+    def match_method(self, path, method, pos=0):
+        """Tries to find a match for the given path and HTTP method.
+        Returns a tupple of (handler, kwargs, allowed)
+        """
+        return resolve_method(self.match(path, pos), method)
+
+    def path_for(self, name, **kwargs):
+        """Returns the url for the given route name."""
+        return self.path_map[name](kwargs)
+
+    def path_for_many(self, items):
+        """Returns a list of urls for the given iterable of tupples
+        (name, kwargs).
+        """
+        path_map = self.path_map
+        return [path_map[name](kwargs or {}) for name, kwargs in items]
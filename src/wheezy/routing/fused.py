@@ -0,0 +1,198 @@
+import re
+
+from wheezy.routing.regex import RegexRoute
+
+# backreferences, conditionals and global inline flags change meaning
+# once a pattern becomes one branch of a larger alternation
+RE_UNSAFE = re.compile(r"\(\?P=|\(\?\(|\\\d|\(\?[aiLmsux]+\)")
+
+
+def match_empty(path, pos=0):
+    """Intermediate route that matches any ``path``, used to
+    place a fused router into ``PathRouter.mapping``.
+    """
+    return pos, None
+
+
+def match_none(path, pos=0):
+    """Finishing route that never matches, it takes the place of
+    a route removed from a fused router.
+    """
+    return -1, None
+
+
+def is_fusable(match, handler):
+    """Check if the mapping entry is a finishing regex route
+    that can be a branch of a fused pattern.
+    """
+    route = getattr(match, "__self__", None)
+    if not isinstance(route, RegexRoute) or hasattr(handler, "match"):
+        return False
+    return is_fusable_pattern(route.regex.pattern)
+
+
+def is_fusable_pattern(pattern):
+    """Check if the regex ``pattern`` of a finishing route can be
+    a branch of a fused pattern.
+    """
+    return pattern.endswith("$") and not RE_UNSAFE.search(pattern)
+
+
+def fuse_patterns(patterns):
+    """Returns compiled alternation of regex ``patterns``, each branch
+    is closed by an empty marker group. A pattern is wrapped as a whole
+    so its own top-level alternation can not skip the marker.
+
+    >>> fuse_patterns([r'x|y/(?P<id>\\d+)$', r'z$']).pattern
+    '(?:(?:x|y/(?:\\\\d+)$)())|(?:(?:z$)())'
+    """
+    return re.compile(
+        "|".join("(?:(?:%s)())" % uncapture(p) for p in patterns)
+    )
+
+
+def fuse(mapping, min_size=2):
+    """Returns a new mapping where each run of at least ``min_size``
+    adjacent fusable entries is replaced by a single
+    ``FusedRouter``. Entries of already fused routers are
+    expanded so the operation is idempotent.
+    """
+    result = []
+    run = []
+    for match, handler in mapping:
+        if isinstance(handler, FusedRouter):
+            entries = handler.entries
+        else:
+            entries = ((match, handler),)
+        for match, handler in entries:
+            if match is match_none:
+                continue
+            if is_fusable(match, handler):
+                run.append((match, handler))
+                continue
+            flush(run, result, min_size, fused_entry)
+            run = []
+            result.append((match, handler))
+    flush(run, result, min_size, fused_entry)
+    return result
+
+
+def flush(run, result, min_size, make_entry):
+    """Appends entries of ``run`` to ``result``, a run of at least
+    ``min_size`` entries is appended as one entry made by
+    ``make_entry``.
+    """
+    if not run:
+        return
+    if len(run) < min_size:
+        result.extend(run)
+    else:
+        result.append(make_entry(run))
+
+
+def fused_entry(run):
+    return match_empty, FusedRouter(run)
+
+
+class FusedRouter(object):
+    """Matches several finishing regex routes with a single scan
+    of one alternation pattern, e.g.
+    ``(?:(?:a/\\d+$)())|(?:(?:b/\\w+$)())``.
+
+    Groups of each route are made non-capturing and an empty marker
+    group closes every branch, so ``lastindex`` of the match object
+    points to the winning route that is then used to get kwargs.
+    Branches are tried in order, so the first route that matches wins.
+    If the route rejects the path, e.g. a value fails conversion, the
+    routes that follow are tried one by one.
+    """
+
+    __slots__ = ("entries", "regex", "stale")
+
+    def __init__(self, entries, regex=None, stale=()):
+        self.entries = tuple(entries)
+        self.regex = regex or fuse_patterns(
+            [match.__self__.regex.pattern for match, handler in self.entries]
+        )
+        self.stale = stale
+
+    def replace(self, index, entry=None):
+        """Returns a copy with the entry at ``index`` replaced by
+        ``entry`` or removed if it is ``None``. The compiled pattern
+        is reused: a removed route takes ``match_none``, a replaced one
+        is tried on its own before the branch found by the pattern.
+        """
+        entries = list(self.entries)
+        stale = self.stale
+        if entry is None:
+            entries[index] = (match_none, None)
+        else:
+            entries[index] = entry
+            stale = tuple(sorted(set(stale + (index,))))
+        return FusedRouter(entries, self.regex, stale)
+
+    def match(self, path, pos=0):
+        """Tries to find a match for the given path starting at
+        position ``pos``. Returns a tupple of (handler, kwargs).
+        """
+        m = self.regex.match(path, pos)
+        entries = self.entries
+        if self.stale:
+            start = m.lastindex - 1 if m is not None else len(entries)
+            for i in self.stale:
+                if i >= start:
+                    break
+                match, handler = entries[i]
+                matched, kwargs = match(path, pos)
+                if matched >= 0:
+                    return handler, kwargs
+        elif m is not None:
+            start = m.lastindex - 1
+        else:
+            return None, {}
+        for i in range(start, len(entries)):
+            match, handler = entries[i]
+            matched, kwargs = match(path, pos)
+            if matched >= 0:
+                return handler, kwargs
+        return None, {}
+
+
+def uncapture(pattern):
+    """Turns capturing groups of regex ``pattern`` into
+    non-capturing.
+
+    >>> uncapture(r'abc/(?P<id>\\d+)/(x|y)')
+    'abc/(?:\\\\d+)/(?:x|y)'
+    >>> uncapture(r'\\([(]+(?=a)(?<!b)')
+    '\\\\([(]+(?=a)(?<!b)'
+    """
+    parts = []
+    i = 0
+    n = len(pattern)
+    in_class = False
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == "\\":
+            j = i + 1
+            c += pattern[i:j]
+            i = j
+        elif in_class:
+            in_class = c != "]"
+        elif c == "[":
+            in_class = True
+            if pattern.startswith("^", i):
+                c += "^"
+                i += 1
+            if pattern.startswith("]", i):
+                c += "]"
+                i += 1
+        elif c == "(":
+            if pattern.startswith("?P<", i):
+                c = "(?:"
+                i = pattern.index(">", i) + 1
+            elif not pattern.startswith("?", i):
+                c = "(?:"
+        parts.append(c)
+    return "".join(parts)
@@ -0,0 +1,237 @@
+import re
+
+from wheezy.routing import curly
+from wheezy.routing.cache import LRUCache
+from wheezy.routing.fused import fuse_patterns
+from wheezy.routing.methods import resolve_method
+from wheezy.routing.router import PathRouter
+
+RE_HOST_PLACEHOLDER = re.compile(r"\{(\w+)(?::([^{}]+))?\}|\*")
+
+# curly patterns of a path segment match a host label
+label_patterns = {"s": "[^.]+", "segment": "[^.]+", "part": "[^.]+"}
+
+
+def host_regex(pattern):
+    """Converts host ``pattern`` into regex. A curly expression
+    matches a host label by default, ``*`` is an unnamed label.
+
+    >>> host_regex('{tenant}.example.com')
+    '(?P<tenant>[^.]+)\\\\.example\\\\.com'
+    >>> host_regex('*.{tenant:w}.example.com')
+    '[^.]+\\\\.(?P<tenant>\\\\w+)\\\\.example\\\\.com'
+    >>> host_regex('{tenant:s}.example.com')
+    '(?P<tenant>[^.]+)\\\\.example\\\\.com'
+    """
+    parts = []
+    start = 0
+    for m in RE_HOST_PLACEHOLDER.finditer(pattern):
+        end = m.start()
+        parts.append(re.escape(pattern[start:end]))
+        name, p = m.groups()
+        if name is None:
+            parts.append("[^.]+")
+        else:
+            p = p or "s"
+            p = label_patterns.get(p) or curly.patterns.get(p, p)
+            parts.append("(?P<%s>%s)" % (name, p))
+        start = m.end()
+    parts.append(re.escape(pattern[start:]))
+    return "".join(parts)
+
+
+def host_format(pattern):
+    """Returns a format to build a host or ``None`` if the
+    ``pattern`` has a wildcard.
+
+    >>> host_format('{tenant}.example.com')
+    '%(tenant)s.example.com'
+    >>> host_format('*.example.com')
+    """
+    for m in RE_HOST_PLACEHOLDER.finditer(pattern):
+        if m.group(1) is None:
+            return None
+    return RE_HOST_PLACEHOLDER.sub(
+        lambda m: "%%(%s)s" % m.group(1), pattern.replace("%", "%%")
+    )
+
+
+def normalize_host(host):
+    """Returns lowercase ``host`` with no port and trailing dot.
+
+    >>> normalize_host('Example.COM.:8080')
+    'example.com'
+    >>> normalize_host('[::1]:8080')
+    '[::1]'
+    """
+    host = host.lower()
+    if ":" in host and not host.endswith("]"):
+        host = host[: host.rindex(":")]
+    return host.rstrip(".")
+
+
+class HostRouter(object):
+    """Dispatches to a path router by host name. Exact host names
+    are found in a dictionary, host patterns, e.g.
+    ``{tenant}.example.com`` or ``*.example.com``, are tried in
+    the order they were added with a single regex scan.
+
+    ``default`` is a router for hosts that are not matched.
+    ``cache_size`` enables the cache of that many hosts matched
+    by patterns.
+    """
+
+    __slots__ = (
+        "host_map",
+        "patterns",
+        "regex",
+        "default",
+        "cache",
+        "path_index",
+    )
+
+    def __init__(self, default=None, cache_size=None):
+        self.host_map = {}
+        self.patterns = []
+        self.regex = None
+        self.default = default
+        self.cache = LRUCache(cache_size) if cache_size else None
+        self.path_index = None
+
+    def add_host(self, pattern, router, kwargs=None):
+        """Adds a host ``pattern`` served by ``router``, that is a
+        path router (any object with ``match``) or a list of routes.
+        ``kwargs`` are merged into kwargs of every match.
+        """
+        if not hasattr(router, "match"):
+            routes = router
+            router = PathRouter()
+            router.add_routes(routes)
+        pattern = pattern.lower()
+        kwargs = kwargs and kwargs.copy() or {}
+        if RE_HOST_PLACEHOLDER.search(pattern):
+            regex = re.compile(host_regex(pattern) + "$")
+            self.patterns.append((regex, router, kwargs, pattern))
+            # host patterns are fused on the next match
+            self.regex = None
+        else:
+            self.host_map[pattern] = (router, kwargs)
+        if self.cache is not None:
+            self.cache.clear()
+        self.path_index = None
+
+    def match_host(self, host):
+        """Returns a tupple of (router, kwargs) for the ``host``,
+        router is ``default`` if there is no match.
+        """
+        host = normalize_host(host)
+        if host in self.host_map:
+            return self.host_map[host]
+        cache = self.cache
+        if cache is not None:
+            hit = cache.get(host)
+            if hit is not None:
+                return hit
+        regex = self.regex
+        if regex is None and self.patterns:
+            regex = self.regex = fuse_patterns(
+                [p[0].pattern for p in self.patterns]
+            )
+        if regex is not None:
+            m = regex.match(host)
+            if m is not None:
+                entry = self.patterns[m.lastindex - 1]
+                regex, router, kwargs, pattern = entry
+                values = regex.match(host).groupdict()
+                if kwargs:
+                    values = dict(kwargs, **values)
+                if cache is not None:
+                    cache.put(host, (router, values))
+                return router, values
+        return self.default, {}
+
+    def match(self, host, path):
+        """Tries to find a match for the given host and path. Returns
+        a tupple of (handler, kwargs), kwargs of host are merged with
+        kwargs of path.
+        """
+        router, host_kwargs = self.match_host(host)
+        if router is None:
+            return None, {}
+        handler, kwargs = router.match(path)
+        if handler is not None and host_kwargs:
+            kwargs = dict(host_kwargs, **(kwargs or {}))
+        return handler, kwargs
+
+    def match_method(self, host, path, method):
+        """Tries to find a match for the given host, path and HTTP
+        method. Returns a tupple of (handler, kwargs, allowed)
+        """
+        return resolve_method(self.match(host, path), method)
+
+    def path_for(self, name, **kwargs):
+        """Returns a tupple of (host, path) for the given route name.
+        The host is built from the first host with a router that knows
+        the route name: exact hosts are checked first, then host
+        patterns with no wildcard, in the order they were added. The
+        host is ``None`` for a route of the ``default`` router.
+
+        Values of the host pattern names are not passed to the router
+        that builds the path.
+        """
+        path_index = self.path_index
+        if path_index is None or name not in path_index:
+            path_index = self.path_index = self.build_path_index()
+            if name not in path_index and self.resolve_includes():
+                path_index = self.path_index = self.build_path_index()
+        path_format, defaults, router, host_names = path_index[name]
+        host = None
+        if path_format is not None:
+            values = defaults and dict(defaults, **kwargs) or kwargs
+            host = path_format % values
+        if host_names:
+            kwargs = {k: v for k, v in kwargs.items() if k not in host_names}
+        return host, router.path_for(name, **kwargs)
+
+    def resolve_includes(self):
+        """Resolves lazy includes of host routers. Returns ``True`` if
+        there were any.
+        """
+        routers = [router for router, kwargs in self.host_map.values()]
+        routers.extend([p[1] for p in self.patterns])
+        routers.append(self.default)
+        resolved = False
+        for router in routers:
+            if getattr(router, "lazy_includes", None):
+                router.resolve_includes()
+                resolved = True
+        return resolved
+
+    def build_path_index(self):
+        """Returns a dict of route name to a tupple of
+        (host_format, kwargs, router, host_names).
+        """
+        entries = [
+            (host.replace("%", "%%"), kwargs, router, ())
+            for host, (router, kwargs) in self.host_map.items()
+        ]
+        for _, router, kwargs, pattern in self.patterns:
+            path_format = host_format(pattern)
+            if path_format is not None:
+                host_names = frozenset(
+                    [m.group(1) for m in RE_HOST_PLACEHOLDER.finditer(pattern)]
+                )
+                entries.append((path_format, kwargs, router, host_names))
+        if self.default is not None:
+            entries.append((None, {}, self.default, ()))
+        path_index = {}
+        for entry in entries:
+            router = entry[2]
+            names = getattr(router, "path_map", None) or ()
+            inner_path_map = getattr(router, "inner_path_map", None)
+            if inner_path_map:
+                names = list(names) + list(inner_path_map)
+            for name in names:
+                if name not in path_index:
+                    path_index[name] = entry
+        return path_index
@@ -0,0 +1,92 @@
+from importlib import import_module
+from threading import RLock
+
+# guards the first resolution of lazy includes
+resolve_lock = RLock()
+
+
+def import_name(name):
+    """Returns an object by dotted ``name``, the object is separated
+    from the module by ``:`` or by the last dot.
+
+    >>> import_name('os.path:join').__name__
+    'join'
+    >>> import_name('os.path.join').__name__
+    'join'
+    """
+    if ":" in name:
+        module, attr = name.split(":", 1)
+    else:
+        module, attr = name.rsplit(".", 1)
+    obj = import_module(module)
+    for name in attr.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+class LazyRouter(object):
+    """Nested router that is built the first time a path falls under
+    the route it is included by. ``source`` is a dotted name of
+    a list of routes or a router, e.g. ``billing.urls:all_urls``, or
+    a callable that returns one of them.
+
+    ``router_class`` and ``route_builders`` are used to build a router
+    from a list of routes, they are taken from the including router
+    unless given.
+    """
+
+    __slots__ = ("source", "router_class", "route_builders", "router", "match")
+
+    def __init__(self, source, router_class=None, route_builders=None):
+        self.source = source
+        self.router_class = router_class
+        self.route_builders = route_builders
+        self.router = None
+        self.match = self.resolve_and_match
+
+    def __reduce__(self):
+        return (
+            LazyRouter,
+            (self.source, self.router_class, self.route_builders),
+            self.router,
+        )
+
+    def __setstate__(self, router):
+        if router is not None:
+            self.router = router
+            self.match = router.match
+
+    def load(self):
+        """Imports or calls ``source``. Returns a list of routes or
+        a router.
+        """
+        source = self.source
+        if isinstance(source, str):
+            return import_name(source)
+        if not hasattr(source, "match"):
+            return source()
+        return source
+
+    def resolve(self):
+        """Imports and builds the router unless it is already built.
+        Returns the router.
+        """
+        router = self.router
+        if router is not None:
+            return router
+        with resolve_lock:
+            router = self.router
+            if router is not None:
+                return router
+            source = self.load()
+            if hasattr(source, "match"):
+                router = source
+            else:
+                router = self.router_class(self.route_builders)
+                router.add_routes(source)
+            self.router = router
+            self.match = router.match
+        return router
+
+    def resolve_and_match(self, path, pos=0):
+        return self.resolve().match(path, pos)
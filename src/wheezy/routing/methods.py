@@ -0,0 +1,66 @@
+class MethodHandlers(object):
+    """Handlers of a route per HTTP method. A handler added for
+    ``GET`` also serves ``HEAD`` unless there is one for ``HEAD``.
+
+    >>> h = MethodHandlers()
+    >>> h.add(('get',), 'list', 'items')
+    >>> h.add(('POST',), 'create', 'create_item')
+    >>> sorted(h.allowed)
+    ['GET', 'HEAD', 'POST']
+    >>> h.resolve('POST', {'route_name': 'items'})
+    ... # doctest: +ELLIPSIS
+    ('create', {'route_name': 'create_item'}, frozenset({...}))
+    >>> h.resolve('PUT', {})[0]
+    """
+
+    __slots__ = ("handlers", "implicit", "allowed")
+
+    def __init__(self):
+        self.handlers = {}
+        self.implicit = set()
+        self.allowed = frozenset()
+
+    def add(self, methods, handler, name):
+        """Adds the ``handler`` for each of ``methods``."""
+        handlers = self.handlers
+        for method in methods:
+            method = method.upper()
+            handlers[method] = (handler, name)
+            self.implicit.discard(method)
+        if "GET" in handlers and (
+            "HEAD" not in handlers or "HEAD" in self.implicit
+        ):
+            handlers["HEAD"] = handlers["GET"]
+            self.implicit.add("HEAD")
+        self.allowed = frozenset(handlers)
+
+    def copy(self):
+        """Returns a copy that can be changed independently."""
+        h = MethodHandlers()
+        h.handlers = self.handlers.copy()
+        h.implicit = self.implicit.copy()
+        h.allowed = self.allowed
+        return h
+
+    def resolve(self, method, kwargs):
+        """Returns a tupple of (handler, kwargs, allowed), the
+        handler is ``None`` if the ``method`` is not allowed.
+        """
+        try:
+            handler, name = self.handlers[method]
+        except KeyError:
+            return None, kwargs, self.allowed
+        if kwargs is None or kwargs.get("route_name", name) != name:
+            kwargs = dict(kwargs or (), route_name=name)
+        return handler, kwargs, self.allowed
+
+
+def resolve_method(result, method):
+    """Returns a tupple of (handler, kwargs, allowed) for the
+    ``result`` of match. ``allowed`` is ``None`` if the handler
+    serves any method.
+    """
+    handler, kwargs = result
+    if isinstance(handler, MethodHandlers):
+        return handler.resolve(method, kwargs)
+    return handler, kwargs, None
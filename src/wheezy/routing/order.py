@@ -0,0 +1,144 @@
+from heapq import heapify, heappop, heappush
+
+from wheezy.routing.choice import ChoiceRoute
+from wheezy.routing.fused import RE_UNSAFE
+from wheezy.routing.plain import PlainRoute
+from wheezy.routing.regex import RegexRoute
+
+METACHARS = ".^$*+?{}[]|()"
+QUANTIFIERS = ("*", "+", "?", "{")
+
+
+def literal_prefix(pattern):
+    """Returns the literal text every match of regex ``pattern``
+    starts with.
+
+    >>> literal_prefix(r'abc/(?P<id>\\d+)$')
+    'abc/'
+    >>> literal_prefix(r'a\\.b/c?')
+    'a.b/'
+    >>> literal_prefix(r'abc|x')
+    ''
+    """
+    if RE_UNSAFE.search(pattern) or has_alternation(pattern):
+        return ""
+    prefix = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == "\\":
+            if i == n or pattern[i].isalnum():
+                break
+            c = pattern[i]
+            i += 1
+        elif c in METACHARS:
+            break
+        if pattern.startswith(QUANTIFIERS, i):
+            break
+        prefix.append(c)
+    return "".join(prefix)
+
+
+def has_alternation(pattern):
+    """Check if regex ``pattern`` has ``|`` outside of groups.
+
+    >>> has_alternation(r'(a|b)c[|]\\|')
+    False
+    >>> has_alternation(r'a|(b)')
+    True
+    """
+    depth = 0
+    i = 0
+    n = len(pattern)
+    in_class = False
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == "\\":
+            i += 1
+        elif in_class:
+            in_class = c != "]"
+        elif c == "[":
+            in_class = True
+            if pattern.startswith("^", i):
+                i += 1
+            if pattern.startswith("]", i):
+                i += 1
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and not depth:
+            return True
+    return False
+
+
+def route_prefixes(match):
+    """Returns a tuple of literal prefixes one of which starts
+    any path matched by the ``match`` function of a route. An
+    unknown route gets an empty prefix, that is a prefix of any
+    path.
+    """
+    route = getattr(match, "__self__", None)
+    if isinstance(route, PlainRoute):
+        return (route.pattern,)
+    if isinstance(route, ChoiceRoute):
+        if route.patterns is None:
+            return (route.prefix,)
+        return tuple([p for p, result in route.patterns])
+    if isinstance(route, RegexRoute):
+        return (literal_prefix(route.regex.pattern),)
+    return ("",)
+
+
+def overlaps(a, b):
+    """Check if routes with prefixes ``a`` and ``b`` can
+    match the same path.
+
+    >>> overlaps(('en/', 'ru/'), ('api/',))
+    False
+    >>> overlaps(('api/',), ('api/v1/', 'x'))
+    True
+    """
+    for x in a:
+        for y in b:
+            if x.startswith(y) or y.startswith(x):
+                return True
+    return False
+
+
+def reorder(mapping, hits):
+    """Returns a list of indices of ``mapping`` entries ordered by
+    ``hits`` (a dict of index to count), most hit first. An entry
+    never moves before an entry that precedes it and can match the
+    same path, so the first route that matches still wins.
+
+    >>> from wheezy.routing.regex import RegexRoute
+    >>> mapping = [(RegexRoute(p).match, p) for p in (
+    ...     'a/(?P<x>\\\\d+)', 'b/(?P<x>\\\\d+)', '(?P<x>\\\\w+)', 'c/')]
+    >>> reorder(mapping, {1: 5, 3: 9})
+    [1, 0, 2, 3]
+    """
+    prefixes = [route_prefixes(match) for match, handler in mapping]
+    n = len(prefixes)
+    followers = [[] for i in range(n)]
+    waiting = [0] * n
+    for j in range(n):
+        b = prefixes[j]
+        for i in range(j):
+            if overlaps(prefixes[i], b):
+                followers[i].append(j)
+                waiting[j] += 1
+    ready = [(-hits.get(i, 0), i) for i in range(n) if not waiting[i]]
+    heapify(ready)
+    order = []
+    while ready:
+        i = heappop(ready)[1]
+        order.append(i)
+        for j in followers[i]:
+            waiting[j] -= 1
+            if not waiting[j]:
+                heappush(ready, (-hits.get(j, 0), j))
+    return order
@@ -0,0 +1,145 @@
+import re
+
+from wheezy.routing.cache import LRUCache
+from wheezy.routing.choice import ChoiceRoute
+from wheezy.routing.plain import PlainRoute
+from wheezy.routing.regex import RegexRoute
+
+RE_NAME = re.compile(r"%\((\w+)\)s")
+
+# (path_format, names, has defaults) => code of path function, routes
+# with the same format share it
+code_cache = LRUCache(1024)
+
+
+def path_template(path):
+    """Returns a tupple of (path_format, defaults) for the path
+    function of a known route or ``None``.
+
+    >>> path_template(PlainRoute('abc', True).path)
+    ('abc', {})
+    >>> path_template(ChoiceRoute('{locale:(en|ru)}/', False).path)
+    ('%(locale)s/', {})
+    >>> r = RegexRoute('abc/(?P<id>\\\\d+)', True, {'id': '1'}, 'x')
+    >>> path_template(r.path)
+    ('abc/%(id)s', {'id': '1'})
+    >>> r = RegexRoute('(?P<id>\\\\d+)', True, None, 'x', {'id': (int, str)})
+    >>> path_template(r.path)
+    ('%(id)s', {})
+    """
+    route = getattr(path, "__self__", None)
+    if isinstance(route, PlainRoute):
+        return route.pattern.replace("%", "%%"), {}
+    if isinstance(route, ChoiceRoute):
+        kwargs = route.kwargs
+        return route.path_format, {
+            n: kwargs[n] for n in route.names if n in kwargs
+        }
+    if isinstance(route, RegexRoute) and path_as_str(route.converters):
+        kwargs = route.kwargs or {}
+        names = RE_NAME.findall(route.path_format)
+        return route.path_format, {n: kwargs[n] for n in names if n in kwargs}
+    return None
+
+
+def path_as_str(converters):
+    """Check if every value of a path is formatted by ``%s``, that
+    is the case for a route with no converters or converters with
+    ``str`` as ``to_path``.
+    """
+    return not converters or all(
+        to_path is str for name, to_python, to_path in converters
+    )
+
+
+def compile_path(paths):
+    """Returns a single function that builds the path of a route
+    included through ``paths`` (outermost first).
+
+    Templates of known routes are joined into one format and
+    compiled into a function, a route with no parameters gets a
+    constant. Otherwise path functions are called in turn.
+
+    >>> p = compile_path((PlainRoute('a/', False).path,
+    ...                   PlainRoute('b', True).path))
+    >>> p({})
+    'a/b'
+    >>> p = compile_path((
+    ...     ChoiceRoute('{locale:(en|ru)}/', False, {'locale': 'en'}).path,
+    ...     RegexRoute('(?P<id>\\\\d+)', True, None, 'x').path))
+    >>> p({'id': 1})
+    'en/1'
+    """
+    path = len(paths) == 1 and paths[0] or join_paths(paths)
+    path_formats = []
+    defaults = {}
+    for p in paths:
+        template = path_template(p)
+        if template is None:
+            return path
+        path_format, kwargs = template
+        for name, value in kwargs.items():
+            if defaults.setdefault(name, value) != value:
+                return path
+        path_formats.append(path_format)
+    path_format = "".join(path_formats)
+    names = RE_NAME.findall(path_format)
+    try:
+        if not names:
+            return constant_path(path_format % {})
+        # a literal ``%`` that is not escaped
+        RE_NAME.sub("", path_format) % ()
+    except (TypeError, ValueError):
+        return path
+    return exec_path(RE_NAME.sub("%s", path_format), names, defaults)
+
+
+def path_source(path_format, names, defaults):
+    source = [
+        "def path(values=None):",
+        "    return %r %% (%s,)"
+        % (path_format, ", ".join(["values[%r]" % n for n in names])),
+    ]
+    if defaults:
+        source.insert(1, "    values = values and dict(defaults, **values)")
+        source.insert(2, "    values = values or defaults")
+    return "\n".join(source)
+
+
+def exec_path(path_format, names, defaults):
+    """Returns a path function for the format with ``%s``
+    placeholders for ``names``. Compiling the source takes most of
+    the time, so the code is cached by format.
+
+    >>> exec_path('item/%s', ['id'], {})({'id': 1})
+    'item/1'
+    """
+    key = (path_format, tuple(names), bool(defaults))
+    code = code_cache.get(key)
+    if code is None:
+        source = path_source(path_format, names, defaults)
+        code = compile(source, "<path>", "exec")
+        code_cache.put(key, code)
+    namespace = {"defaults": defaults}
+    exec(code, namespace)  # nosec
+    return namespace["path"]
+
+
+def constant_path(value):
+    """Returns a function that builds the path of a route
+    with no parameters.
+    """
+
+    def path(values=None):
+        return value
+
+    return path
+
+
+def join_paths(paths):
+    """Returns a function that builds a path of nested route."""
+
+    def path(values=None):
+        return "".join([p(values) for p in paths])
+
+    return path
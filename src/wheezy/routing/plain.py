@@ -37,22 +37,29 @@ class PlainRoute(object):
         self.exact_matches = ((pattern, kwargs),)
         self.kwargs = kwargs
 
-    def equals_match(self, path):
-        """If the ``path`` exactly equals pattern string,
-        return end index of substring matched and a copy
-        of ``self.kwargs``.
+    def equals_match(self, path, pos=0):
+        """If the ``path`` from position ``pos`` exactly equals
+        pattern string, return end index of substring matched
+        and ``self.kwargs``.
         """
+        if pos:
+            if len(path) - pos == self.matched and path.startswith(
+                self.pattern, pos
+            ):
+                return len(path), self.kwargs
+            return -1, None
         return (
             path == self.pattern and (self.matched, self.kwargs) or (-1, None)
         )
 
-    def startswith_match(self, path):
-        """If the ``path`` starts with pattern string, return
-        the end of substring matched and ``self.kwargs``.
+    def startswith_match(self, path, pos=0):
+        """If the ``path`` starts with pattern string at position
+        ``pos``, return the end of substring matched and
+        ``self.kwargs``.
         """
         return (
-            path.startswith(self.pattern)
-            and (self.matched, self.kwargs)
+            path.startswith(self.pattern, pos)
+            and (pos + self.matched, self.kwargs)
             or (-1, None)
         )
 
@@ -2,8 +2,25 @@
 
 import re
 
+from wheezy.routing.cache import LRUCache
 from wheezy.routing.utils import outer_split
 
+try:
+    from re import _parser as sre_parse
+except ImportError:  # pragma: nocover
+    import sre_parse
+
+# pattern => (path_format, names), identical patterns are parsed once
+parse_cache = LRUCache(1024)
+
+# a regex pattern that matches at most that many literal paths is
+# registered as exact paths
+max_literals = 16
+
+# a pattern with a class escape, a negated set or an unescaped ``.``,
+# ``+`` or ``*`` is not a finite set of literals, so it is not parsed
+RE_NOT_LITERALS = re.compile(r"\\[dDwWsS]|\[\^|(?:^|[^\\])(?:\\\\)*[.+*]")
+
 
 def try_build_regex_route(pattern, finishing=True, kwargs=None, name=None):
     """There is no special tests to match regex selection
@@ -14,6 +31,52 @@ def try_build_regex_route(pattern, finishing=True, kwargs=None, name=None):
     return RegexRoute(pattern, finishing, kwargs, name)
 
 
+def try_build_lazy_regex_route(
+    pattern, finishing=True, kwargs=None, name=None
+):
+    """Same as ``try_build_regex_route`` but the regex is compiled
+    on the first match attempt.
+    """
+    if isinstance(pattern, RegexRoute):
+        return pattern
+    return RegexRoute(pattern, finishing, kwargs, name, lazy=True)
+
+
+class LazyRegex(object):
+    """A regex that is compiled on the first match attempt.
+
+    >>> r = LazyRegex('abc/(?P<id>\\\\d+)$')
+    >>> r.compiled
+    >>> r.match('abc/1').end()
+    5
+    >>> r.compiled.pattern
+    'abc/(?P<id>\\\\d+)$'
+    """
+
+    __slots__ = ("pattern", "compiled", "match")
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.compiled = None
+        self.match = self.compile_and_match
+
+    def __reduce__(self):
+        return LazyRegex, (self.pattern,)
+
+    def compile(self):
+        """Compiles the pattern unless it is already compiled.
+        Returns the compiled regex.
+        """
+        compiled = self.compiled
+        if compiled is None:
+            compiled = self.compiled = re.compile(self.pattern)
+            self.match = compiled.match
+        return compiled
+
+    def compile_and_match(self, string, pos=0):
+        return self.compile().match(string, pos)
+
+
 class RegexRoute(object):
     """Route based on regular expression matching."""
 
@@ -25,14 +88,34 @@ class RegexRoute(object):
         "path_format",
         "kwargs",
         "regex",
+        "converters",
+        "defaults",
+        "exact_matches",
+        "literals",
     )
 
-    exact_matches = None
-
-    def __init__(self, pattern, finishing=True, kwargs=None, name=None):
+    def __init__(
+        self,
+        pattern,
+        finishing=True,
+        kwargs=None,
+        name=None,
+        converters=None,
+        lazy=False,
+    ):
+        """``converters`` is a dict of group name to a pair of
+        functions ``(to_python, to_path)``. If ``lazy`` is true the
+        regex is compiled on the first match attempt.
+        """
         pattern = pattern.lstrip("^").rstrip("$")
+        # see ``promote``
+        self.exact_matches = self.literals = None
         # Choose match strategy
-        self.path_format, names = parse_pattern(pattern)
+        parsed = parse_cache.get(pattern)
+        if parsed is None:
+            parsed = parse_pattern(pattern)
+            parse_cache.put(pattern, parsed)
+        self.path_format, names = parsed
         if kwargs:
             self.kwargs = dict.fromkeys(names, "")
             self.kwargs.update(kwargs)
@@ -42,42 +125,80 @@ class RegexRoute(object):
             self.path = self.path_with_kwargs
             self.path_value = self.path_format % self.kwargs
         else:
+            self.kwargs = None
             if finishing:
                 self.name = name
                 self.match = self.match_no_kwargs_finishing
             else:
                 self.match = self.match_no_kwargs
             self.path = self.path_no_kwargs
+        if converters:
+            self.converters = tuple(
+                (n, to_python, to_path)
+                for n, (to_python, to_path) in converters.items()
+                if n in names
+            )
+            # kwargs added to converted values of a match
+            if kwargs:
+                self.defaults = self.kwargs
+            elif finishing:
+                self.defaults = {"route_name": name}
+            else:
+                self.defaults = None
+            self.match = self.match_with_converters
+            self.path = self.path_with_converters
+        else:
+            self.converters = None
 
-        pattern = "^" + pattern
+        # anchored by ``regex.match`` at given position
         if finishing:
             pattern = pattern + "$"
-        self.regex = re.compile(pattern)
+        self.regex = LazyRegex(pattern) if lazy else re.compile(pattern)
 
-    def match_no_kwargs(self, path):
+    def match_no_kwargs(self, path, pos=0):
         """If the ``path`` match the regex pattern."""
-        m = self.regex.match(path)
+        m = self.regex.match(path, pos)
         if m:
             return m.end(), m.groupdict()
         return -1, None
 
-    def match_no_kwargs_finishing(self, path):
+    def match_no_kwargs_finishing(self, path, pos=0):
         """If the ``path`` match the regex pattern."""
-        m = self.regex.match(path)
+        m = self.regex.match(path, pos)
         if m:
             kwargs = m.groupdict()
             kwargs["route_name"] = self.name
             return m.end(), kwargs
         return -1, None
 
-    def match_with_kwargs(self, path):
+    def match_with_kwargs(self, path, pos=0):
         """If the ``path`` match the regex pattern."""
-        m = self.regex.match(path)
+        m = self.regex.match(path, pos)
         if m:
             kwargs = m.groupdict()
             return (m.end(), dict(self.kwargs, **kwargs))
         return -1, None
 
+    def match_with_converters(self, path, pos=0):
+        """If the ``path`` match the regex pattern and all values
+        of named groups are converted. A value that can not be
+        converted (``ValueError``) is a mismatch.
+        """
+        m = self.regex.match(path, pos)
+        if m:
+            kwargs = m.groupdict()
+            try:
+                for name, to_python, to_path in self.converters:
+                    value = kwargs[name]
+                    if value is not None:
+                        kwargs[name] = to_python(value)
+            except ValueError:
+                return -1, None
+            if self.defaults:
+                return m.end(), dict(self.defaults, **kwargs)
+            return m.end(), kwargs
+        return -1, None
+
     def path_with_kwargs(self, values=None):
         """Build the path for the given route by substituting
         the named places of the regual expression.
@@ -99,6 +220,125 @@ class RegexRoute(object):
         """
         return self.path_format % values
 
+    def path_with_converters(self, values=None):
+        """Build the path for the given route by substituting
+        the named places of the regual expression with values
+        converted to string.
+        """
+        if self.kwargs:
+            values = values and dict(self.kwargs, **values) or self.kwargs
+        values = dict(values or ())
+        for name, to_python, to_path in self.converters:
+            value = values.get(name)
+            if value is not None and not isinstance(value, str):
+                values[name] = to_path(value)
+        return self.path_format % values
+
+
+def convert_groups(m, converters):
+    """Returns values of named groups of match ``m`` converted by
+    ``converters``, a tupple of (name, to_python, to_path), or
+    ``None`` if a value can not be converted.
+
+    >>> m = re.match(r'(?P<id>\\w+)', '12')
+    >>> convert_groups(m, (('id', int, str),))
+    {'id': 12}
+    >>> m = re.match(r'(?P<id>\\w+)', 'x')
+    >>> convert_groups(m, (('id', int, str),))
+    """
+    values = m.groupdict()
+    try:
+        for name, to_python, to_path in converters:
+            value = values[name]
+            if value is not None:
+                values[name] = to_python(value)
+    except ValueError:
+        return None
+    return values
+
+
+def literals(pattern, limit=None):
+    """Returns a list of literal paths that are the only matches of
+    regex ``pattern`` or ``None`` if the pattern is not a finite set
+    of literals or there are more than ``limit`` of them.
+
+    >>> literals(r'help\\.html')
+    ['help.html']
+    >>> literals('(?P<locale>en|ru)/items?')
+    ['en/item', 'en/items', 'ru/item', 'ru/items']
+    >>> literals(r'posts/\\d+'), literals('(?i)about'), literals('[ab]', 1)
+    (None, None, None)
+    """
+    if RE_NOT_LITERALS.search(pattern):
+        return None
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return None
+    if parsed.state.flags & ~sre_parse.SRE_FLAG_UNICODE:
+        return None
+    paths = expand(parsed, limit or max_literals)
+    return paths and list(dict.fromkeys(paths))
+
+
+def expand(items, limit):
+    """Returns a list of strings matched by parsed regex ``items``
+    or ``None``.
+    """
+    paths = [""]
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            options = [chr(av)]
+        elif op is sre_parse.SUBPATTERN:
+            group, add_flags, del_flags, p = av
+            options = not add_flags and not del_flags and expand(p, limit)
+        elif op is sre_parse.BRANCH:
+            options = expand_branch(av, limit)
+        elif op is sre_parse.IN:
+            options = [chr(a) for o, a in av if o is sre_parse.LITERAL]
+            if len(options) < len(av):
+                return None
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            options = expand_repeat(av, limit)
+        else:
+            return None
+        if not options:
+            return None
+        paths = [path + option for path in paths for option in options]
+        if len(paths) > limit:
+            return None
+    return paths
+
+
+def expand_branch(av, limit):
+    """Returns a list of strings matched by any of alternatives."""
+    options = []
+    for p in av[1]:
+        option = expand(p, limit)
+        if not option:
+            return None
+        options.extend(option)
+    return options
+
+
+def expand_repeat(av, limit):
+    """Returns a list of strings matched by a bounded repeat."""
+    lo, hi, p = av
+    if hi is sre_parse.MAXREPEAT or hi > limit:
+        return None
+    options = expand(p, limit)
+    if not options:
+        return None
+    repeated = [""]
+    result = [""] if lo == 0 else []
+    for n in range(1, hi + 1):
+        repeated = [r + o for r in repeated for o in options]
+        if len(repeated) > limit:
+            return None
+        if n >= lo:
+            result.extend(repeated)
+    return result
+
 
 RE_SPLIT = re.compile(r"\<(\w+)\>")
 
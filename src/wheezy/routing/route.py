@@ -3,9 +3,9 @@ class Route(object):
 
     exact_matches = None
 
-    def match(self, path):
-        """if the ``path`` matches, return the end of
-        substring matched and kwargs. Otherwise
+    def match(self, path, pos=0):
+        """if the ``path`` matches at position ``pos``, return
+        the end of substring matched and kwargs. Otherwise
         return ``(-1, None)``.
         """
         raise NotImplementedError()
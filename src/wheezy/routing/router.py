@@ -1,15 +1,37 @@
+from bisect import bisect_left
 from warnings import warn
 
+from wheezy.routing.batch import (
+    literal_prefix,
+    match_each,
+    match_many,
+    next_prefix,
+)
 from wheezy.routing.builders import build_route
+from wheezy.routing.cache import LRUCache
+from wheezy.routing.choice import ChoiceRoute
+from wheezy.routing.codegen import GeneratedRouter
+from wheezy.routing.compact import CompactRouter
 from wheezy.routing.config import route_builders as default_route_builders
+from wheezy.routing.frozen import FrozenRouter
+from wheezy.routing.fused import FusedRouter, fuse
+from wheezy.routing.lazy import LazyRouter, resolve_lock
+from wheezy.routing.methods import MethodHandlers, resolve_method
+from wheezy.routing.order import reorder
+from wheezy.routing.paths import compile_path
+from wheezy.routing.plain import PlainRoute
+from wheezy.routing.regex import LazyRegex, RegexRoute
+from wheezy.routing.stats import RouterStats, instrumented_class
 from wheezy.routing.utils import route_name
 
 
-def url(pattern, handler, kwargs=None, name=None):
-    """Converts parameters to tupple of length four.
-    Used for convenience to name parameters and skip
-    unused.
+def url(pattern, handler, kwargs=None, name=None, methods=None):
+    """Converts parameters to tupple of length four (five if
+    ``methods`` are given). Used for convenience to name
+    parameters and skip unused.
     """
+    if methods:
+        return pattern, handler, kwargs, name, methods
     return pattern, handler, kwargs, name
 
 
@@ -21,27 +43,64 @@ class PathRouter(object):
         "match_map",
         "path_map",
         "inner_path_map",
+        "path_builders",
         "route_builders",
+        "cache",
+        "route_stats",
+        "method_tables",
+        "lazy_includes",
     )
 
-    def __init__(self, route_builders=None):
-        """"""
+    def __init__(self, route_builders=None, cache_size=None):
+        """``cache_size`` enables the cache of that many dynamic
+        matches, that are not found by exact path.
+        """
         self.route_builders = route_builders or default_route_builders
+        self.cache = LRUCache(cache_size) if cache_size else None
+        self.route_stats = None
         # match
         self.match_map = {}
         self.mapping = []
+        self.method_tables = {}
         # path
         self.path_map = {}
         self.inner_path_map = {}
+        self.path_builders = {}
+        self.lazy_includes = []
 
-    def add_route(self, pattern, handler, kwargs=None, name=None):
-        """Adds a pattern to route table"""
+    def add_route(
+        self, pattern, handler, kwargs=None, name=None, methods=None
+    ):
+        """Adds a pattern to route table. If ``methods`` are given,
+        the route serves these HTTP methods only, see
+        ``match_method``. Routes with the same ``pattern`` share one
+        entry in route table and ``kwargs`` of the first one.
+        """
+        self.assert_not_frozen()
         name = name or route_name(handler)
+        if methods:
+            table = self.method_tables.get(pattern)
+            if table is not None:
+                handlers, first_name = table
+                handlers.add(methods, handler, name)
+                if name != first_name:
+                    if name in self.path_map:  # pragma: nocover
+                        warn("PathRouter: overriding route: %s." % name)
+                    self.path_map[name] = self.path_map[first_name]
+                    self.path_builders.pop(name, None)
+                return
+            handlers = MethodHandlers()
+            handlers.add(methods, handler, name)
+            self.method_tables[pattern] = (handlers, name)
+            handler = handlers
         if name in self.path_map:  # pragma: nocover
             warn("PathRouter: overriding route: %s." % name)
         # build finishing route
-        route = build_route(pattern, True, kwargs, name, self.route_builders)
+        route = build_route(
+            pattern, True, kwargs, name, self.route_builders, self.mapping
+        )
         self.path_map[name] = route.path
+        self.path_builders.pop(name, None)
         if route.exact_matches:
             for pattern, kwargs in route.exact_matches:
                 if pattern in self.match_map:  # pragma: nocover
@@ -52,9 +111,20 @@ class PathRouter(object):
             self.mapping.append((route.match, handler))
 
     def include(self, pattern, included, kwargs=None):
-        """Includes nested routes below the current."""
+        """Includes nested routes below the current. ``included`` is
+        a list of routes, a router, or a dotted name or callable
+        resolved to one of them on first use, see ``LazyRouter``.
+        """
+        self.assert_not_frozen()
         # try build intermediate route
-        route = build_route(pattern, False, kwargs, None, self.route_builders)
+        route = build_route(
+            pattern, False, kwargs, None, self.route_builders, self.mapping
+        )
+        if isinstance(included, str) or callable(included):
+            included = LazyRouter(included)
+        if isinstance(included, LazyRouter):
+            self.include_lazy(route, included)
+            return
         if not isinstance(included, PathRouter):
             router = PathRouter(self.route_builders)
             router.add_routes(included)
@@ -73,54 +143,458 @@ class PathRouter(object):
                 self.mapping.append((route.match, included))
         else:
             self.mapping.append((route.match, included))
-        route_path = route.path
+        self.take_paths(route.path, included)
+        # print('include %s => %s / %s' % (pattern, len(self.match_map),
+        #                                 len(included.mapping)))
+
+    def include_lazy(self, route, included):
+        """Includes a lazy router below the intermediate ``route``."""
+        if included.router_class is None:
+            included.router_class = PathRouter
+            included.route_builders = self.route_builders
+        route.exact_matches = None
+        self.mapping.append((route.match, included))
+        self.lazy_includes.append(((route.path,), included))
+
+    def take_paths(self, route_path, included):
+        """Takes over path builders of the ``included`` router, the
+        path of a route is prefixed with ``route_path``.
+        """
+        path_builders = self.path_builders
         for name, path in included.path_map.items():
             if name in self.inner_path_map:  # pragma: nocover
                 warn("PathRouter: overriding route: %s." % name)
             self.inner_path_map[name] = (route_path, path)
+            path_builders.pop(name, None)
         included.path_map = None
         for name, paths in included.inner_path_map.items():
             if name in self.inner_path_map:  # pragma: nocover
                 warn("PathRouter: overriding route: %s." % name)
-            self.inner_path_map[name] = tuple([route_path] + list(paths))
+            paths = tuple([route_path] + list(paths))
+            self.inner_path_map[name] = paths
+            path_builders.pop(name, None)
         included.inner_path_map = None
-        # print('include %s => %s / %s' % (pattern, len(self.match_map),
-        #                                 len(included.mapping)))
+        included.path_builders = {}
+        for paths, lazy in included.lazy_includes:
+            self.lazy_includes.append(((route_path,) + paths, lazy))
+        included.lazy_includes = []
 
     def add_routes(self, mapping):
         """Adds routes represented as a list of tuple
-        (pattern, handler, kwargs=None, name=None) to route table.
+        (pattern, handler, kwargs=None, name=None, methods=None)
+        to route table.
         """
         for m in mapping:
             length = len(m)
-            kwargs, name = None, None
+            kwargs, name, methods = None, None, None
             if length == 2:
                 pattern, handler = m
             elif length == 3:
                 pattern, handler, kwargs = m
-            else:
+            elif length == 4:
                 pattern, handler, kwargs, name = m
-            if isinstance(handler, (tuple, list, PathRouter)):
+            else:
+                pattern, handler, kwargs, name, methods = m
+            if isinstance(handler, (tuple, list, PathRouter, LazyRouter)):
                 self.include(pattern, handler, kwargs)
             else:
-                self.add_route(pattern, handler, kwargs, name)
+                self.add_route(pattern, handler, kwargs, name, methods)
         # print('add_routes => %s / %s' % (len(self.match_map),
         #                                 len(self.mapping)))
 
-    def match(self, path):
-        """Tries to find a match for the given path in route table.
-        Returns a tupple of (handler, kwargs)
+    def copy(self):
+        """Returns a copy of this router that can be changed without
+        affecting this one. Compiled routes and nested routers are
+        shared, the match cache of the copy starts empty.
+        """
+        router = self.__class__.__new__(self.__class__)
+        self.copy_into(router)
+        if self.method_tables:
+            # method handlers are changed in place by ``add_route``
+            replaced = {}
+            for pattern, (handlers, name) in self.method_tables.items():
+                copied = handlers.copy()
+                replaced[id(handlers)] = copied
+                router.method_tables[pattern] = (copied, name)
+            router.replace_handlers(replaced)
+        return router
+
+    def copy_into(self, router):
+        """Copies the route table of this router to the ``router``."""
+        router.route_builders = self.route_builders
+        cache = self.cache
+        router.cache = LRUCache(cache.size) if cache is not None else None
+        router.route_stats = self.route_stats
+        router.match_map = self.match_map.copy()
+        router.mapping = list(self.mapping)
+        router.method_tables = {}
+        router.path_map = copy_or_none(self.path_map)
+        router.inner_path_map = copy_or_none(self.inner_path_map)
+        router.path_builders = self.path_builders.copy()
+        router.lazy_includes = list(self.lazy_includes)
+
+    def replace_handlers(self, replaced):
+        """Replaces handlers in route table by ``replaced``, a mapping
+        of ``id`` of a handler to the new one.
+        """
+        self.mapping = [
+            (match, replaced.get(id(handler), handler))
+            for match, handler in self.mapping
+        ]
+        for key, (handler, kwargs) in list(self.match_map.items()):
+            if id(handler) in replaced:
+                self.match_map[key] = (replaced[id(handler)], kwargs)
+
+    def remove_route(self, name, copy_nested=False):
+        """Removes the route with the given name together with all
+        names the route is known by. Only entries of the route are
+        removed from route table, the pattern of a fused router the
+        route is a branch of is not recompiled. If ``copy_nested`` is
+        true nested routers on the way to the route are copied before
+        change, so they are left intact for routers that share them,
+        see ``copy``.
+        """
+        self.assert_not_frozen()
+        located = self.locate(name, copy_nested)
+        self.discard(located)
+
+    def replace_route(
+        self,
+        name,
+        pattern,
+        handler,
+        kwargs=None,
+        methods=None,
+        copy_nested=False,
+    ):
+        """Replaces the route with the given name by a new one at the
+        same position in route table, the new one is added to the end
+        of route table if the old one is an exact path. The match cache
+        is cleared.
+        """
+        self.assert_not_frozen()
+        located = self.locate(name, copy_nested)
+        names, paths, routers, owner, prefixes = located
+        router = routers[-1]
+        route = build_route(
+            pattern, True, kwargs, name, router.route_builders, router.mapping
+        )
+        if len(routers) < len(paths) and not route.exact_matches:
+            raise ValueError(
+                "PathRouter: %s can be replaced by an exact path only." % name
+            )
+        position = self.discard(located)
+        if methods:
+            handlers = MethodHandlers()
+            handlers.add(methods, handler, name)
+            if len(routers) == len(paths):
+                router.method_tables[pattern] = (handlers, name)
+            handler = handlers
+        paths = paths[:-1] + (route.path,)
+        if len(paths) == 1:
+            self.path_map[name] = route.path
+        else:
+            self.inner_path_map[name] = paths
+        self.path_builders.pop(name, None)
+        if route.exact_matches:
+            add_exact(owner.match_map, route.exact_matches, prefixes, handler)
+            route.exact_matches = None
+        else:
+            insert_entry(router.mapping, position, (route.match, handler))
+        for r in routers:
+            if r.cache is not None:
+                r.cache.clear()
+
+    def locate(self, name, copy_nested=False):
+        """Finds the route with the given name. Returns a tupple of
+        (names, paths, routers, owner, prefixes): names the route is
+        known by, paths of the route and routes it is included by,
+        routers on the way to the route, the router that keeps exact
+        paths of the route and a list of tupples (prefix, kwargs) of
+        these paths.
+        """
+        names, paths = self.find_paths(name)
+        routers = [self]
+        owner = self
+        prefixes = [("", None)]
+        for path in paths[:-1]:
+            route = path.__self__
+            pairs = exact_pairs(route)
+            handler = None
+            if routers[-1] is not None:
+                mapping = routers[-1].mapping
+                i = route_index(mapping, route)
+                # routes included by exact path only are not in mapping
+                if i >= 0:
+                    match, handler = mapping[i]
+            if handler is not None:
+                if isinstance(handler, LazyRouter):
+                    handler = handler.resolve()
+                    pairs = None
+                if type(handler).remove_route is not PathRouter.remove_route:
+                    raise TypeError(
+                        "%s: routes can not be removed."
+                        % type(handler).__name__
+                    )
+                if copy_nested:
+                    handler = handler.copy()
+                    mapping[i] = (match, handler)
+            if pairs is None:
+                owner = handler
+                prefixes = [("", None)]
+            else:
+                prefixes = [
+                    (p + q, merge_kwargs(kw, kw2))
+                    for p, kw in prefixes
+                    for q, kw2 in pairs
+                ]
+            routers.append(handler)
+        while routers[-1] is None:
+            routers.pop()
+        return names, paths, routers, owner, prefixes
+
+    def find_paths(self, name):
+        """Returns a tupple of (names, paths): names the route with the
+        given name is known by and paths of the route and routes it is
+        included by. Lazy includes are resolved for an unknown name.
+        """
+        if (
+            name not in self.path_map
+            and name not in self.inner_path_map
+            and self.lazy_includes
+        ):
+            self.resolve_includes()
+        if name in self.path_map:
+            path = self.path_map[name]
+            return [n for n, p in self.path_map.items() if p == path], (path,)
+        paths = self.inner_path_map[name]
+        return [n for n, p in self.inner_path_map.items() if p == paths], paths
+
+    def discard(self, located):
+        """Removes the route found by ``locate`` from route table.
+        Returns a tupple of (index, fused_index) of the route in route
+        table of the router it is added to, ``fused_index`` is
+        ``None`` unless the route is a branch of a fused router, or
+        ``None`` if the route is an exact path.
+        """
+        names, paths, routers, owner, prefixes = located
+        self.forget(names, len(paths) > 1)
+        for r in routers:
+            if r.cache is not None:
+                r.cache.discard(
+                    lambda key, value: value[1].get("route_name") in names
+                )
+        router = routers[-1]
+        if len(routers) == len(paths):
+            for pattern, table in list(router.method_tables.items()):
+                if table[1] in names:
+                    del router.method_tables[pattern]
+        route = paths[-1].__self__
+        pairs = exact_pairs(route)
+        if pairs is not None:
+            discard_exact(owner.match_map, pairs, prefixes, names)
+            return None
+        return discard_entry(router.mapping, route)
+
+    def forget(self, names, inner):
+        """Removes the given names from path map, or from inner path
+        map if ``inner`` is true.
+        """
+        if inner:
+            path_map = self.inner_path_map
+        else:
+            path_map = self.path_map
+        for n in names:
+            del path_map[n]
+            self.path_builders.pop(n, None)
+
+    def fuse(self, min_size=2):
+        """Compiles adjacent finishing regex routes of this and
+        nested routers into a single alternation pattern, so one
+        regex scan finds the matched route. Call it once all routes
+        are added.
+        """
+        for _, handler in self.mapping:
+            if isinstance(handler, PathRouter):
+                handler.fuse(min_size)
+        self.mapping = fuse(self.mapping, min_size)
+
+    def warm(self, names=None):
+        """Compiles lazy regexes of routes with the given names and
+        of routes they are included by, all routes if ``names`` is
+        ``None``, see ``lazy_route_builders``.
+        """
+        path_map = self.path_map
+        inner_path_map = self.inner_path_map
+        if names is None:
+            names = list(path_map) + list(inner_path_map)
+        for name in names:
+            if name in path_map:
+                paths = (path_map[name],)
+            else:
+                paths = inner_path_map[name]
+            for path in paths:
+                regex = getattr(getattr(path, "__self__", None), "regex", None)
+                if isinstance(regex, LazyRegex):
+                    regex.compile()
+
+    def resolve_includes(self):
+        """Resolves lazy includes of this and nested routers, so names
+        of their routes are known to ``path_for``.
+        """
+        with resolve_lock:
+            lazy_includes = self.lazy_includes
+            while lazy_includes:
+                route_paths, included = lazy_includes.pop(0)
+                router = included.resolve()
+                for name, path in router.path_map.items():
+                    if name in self.inner_path_map:  # pragma: nocover
+                        warn("PathRouter: overriding route: %s." % name)
+                    paths = route_paths + (path,)
+                    self.inner_path_map[name] = paths
+                    self.path_builders.pop(name, None)
+                for name, paths in router.inner_path_map.items():
+                    if name in self.inner_path_map:  # pragma: nocover
+                        warn("PathRouter: overriding route: %s." % name)
+                    paths = route_paths + paths
+                    self.inner_path_map[name] = paths
+                    self.path_builders.pop(name, None)
+                for paths, lazy in router.lazy_includes:
+                    lazy_includes.append((route_paths + paths, lazy))
+
+    def freeze(self):
+        """Returns a read-only matcher with nested routers flattened.
+        Call it once all routes are added, any attempt to add a route
+        to this router afterwards raises ``RuntimeError``. Lazy
+        includes are resolved.
+        """
+        self.resolve_includes()
+        frozen = FrozenRouter(self)
+        self.lock()
+        return frozen
+
+    def compact(self):
+        """Returns a read-only matcher like ``freeze`` does, with the
+        route table kept in fewer objects, see ``CompactRouter``.
+        """
+        return CompactRouter(self.freeze())
+
+    def generate(self, debug=False):
+        """Returns a read-only matcher with the route table compiled
+        into a single generated function, see ``GeneratedRouter``.
+        Call it once all routes are added, any attempt to add a route
+        to this router afterwards raises ``RuntimeError``. Lazy
+        includes are resolved. If ``debug`` is true the generated
+        source is kept in ``source`` attribute of the matcher.
+        """
+        self.resolve_includes()
+        generated = GeneratedRouter(self, debug)
+        self.lock()
+        return generated
+
+    def instrument(self, reorder_every=0):
+        """Starts collecting stats of this and nested routers, see
+        ``stats``. Routers are switched to a subclass with
+        instrumented ``match``, so there is no overhead otherwise.
+
+        If ``reorder_every`` is positive, routes of each router are
+        reordered by hits once per that many hits, see ``reorder``.
+        """
+        for _, handler in self.mapping:
+            if isinstance(handler, PathRouter):
+                handler.instrument(reorder_every)
+        if self.route_stats is None:
+            cls = self.__class__
+            self.__class__ = instrumented_class(
+                cls, cls.scan is PathRouter.scan
+            )
+        self.route_stats = RouterStats(reorder_every)
+
+    def uninstrument(self):
+        """Stops collecting stats of this and nested routers."""
+        for _, handler in self.mapping:
+            if isinstance(handler, PathRouter):
+                handler.uninstrument()
+        if self.route_stats is not None:
+            self.__class__ = self.__class__.__bases__[0]
+            self.route_stats = None
+
+    def reorder(self):
+        """Moves the most hit routes towards the beginning of the route
+        table using stats collected since ``instrument`` call. A route
+        is never moved before a route that can match the same path,
+        that is decided by literal prefixes of routes, so the first
+        route that matches still wins.
+        """
+        stats = self.route_stats
+        if stats is None:
+            raise RuntimeError("PathRouter: the router is not instrumented.")
+        mapping = self.mapping
+        order = reorder(mapping, stats.hits)
+        self.mapping = [mapping[i] for i in order]
+        stats.remap(order)
+
+    def stats(self):
+        """Returns a snapshot of stats collected since ``instrument``
+        call or ``None`` if the router is not instrumented.
+        """
+        if self.route_stats is None:
+            return None
+        return self.route_stats.snapshot(self.mapping)
+
+    def lock(self):
+        self.route_builders = None
+        for _, handler in self.mapping:
+            if isinstance(handler, PathRouter):
+                handler.lock()
+
+    def assert_not_frozen(self):
+        if self.route_builders is None:
+            raise RuntimeError("PathRouter: the router is frozen.")
+
+    def match(self, path, pos=0):
+        """Tries to find a match for the given path in route table
+        starting at position ``pos``. Returns a tupple of
+        (handler, kwargs)
+        """
+        match_map = self.match_map
+        if match_map:
+            key = path[pos:] if pos else path
+            if key in match_map:
+                return match_map[key]
+        cache = self.cache
+        if cache is None:
+            return self.scan(path, pos)
+        key = path[pos:] if pos else path
+        hit = cache.get(key)
+        if hit is not None:
+            return hit[0], hit[1].copy()
+        handler, kwargs = self.scan(path, pos)
+        if handler is not None:
+            cache.put(key, (handler, kwargs.copy()))
+        return handler, kwargs
+
+    def match_method(self, path, method, pos=0):
+        """Tries to find a match for the given path and HTTP method.
+        Returns a tupple of (handler, kwargs, allowed), where handler
+        is ``None`` and ``allowed`` is a set of allowed methods if the
+        route does not serve the ``method``; ``allowed`` is ``None``
+        if the handler serves any method.
+        """
+        return resolve_method(self.match(path, pos), method)
+
+    def scan(self, path, pos=0):
+        """Tries to find a match for the given path in ordered
+        routes. Returns a tupple of (handler, kwargs)
         """
-        if path in self.match_map:
-            return self.match_map[path]
         for match, handler in self.mapping:
-            matched, kwargs = match(path)
+            matched, kwargs = match(path, pos)
             if matched >= 0:
                 # TODO: isinstance(handler, PathRouter)
                 match = getattr(handler, "match", None)
                 if not match:
                     return handler, kwargs
-                handler, kwargs_inner = match(path[matched:])
+                handler, kwargs_inner = match(path, matched)
                 if handler:
                     if not kwargs:
                         return handler, kwargs_inner
@@ -129,11 +603,267 @@ class PathRouter(object):
                     return handler, kwargs
         return None, {}
 
+    def match_many(self, paths, window=1024):
+        """Yields a tupple of (handler, kwargs) for each path of
+        iterable ``paths``, see ``match_batch``. A path repeated within
+        ``window`` paths is matched once.
+        """
+        return match_many(self.match_batch, paths, window)
+
+    def match_batch(self, paths, pos=0):
+        """Returns a dict of path to a tupple of (handler, kwargs) for
+        each of unique ``paths``. The route table is scanned once for
+        all paths that are not exact matches or cached, see
+        ``scan_batch``: paths matched by an intermediate route are
+        passed to the nested router together.
+        """
+        cls = type(self)
+        if (
+            cls.match is not PathRouter.match
+            or cls.scan is not PathRouter.scan
+        ):
+            # instrumented or trie router
+            return match_each(self.match, paths, pos)
+        match_map = self.match_map or {}
+        if pos:
+            results = {
+                path: match_map[path[pos:]]
+                for path in paths
+                if path[pos:] in match_map
+            }
+        else:
+            results = {
+                path: match_map[path] for path in paths if path in match_map
+            }
+        if len(results) == len(paths):
+            return results
+        pending = [path for path in paths if path not in results]
+        cache = self.cache
+        if cache is not None:
+            pending = get_cached(cache, pending, pos, results)
+            if not pending:
+                return results
+        missed = self.scan_batch(pending, pos, results)
+        if cache is not None:
+            put_cached(cache, pending, pos, results)
+        for path in missed:
+            results[path] = None, {}
+        return results
+
+    def scan_batch(self, paths, pos, results):
+        """Tries to find a match for each of ``paths`` in ordered
+        routes and stores it in ``results``. Returns a list of paths
+        with no match.
+
+        Paths are sorted, so a route with a literal prefix is tried
+        only with the range of paths that start with it.
+        """
+        items = sorted([(path[pos:], path) for path in paths])
+        keys = [key for key, path in items]
+        paths = [path for key, path in items]
+        n = len(paths)
+        done = [False] * n
+        left = n
+        for match, handler in self.mapping:
+            if not left:
+                break
+            prefix = literal_prefix(match)
+            if prefix:
+                lo = bisect_left(keys, prefix)
+                hi = bisect_left(keys, next_prefix(prefix), lo)
+            else:
+                lo, hi = 0, n
+            nested = hasattr(handler, "match")
+            groups = {}
+            for i in range(lo, hi):
+                if done[i]:
+                    continue
+                matched, kwargs = match(paths[i], pos)
+                if matched < 0:
+                    continue
+                if nested:
+                    groups.setdefault(matched, []).append((i, kwargs))
+                else:
+                    results[paths[i]] = handler, kwargs
+                    done[i] = True
+                    left -= 1
+            for i in match_nested(handler, groups, paths, results):
+                done[i] = True
+                left -= 1
+        return [path for i, path in enumerate(paths) if not done[i]]
+
     def path_for(self, name, **kwargs):
         """Returns the url for the given route name."""
+        try:
+            path = self.path_builders[name]
+        except KeyError:
+            path = self.path_builder(name)
+        return path(kwargs)
+
+    def path_for_many(self, items):
+        """Returns a list of urls for the given iterable of tupples
+        (name, kwargs).
+        """
+        path_builders = self.path_builders
+        path_builder = self.path_builder
+        return [
+            (path_builders.get(name) or path_builder(name))(kwargs or {})
+            for name, kwargs in items
+        ]
+
+    def path_builder(self, name):
+        """Returns the path function of the route with the given
+        name, it is compiled on first use.
+        """
         if name in self.path_map:
-            return self.path_map[name](kwargs)
+            paths = (self.path_map[name],)
         else:
-            return "".join(
-                [path(kwargs) for path in self.inner_path_map[name]]
-            )
+            if name not in self.inner_path_map and self.lazy_includes:
+                self.resolve_includes()
+            paths = self.inner_path_map[name]
+        path = self.path_builders[name] = compile_path(paths)
+        return path
+
+    def compile_paths(self):
+        """Compiles path functions of all known routes. Returns a
+        dict of route name to path function.
+        """
+        path_builder = self.path_builder
+        return {
+            name: path_builder(name)
+            for name in list(self.path_map) + list(self.inner_path_map)
+        }
+
+
+def copy_or_none(d):
+    return d.copy() if d is not None else None
+
+
+def get_cached(cache, paths, pos, results):
+    """Stores cached matches of ``paths`` in ``results``. Returns a
+    list of paths that are not cached.
+    """
+    missed = []
+    for path in paths:
+        hit = cache.get(path[pos:] if pos else path)
+        if hit is None:
+            missed.append(path)
+        else:
+            results[path] = hit[0], hit[1].copy()
+    return missed
+
+
+def put_cached(cache, paths, pos, results):
+    """Caches matches of ``paths`` found in ``results``."""
+    for path in paths:
+        handler, kwargs = results.get(path, (None, None))
+        if handler is not None:
+            cache.put(path[pos:] if pos else path, (handler, kwargs.copy()))
+
+
+def match_nested(handler, groups, paths, results):
+    """Matches paths by nested router ``handler`` and stores matches
+    in ``results``. ``groups`` is a dict of position to a list of
+    tupples (index of path, kwargs). Returns a list of indexes of
+    paths matched.
+    """
+    matched_indexes = []
+    batch = getattr(handler, "match_batch", None)
+    for pos, group in groups.items():
+        group_paths = [paths[i] for i, kwargs in group]
+        if batch is None:
+            found = match_each(handler.match, group_paths, pos)
+        else:
+            found = batch(group_paths, pos)
+        for i, kwargs in group:
+            handler_inner, kwargs_inner = found[paths[i]]
+            if handler_inner:
+                results[paths[i]] = (
+                    handler_inner,
+                    merge_kwargs(kwargs, kwargs_inner),
+                )
+                matched_indexes.append(i)
+    return matched_indexes
+
+
+def merge_kwargs(kwargs, kwargs_inner):
+    return dict(kwargs, **kwargs_inner) if kwargs else kwargs_inner
+
+
+def exact_pairs(route):
+    """Returns a list of tupples (path, kwargs) of exact paths of the
+    ``route`` or ``None`` if it is not an exact route.
+    """
+    if isinstance(route, PlainRoute):
+        return [(route.pattern, route.kwargs)]
+    if isinstance(route, ChoiceRoute):
+        if route.patterns is None:
+            return None
+        return [(p, kwargs) for p, (n, kwargs) in route.patterns]
+    if isinstance(route, RegexRoute):
+        return route.literals
+    return None
+
+
+def route_index(mapping, route):
+    """Returns the index of ``route`` in route table ``mapping`` or
+    -1 if it is not there.
+    """
+    for i, (match, _) in enumerate(mapping):
+        if getattr(match, "__self__", None) is route:
+            return i
+    return -1
+
+
+def add_exact(match_map, pairs, prefixes, handler):
+    """Adds exact paths of a route to ``match_map``, each of
+    ``pairs`` of (path, kwargs) below each of ``prefixes``.
+    """
+    for p, kw in pairs:
+        for prefix, prefix_kwargs in prefixes:
+            key = prefix + p
+            if key in match_map:  # pragma: nocover
+                warn("PathRouter: overriding path: %s." % key)
+            match_map[key] = (handler, merge_kwargs(prefix_kwargs, kw))
+
+
+def discard_exact(match_map, pairs, prefixes, names):
+    """Removes exact paths of a route known by ``names`` from
+    ``match_map``.
+    """
+    for p, _ in pairs:
+        for prefix, _ in prefixes:
+            value = match_map.get(prefix + p)
+            if value and value[1].get("route_name") in names:
+                del match_map[prefix + p]
+
+
+def insert_entry(mapping, position, entry):
+    """Puts ``entry`` at ``position`` returned by ``discard_entry``
+    or to the end of route table ``mapping`` if it is ``None``.
+    """
+    if position is None:
+        mapping.append(entry)
+        return
+    i, j = position
+    if j is None:
+        mapping.insert(i, entry)
+    else:
+        match, fused = mapping[i]
+        mapping[i] = (match, fused.replace(j, entry))
+
+
+def discard_entry(mapping, route):
+    """Removes ``route`` from route table ``mapping``. Returns a
+    tupple of (index, fused_index), see ``PathRouter.discard``.
+    """
+    for i, (match, handler) in enumerate(mapping):
+        if getattr(match, "__self__", None) is route:
+            del mapping[i]
+            return i, None
+        if isinstance(handler, FusedRouter):
+            for j, (m, _) in enumerate(handler.entries):
+                if getattr(m, "__self__", None) is route:
+                    mapping[i] = (match, handler.replace(j))
+                    return i, j
+    return None  # pragma: nocover
@@ -0,0 +1,170 @@
+import os
+import pickle
+from hashlib import sha1
+
+from wheezy.routing import __version__, config
+from wheezy.routing.cache import LRUCache
+from wheezy.routing.lazy import LazyRouter
+from wheezy.routing.router import PathRouter
+
+SNAPSHOT_VERSION = 1
+
+# lists of route builders that are pickled by name, so a restored
+# router refers to the same list, e.g. ``TrieRouter.splittable``
+BUILDERS = ("route_builders", "lazy_route_builders")
+
+
+def routes_hash(routes):
+    """Returns a hash of route table source: patterns, handlers
+    (by dotted name), kwargs and names. Lazy includes are imported,
+    their routes are hashed.
+
+    >>> routes_hash([('', 'h')]) == routes_hash([('', 'h')])
+    True
+    >>> routes_hash([('', 'h')]) == routes_hash([('', 'h', {})])
+    False
+    """
+    h = sha1(__version__.encode("ascii"))
+    h.update(describe(routes).encode("utf-8"))
+    return h.hexdigest()
+
+
+def describe(value):
+    """Returns a string that identifies the ``value`` of a route
+    table source.
+
+    >>> describe([('a', len, {'x': 1})])
+    "[('a', 'builtins:len', {'x': 1})]"
+    """
+    if isinstance(value, list):
+        return "[%s]" % ", ".join([describe(v) for v in value])
+    if isinstance(value, tuple):
+        return "(%s)" % ", ".join([describe(v) for v in value])
+    if isinstance(value, dict):
+        return repr(dict(sorted(value.items())))
+    if isinstance(value, LazyRouter):
+        # the included routes, so a change of them is not missed
+        value = value.load()
+        if not hasattr(value, "match"):
+            return describe(value)
+    if hasattr(value, "match") and hasattr(value, "path_for"):
+        raise TypeError("routes_hash: use a list of routes to include")
+    name = getattr(value, "__qualname__", None)
+    if name is not None:
+        return repr("%s:%s" % (getattr(value, "__module__", ""), name))
+    return repr(value)
+
+
+def dump(router, filename, source_hash):
+    """Writes a snapshot of a built ``router`` to ``filename``.
+    Handlers, converters, etc. are kept by reference, so they must
+    be importable by dotted name, or picklable.
+    """
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "wheezy.routing": __version__,
+        "source_hash": source_hash,
+    }
+    tmp = "%s.%d.tmp" % (filename, os.getpid())
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+            SnapshotPickler(f, pickle.HIGHEST_PROTOCOL).dump(router)
+        os.replace(tmp, filename)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def load(filename, source_hash):
+    """Returns a router restored from the snapshot in ``filename``
+    or ``None`` if there is no snapshot, it was made by another
+    version or for another ``source_hash``, or it refers to
+    a handler that can not be imported.
+
+    The snapshot is a pickle, load it from a trusted location only.
+    """
+    try:
+        with open(filename, "rb") as f:
+            header = pickle.load(f)
+            if header != {
+                "version": SNAPSHOT_VERSION,
+                "wheezy.routing": __version__,
+                "source_hash": source_hash,
+            }:
+                return None
+            return SnapshotUnpickler(f).load()
+    except (
+        OSError,
+        EOFError,
+        pickle.UnpicklingError,
+        AttributeError,
+        ImportError,
+    ):
+        return None
+
+
+def load_or_build(filename, routes, router_class=PathRouter):
+    """Returns a router restored from the snapshot in ``filename``
+    if it is built from the same ``routes``, otherwise builds the
+    router and writes a new snapshot.
+    """
+    source_hash = routes_hash(routes)
+    router = load(filename, source_hash)
+    if router is None:
+        router = router_class()
+        router.add_routes(routes)
+        dump(router, filename, source_hash)
+    return router
+
+
+class SnapshotPickler(pickle.Pickler):
+    """Pickles path routers without state that is rebuilt on
+    load: compiled path builders, the cache and the segment trie.
+    Default route builders are kept by name.
+    """
+
+    def reducer_override(self, obj):
+        if isinstance(obj, PathRouter):
+            return restore_router, (obj.__class__, router_state(obj))
+        return NotImplemented
+
+    def persistent_id(self, obj):
+        if isinstance(obj, list):
+            for name in BUILDERS:
+                if obj is getattr(config, name):
+                    return name
+        return None
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    """Restores route builders of ``wheezy.routing.config``."""
+
+    def persistent_load(self, pid):
+        if pid not in BUILDERS:
+            raise pickle.UnpicklingError("snapshot: unknown id %r" % pid)
+        return getattr(config, pid)
+
+
+def router_state(router):
+    if router.route_stats is not None:
+        raise ValueError("snapshot: uninstrument the router first.")
+    state = {}
+    for cls in router.__class__.__mro__:
+        for name in cls.__dict__.get("__slots__", ()):
+            state[name] = getattr(router, name)
+    state["path_builders"] = {}
+    cache = state["cache"]
+    state["cache"] = cache.size if cache is not None else None
+    if "trie" in state:
+        state["trie"] = None
+    return state
+
+
+def restore_router(cls, state):
+    router = cls.__new__(cls)
+    cache_size = state.pop("cache")
+    router.cache = LRUCache(cache_size) if cache_size else None
+    for name, value in state.items():
+        setattr(router, name, value)
+    return router
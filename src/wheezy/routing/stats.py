@@ -0,0 +1,179 @@
+from time import perf_counter
+
+instrumented_classes = {}
+
+
+class RouterStats(object):
+    """Counters of a router level: calls of ``match`` and their
+    latency histogram, calls of ``scan`` with hits per route in
+    route table, misses and a histogram of routes tried per scan.
+
+    The latency histogram has buckets by a power of two microseconds,
+    e.g. the bucket ``8`` counts matches that took from 4 to 8
+    microseconds.
+
+    If ``reorder_every`` is positive, ``hit`` returns ``True`` once
+    per that many hits, so the router can reorder its routes.
+
+    Concurrent access is safe, however counters are approximate.
+
+    >>> s = RouterStats()
+    >>> s.observe(0.000005)
+    >>> s.hit(1, 2)
+    False
+    >>> s.miss(3)
+    >>> snapshot = s.snapshot([('m0', 'h0'), ('m1', 'h1')])
+    >>> snapshot['latency'], snapshot['tries']
+    ({8: 1}, {2: 1, 3: 1})
+    >>> [route['hits'] for route in snapshot['routes']]
+    [0, 1]
+    """
+
+    __slots__ = (
+        "matches",
+        "latency",
+        "hits",
+        "misses",
+        "tries",
+        "reorder_every",
+        "countdown",
+    )
+
+    def __init__(self, reorder_every=0):
+        self.matches = 0
+        self.latency = [0] * 32
+        self.hits = {}
+        self.misses = 0
+        self.tries = {}
+        self.reorder_every = self.countdown = reorder_every
+
+    def observe(self, elapsed):
+        """Counts a call of ``match`` that took ``elapsed`` seconds."""
+        self.matches += 1
+        self.latency[min(int(elapsed * 1e6).bit_length(), 31)] += 1
+
+    def hit(self, index, tried):
+        """Counts a match of route at ``index`` after ``tried``
+        routes.
+        """
+        hits = self.hits
+        hits[index] = hits.get(index, 0) + 1
+        tries = self.tries
+        tries[tried] = tries.get(tried, 0) + 1
+        if self.reorder_every:
+            self.countdown -= 1
+            if self.countdown <= 0:
+                self.countdown = self.reorder_every
+                return True
+        return False
+
+    def remap(self, order):
+        """Moves hits after the route table is reordered, ``order``
+        is a list of old indices. Hits are halved, so the recent
+        traffic weighs more.
+        """
+        hits = self.hits
+        self.hits = {i: hits[j] // 2 for i, j in enumerate(order) if j in hits}
+
+    def miss(self, tried):
+        """Counts a scan where none of ``tried`` routes matched."""
+        self.misses += 1
+        tries = self.tries
+        tries[tried] = tries.get(tried, 0) + 1
+
+    def snapshot(self, mapping):
+        """Returns a dict with counters for the route table
+        ``mapping`` including stats of nested routers.
+        """
+        hits = self.hits
+        routes = []
+        for index, (match, handler) in enumerate(mapping):
+            route = {"route": describe(match), "hits": hits.get(index, 0)}
+            if getattr(handler, "route_stats", None) is not None:
+                route["nested"] = handler.stats()
+            routes.append(route)
+        return {
+            "matches": self.matches,
+            "scans": sum(self.tries.values()),
+            "misses": self.misses,
+            "tries": dict(sorted(self.tries.items())),
+            "latency": {1 << i: n for i, n in enumerate(self.latency) if n},
+            "routes": routes,
+        }
+
+
+def describe(match):
+    """Returns the pattern of route for the ``match`` function.
+
+    >>> from wheezy.routing.regex import RegexRoute
+    >>> describe(RegexRoute('abc/(?P<id>\\\\d+)').match)
+    'abc/(?P<id>\\\\d+)$'
+    """
+    route = getattr(match, "__self__", None)
+    pattern = getattr(route, "pattern", None)
+    if isinstance(pattern, str):
+        return pattern
+    regex = getattr(route, "regex", None)
+    if regex is not None:
+        return regex.pattern
+    return getattr(match, "__qualname__", repr(match))
+
+
+def instrumented_class(cls, override_scan=True):
+    """Returns a subclass of router ``cls`` that collects stats.
+    It adds no slots, so an instance can switch its ``__class__``
+    back and forth. A router with its own ``scan`` collects hits
+    in its ``instrumented_scan`` if it has one.
+    """
+    try:
+        return instrumented_classes[cls]
+    except KeyError:
+        pass
+    base_match = cls.match
+
+    def match(self, path, pos=0):
+        """Tries to find a match for the given path in route table
+        starting at position ``pos``. Returns a tupple of
+        (handler, kwargs)
+        """
+        start = perf_counter()
+        result = base_match(self, path, pos)
+        self.route_stats.observe(perf_counter() - start)
+        return result
+
+    namespace = {"__slots__": (), "match": match}
+    if override_scan:
+        namespace["scan"] = instrumented_scan
+    elif hasattr(cls, "instrumented_scan"):
+        namespace["scan"] = cls.instrumented_scan
+    subclass = type("Instrumented" + cls.__name__, (cls,), namespace)
+    instrumented_classes[cls] = subclass
+    return subclass
+
+
+def instrumented_scan(self, path, pos=0):
+    """Tries to find a match for the given path in ordered
+    routes. Returns a tupple of (handler, kwargs)
+    """
+    stats = self.route_stats
+    tried = 0
+    for match, handler in self.mapping:
+        tried += 1
+        matched, kwargs = match(path, pos)
+        if matched >= 0:
+            match = getattr(handler, "match", None)
+            if not match:
+                if stats.hit(tried - 1, tried):
+                    self.reorder()
+                return handler, kwargs
+            handler, kwargs_inner = match(path, matched)
+            if handler:
+                if stats.hit(tried - 1, tried):
+                    self.reorder()
+                if not kwargs:
+                    return handler, kwargs_inner
+                if kwargs_inner:
+                    kwargs = dict(kwargs, **kwargs_inner)
+                return handler, kwargs
+    stats.miss(tried)
+    return None, {}
@@ -0,0 +1,131 @@
+from threading import Lock
+
+from wheezy.routing.methods import resolve_method
+
+
+class RouteTransaction(object):
+    """Changes to route table of ``SwapRouter`` that are staged and
+    published at once by ``commit``.
+
+    Can be used as a context manager that commits on exit unless
+    an exception is raised.
+    """
+
+    __slots__ = ("target", "changes")
+
+    def __init__(self, target):
+        self.target = target
+        self.changes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+
+    def add_route(
+        self, pattern, handler, kwargs=None, name=None, methods=None
+    ):
+        """Stages adding a pattern to route table."""
+        self.changes.append(
+            ("add_route", (pattern, handler, kwargs, name, methods))
+        )
+
+    def add_routes(self, mapping):
+        """Stages adding routes, see ``PathRouter.add_routes``."""
+        self.changes.append(("add_routes", (mapping,)))
+
+    def include(self, pattern, included, kwargs=None):
+        """Stages including nested routes below the current."""
+        self.changes.append(("include", (pattern, included, kwargs)))
+
+    def remove_route(self, name):
+        """Stages removing the route with the given ``name``, see
+        ``PathRouter.remove_route``.
+        """
+        self.changes.append(("remove_route", (name, True)))
+
+    def replace_route(self, name, pattern, handler, kwargs=None, methods=None):
+        """Stages replacing the route with the given ``name``, see
+        ``PathRouter.replace_route``.
+        """
+        self.changes.append(
+            (
+                "replace_route",
+                (name, pattern, handler, kwargs, methods, True),
+            )
+        )
+
+    def commit(self):
+        """Applies staged changes to a copy of the current route
+        table and publishes it. Returns the new router.
+        """
+        target = self.target
+        with target.lock:
+            router = target.router.copy()
+            for change, args in self.changes:
+                getattr(router, change)(*args)
+            target.publish(router)
+        self.changes = []
+        return router
+
+
+class SwapRouter(object):
+    """Serves matches from the current router while a new route
+    table is prepared by ``transaction``. The new table is a copy of
+    the current one that shares compiled routes and nested routers,
+    it is published by a single reference swap. Readers take no lock,
+    a match that is in progress finishes with the old table.
+
+    >>> from wheezy.routing import PathRouter
+    >>> r = SwapRouter(PathRouter())
+    >>> with r.transaction() as t:
+    ...     t.add_route('beta', 'beta', name='beta')
+    >>> r.match('beta')
+    ('beta', {'route_name': 'beta'})
+    """
+
+    __slots__ = ("router", "lock")
+
+    def __init__(self, router):
+        self.lock = Lock()
+        self.publish(router)
+
+    def publish(self, router):
+        """Makes the ``router`` current."""
+        self.router = router
+
+    @property
+    def match(self):
+        """``match`` of the router that is current at the call, the
+        router is read once, so it can not be mixed with the next one.
+        """
+        return self.router.match
+
+    def transaction(self):
+        """Returns a new ``RouteTransaction``."""
+        return RouteTransaction(self)
+
+    def match_many(self, paths, window=1024):
+        """Yields a tupple of (handler, kwargs) for each path of
+        iterable ``paths`` with the router that is current at the
+        call.
+        """
+        return self.router.match_many(paths, window)
+
+    def match_method(self, path, method, pos=0):
+        """Tries to find a match for the given path and HTTP method.
+        Returns a tupple of (handler, kwargs, allowed)
+        """
+        return resolve_method(self.match(path, pos), method)
+
+    def path_for(self, name, **kwargs):
+        """Returns the url for the given route name."""
+        return self.router.path_for(name, **kwargs)
+
+    def path_for_many(self, items):
+        """Returns a list of urls for the given iterable of tupples
+        (name, kwargs).
+        """
+        return self.router.path_for_many(items)
@@ -0,0 +1,107 @@
+import unittest
+
+from wheezy.routing.batch import literal_prefix, match_many, prefix_cache
+from wheezy.routing.router import PathRouter
+from wheezy.routing.swap import SwapRouter
+from wheezy.routing.tests.test_compact import CompactRouterTestCase
+from wheezy.routing.trie import TrieRouter
+
+
+class LiteralPrefixTestCase(unittest.TestCase):
+    def test_routes(self):
+        r = PathRouter()
+        r.add_routes(
+            [
+                ("about/{id:i}", "about", None, "about"),
+                ("{locale:(en|ru)}/", [("{x}", "x", None, "x")]),
+                ("a/{page:(ab|ac)}/", [("{y}", "y", None, "y")]),
+                ("{id:i}", "id", None, "id"),
+            ]
+        )
+        prefixes = [literal_prefix(match) for match, h in r.mapping]
+        assert ["about/", "", "a/a", ""] == prefixes
+        assert "" == literal_prefix(lambda path, pos=0: (-1, None))
+
+    def test_cache(self):
+        prefix_cache.clear()
+        r = PathRouter()
+        r.add_routes([(r"x/(?P<id>\d+)", "x", None, "x")])
+        assert "x/" == literal_prefix(r.mapping[0][0])
+        assert ["x/(?P<id>\\d+)$"] == list(prefix_cache.items)
+        hits = prefix_cache.hits
+        assert "x/" == literal_prefix(r.mapping[0][0])
+        assert hits + 1 == prefix_cache.hits
+
+
+class MatchManyTestCase(unittest.TestCase):
+    urls = CompactRouterTestCase.urls
+    paths = CompactRouterTestCase.paths + (
+        "api/v1/",
+        "en/",
+        "posts/2011",
+        "zz/x/y",
+        "en/signin",
+    )
+
+    def setUp(self):
+        self.r = PathRouter()
+        self.r.add_routes(self.urls)
+        self.expected = [self.r.match(p) for p in self.paths]
+
+    def test_match(self):
+        assert self.expected == list(self.r.match_many(self.paths))
+        for window in (1, 3, 7):
+            results = self.r.match_many(iter(self.paths), window)
+            assert self.expected == list(results)
+
+    def test_repeated(self):
+        results = list(self.r.match_many(["posts/1", "posts/1"]))
+        assert results[0] == results[1]
+        assert results[0][1] is not results[1][1]
+
+    def test_cache(self):
+        r = PathRouter(cache_size=100)
+        r.add_routes(self.urls)
+        assert self.expected == list(r.match_many(self.paths))
+        assert "year" == r.cache.get("posts/2011")[0]
+        assert self.expected == list(r.match_many(self.paths))
+
+    def test_fused(self):
+        self.r.fuse()
+        assert self.expected == list(self.r.match_many(self.paths))
+
+    def test_frozen(self):
+        f = self.r.freeze()
+        assert self.expected == list(f.match_many(self.paths))
+        r = PathRouter()
+        r.add_routes(self.urls)
+        assert self.expected == list(r.compact().match_many(self.paths))
+        r = PathRouter()
+        r.add_routes(self.urls)
+        assert self.expected == list(r.generate().match_many(self.paths))
+
+    def test_nested_trie(self):
+        trie = TrieRouter()
+        trie.add_routes(
+            [
+                ("users/{id:i}", "user", None, "user"),
+                ("users", "users", None, "users"),
+            ]
+        )
+        r = PathRouter()
+        r.add_routes(
+            [("{locale:(en|ru)}/", trie), ("{any:any}", "any", None, "any")]
+        )
+        paths = ["en/users/1", "ru/users", "en/x", "de/users"]
+        expected = [r.match(p) for p in paths]
+        assert expected == list(r.match_many(paths))
+        assert expected == list(match_many(r.match_batch, paths, 2))
+
+    def test_instrumented(self):
+        self.r.instrument()
+        assert self.expected == list(self.r.match_many(self.paths))
+        assert self.r.stats()["matches"]
+
+    def test_swap(self):
+        s = SwapRouter(self.r)
+        assert self.expected == list(s.match_many(self.paths))
@@ -1,7 +1,10 @@
 import unittest
 from unittest.mock import Mock
 
-from wheezy.routing.builders import build_route
+from wheezy.routing.builders import build_route, classify
+from wheezy.routing.config import route_builders
+from wheezy.routing.plain import PlainRoute
+from wheezy.routing.regex import RegexRoute
 
 
 class BuildersTestCase(unittest.TestCase):
@@ -39,3 +42,82 @@ class BuildersTestCase(unittest.TestCase):
         self.assertRaises(
             LookupError, lambda: build_route("", False, {}, None, [])
         )
+
+
+class ClassifyTestCase(unittest.TestCase):
+    def test_same_as_builders(self):
+        """The pattern is classified as the first route builder
+        that builds a route.
+        """
+        for pattern in (
+            "",
+            "\n",
+            "abc.html",
+            "abc\n",
+            "a b",
+            "{locale:(en|ru)}/",
+            "x/{locale:(en|ru)}/y",
+            "{locale:(en|ru)}/{id}",
+            "{locale:(en|ru)}/{section:(news|blog)}",
+            "{a:(x|y)}{b:(z)}\n",
+            "{id}",
+            "a\n{id}",
+            "{id:i}\n",
+            "{ id}",
+            "(?P<id>\\d+)",
+            "post/{year:i}[/{month}]",
+        ):
+            index = next(
+                i for i, build in enumerate(route_builders) if build(pattern)
+            )
+            assert index == classify(pattern), pattern
+
+
+class PromoteTestCase(unittest.TestCase):
+    def build(self, pattern, finishing=True, kwargs=None, name="x"):
+        if not finishing:
+            name = None
+        return build_route(pattern, finishing, kwargs, name, route_builders)
+
+    def test_plain(self):
+        for pattern, path in (
+            ("^about$", "about"),
+            (r"help\.html", "help.html"),
+            (r"a\-b", "a-b"),
+        ):
+            route = self.build(pattern)
+            assert isinstance(route, PlainRoute), pattern
+            assert path == route.pattern
+            assert (len(path), {"route_name": "x"}) == route.match(path)
+        route = self.build(r"api\/", False, {"v": "1"})
+        assert isinstance(route, PlainRoute)
+        assert (4, {"v": "1"}) == route.match("api/users")
+
+    def test_exact_matches(self):
+        route = self.build("page-{n:(a|b)}", kwargs={"k": 1})
+        assert isinstance(route, RegexRoute)
+        assert [
+            ("page-a", {"n": "a", "k": 1, "route_name": "x"}),
+            ("page-b", {"n": "b", "k": 1, "route_name": "x"}),
+        ] == route.exact_matches
+        assert route.literals == route.exact_matches
+        assert "page-b" == route.path({"n": "b"})
+        route = self.build("(?P<locale>en)/home")
+        assert [
+            ("en/home", {"locale": "en", "route_name": "x"})
+        ] == route.exact_matches
+        route = self.build("(?P<locale>en|ru)/", False)
+        assert ["en/", "ru/"] == [p for p, kw in route.exact_matches]
+
+    def test_not_promoted(self):
+        for pattern, finishing in (
+            (r"posts/\d+", True),
+            ("(?P<x>a|a/b)", False),
+            ("[a-z]", True),
+            ("a+", True),
+            ("{d:date}", True),
+            (r"x\.html*", True),
+        ):
+            route = self.build(pattern, finishing)
+            assert isinstance(route, RegexRoute), pattern
+            assert route.exact_matches is None, pattern
@@ -0,0 +1,50 @@
+import threading
+import unittest
+
+from wheezy.routing.cache import LRUCache
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    def test_get(self):
+        c = LRUCache(2)
+        assert c.get("a") is None
+        c.put("a", 1)
+        assert 1 == c.get("a")
+        assert (1, 1) == (c.hits, c.misses)
+
+    def test_evict_least_recently_used(self):
+        c = LRUCache(2)
+        c.put("a", 1)
+        c.put("b", 2)
+        c.get("a")
+        c.put("c", 3)
+        assert 2 == len(c)
+        assert c.get("b") is None
+        assert 1 == c.get("a")
+        assert 3 == c.get("c")
+        assert 1 == c.evictions
+
+    def test_clear(self):
+        c = LRUCache(2)
+        c.put("a", 1)
+        c.get("a")
+        c.clear()
+        assert 0 == len(c)
+        assert 1 == c.hits
+
+    def test_threads(self):
+        c = LRUCache(8)
+
+        def target():
+            for i in range(2000):
+                key = i % 16
+                if c.get(key) is None:
+                    c.put(key, i)
+
+        threads = [threading.Thread(target=target) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert 8 == len(c)
+        assert 8000 == c.hits + c.misses
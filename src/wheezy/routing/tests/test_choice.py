@@ -1,6 +1,8 @@
 import unittest
 
+from wheezy.routing import choice
 from wheezy.routing.choice import ChoiceRoute, try_build_choice_route
+from wheezy.routing.router import PathRouter
 
 
 class TryChoiceRouteTestCase(unittest.TestCase):
@@ -35,9 +37,122 @@ class ChoiceRouteTestCase(unittest.TestCase):
 
         assert (-1, None) == r.match("x")
 
+    def test_match_pos(self):
+        """Ensure matches at position."""
+        r = ChoiceRoute("{locale:(en|ru)}/", False)
+
+        assert (5, {"locale": "ru"}) == r.match("x/ru/", 2)
+        assert (3, {"locale": "en"}) == r.match("en/")
+        assert (-1, None) == r.match("en/", 1)
+
     def test_path(self):
         """Ensure path is built correctly."""
         r = ChoiceRoute("{locale:(en|ru)}/", True, {"locale": "en"}, "test")
 
         assert "ru/" == r.path({"locale": "ru"})
         assert "en/" == r.path()
+
+    def test_lookup(self):
+        """Ensure a choice is looked up by length."""
+        choices = "|".join("l%d" % i for i in range(200))
+        r = ChoiceRoute("x/{locale:(%s)}/" % choices, False)
+
+        assert r.lookup_match == r.match
+        assert (5, 6, 7) == r.lengths
+        assert (7, {"locale": "l199"}) == r.match("x/l199/y")
+        assert (9, {"locale": "l10"}) == r.match("ab/x/l10/", 3)
+        assert (-1, None) == r.match("x/l200/")
+        assert (-1, None) == r.match("x/l1")
+
+    def test_scan(self):
+        """Ensure the first choice wins unless prefix free."""
+        r = ChoiceRoute("{x:(a|ab|b)}", False)
+
+        assert r.scan_match == r.match
+        assert (1, {"x": "a"}) == r.match("ab")
+        r = ChoiceRoute("{x:(ab|a)}", False)
+        assert (2, {"x": "ab"}) == r.match("ab")
+        assert (1, {"x": "a"}) == r.match("ac")
+
+
+class MultipleChoiceRouteTestCase(unittest.TestCase):
+    pattern = "{locale:(en|de|ru)}/{section:(news|blog)}"
+
+    def setUp(self):
+        self.max_choices = choice.max_choices
+
+    def tearDown(self):
+        choice.max_choices = self.max_choices
+
+    def test_expanded(self):
+        """Ensure every combination of choices is an exact match."""
+        r = ChoiceRoute(self.pattern, True, None, "x")
+
+        assert 6 == len(r.exact_matches)
+        assert (
+            "de/blog",
+            {"locale": "de", "section": "blog", "route_name": "x"},
+        ) == r.exact_matches[3]
+        assert (8, {"locale": "ru", "section": "news"}) == ChoiceRoute(
+            self.pattern + "/", False
+        ).match("ru/news/1")
+
+    def test_segment(self):
+        """Ensure choices are matched segment by segment above
+        the limit.
+        """
+        choice.max_choices = 4
+        r = ChoiceRoute(self.pattern, True, {"a": 1})
+
+        assert r.segment_match == r.match
+        assert r.exact_matches is None
+        assert (7, {"a": 1, "locale": "ru", "section": "news"}) == r.match(
+            "ru/news"
+        )
+        assert (9, {"a": 1, "locale": "en", "section": "blog"}) == r.match(
+            "x/en/blog", 2
+        )
+        for path in ("ru/news/", "ru/x", "ru", "fr/news", "ru/newsx"):
+            assert (-1, None) == r.match(path), path
+        r = ChoiceRoute("x/" + self.pattern + "/", False)
+        assert (10, {"locale": "de", "section": "news"}) == r.match(
+            "x/de/news/1"
+        )
+        assert (-1, None) == r.match("x/de/news")
+
+    def test_groups(self):
+        """Ensure choices not followed by a segment are tried in
+        order.
+        """
+        choice.max_choices = 1
+        r = ChoiceRoute("{a:(x|xy)}{b:(yz|z)}", True)
+
+        assert r.groups_match == r.match
+        assert (3, {"a": "x", "b": "yz"}) == r.match("xyz")
+        assert (2, {"a": "x", "b": "z"}) == r.match("xz")
+        assert (-1, None) == r.match("xyzz")
+        r = ChoiceRoute("{a:(x|xy)}{b:(yz|z)}", False)
+        assert (3, {"a": "x", "b": "yz"}) == r.match("xyzz")
+
+    def test_path_for(self):
+        """Ensure path is built for every combination of choices."""
+        for max_choices in (100, 1):
+            choice.max_choices = max_choices
+            r = PathRouter()
+            r.add_routes(
+                [
+                    (self.pattern, "s", {"section": "news"}, "s"),
+                    (
+                        "{locale:(en|de|ru)}/{page:(a|b)}/",
+                        [("{id:i}", "p", None, "p")],
+                    ),
+                ]
+            )
+            assert "ru/news" == r.path_for("s", locale="ru")
+            for locale in ("en", "de", "ru"):
+                for section in ("news", "blog"):
+                    path = r.path_for("s", locale=locale, section=section)
+                    assert locale + "/" + section == path
+                    assert "s" == r.match(path)[0]
+            assert "de/b/1" == r.path_for("p", locale="de", page="b", id=1)
+            assert "p" == r.match("de/b/1")[0]
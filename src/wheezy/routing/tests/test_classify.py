@@ -0,0 +1,136 @@
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from io import StringIO
+
+from wheezy.routing.classify import (
+    NO_MATCH,
+    Summary,
+    classify,
+    load_router,
+    main,
+)
+from wheezy.routing.router import PathRouter
+
+urls = [
+    ("", "root", None, "root"),
+    ("posts/{year:i}", "year", None, "year"),
+    ("api/", [("users/{id:i}", "user", None, "user")]),
+]
+
+router = PathRouter()
+router.add_routes(urls)
+
+LINE = (
+    '127.0.0.1 - - [08/Mar/2019:10:00:00 +0000] "GET /%s HTTP/1.1" '
+    '200 %d "-" "curl/7.64" %s\n'
+)
+
+
+def log_lines():
+    lines = []
+    for i in range(50):
+        lines.append(LINE % ("posts/%d?page=2" % (2000 + i), 100, "0.010"))
+    for i in range(30):
+        lines.append(LINE % ("api/users/%d" % i, 1000, "0.100"))
+    for _ in range(15):
+        lines.append(LINE % ("", 10, "0.001"))
+    for _ in range(5):
+        lines.append(LINE % ("missing", 0, "-"))
+    lines.append("\n")
+    return lines
+
+
+class ClassifyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.plain = os.path.join(self.dir, "access.log")
+        self.gzipped = os.path.join(self.dir, "access.log.1.gz")
+        lines = log_lines()
+        with open(self.plain, "w") as f:
+            f.writelines(lines)
+        with gzip.open(self.gzipped, "wt") as f:
+            f.writelines(lines)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def assert_summary(self, summary, n=1):
+        counts = {name: r[0] for name, r in summary.routes.items()}
+        assert {
+            "year": 50 * n,
+            "user": 30 * n,
+            "root": 15 * n,
+            NO_MATCH: 5 * n,
+        } == counts
+        assert n == summary.skipped
+
+    def test_load_router(self):
+        name = "wheezy.routing.tests.test_classify:urls"
+        r = load_router(name)
+        assert "year" == r.match("posts/2011")[0]
+        assert r is not load_router(name)
+        name = "wheezy.routing.tests.test_classify.router"
+        assert load_router(name) is load_router(name)
+
+    def test_classify(self):
+        summary = classify(
+            "wheezy.routing.tests.test_classify:urls",
+            [self.plain, self.gzipped],
+            chunk_size=7,
+        )
+        self.assert_summary(summary, 2)
+        rows = summary.report()
+        assert ["year", "user", "root", NO_MATCH] == [r["route"] for r in rows]
+        assert 50.0 == rows[0]["share"]
+        assert 100.0 == rows[-1]["cumulative"]
+        assert 950 < rows[1]["p50"] < 1050
+        assert 0 == rows[-1]["p99"]
+
+    def test_pool(self):
+        summary = classify(
+            "wheezy.routing.tests.test_classify:urls",
+            [self.plain, self.gzipped],
+            jobs=2,
+            chunk_size=7,
+            field=-1,
+        )
+        self.assert_summary(summary, 2)
+        p50 = summary.report()[1]["p50"]
+        assert 0.095 < p50 < 0.105
+        assert summary.report()[-1]["p50"] is None
+
+    def test_update(self):
+        a = Summary()
+        a.add("x", 1)
+        b = Summary()
+        b.add("x", 1)
+        b.add("y")
+        b.skipped = 1
+        a.update(b)
+        assert {"x": [2, {0: 2}], "y": [1, {}]} == a.routes
+        assert 1 == a.skipped
+
+    def test_main(self):
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            argv = ["wheezy.routing.tests.test_classify:urls", self.plain]
+            assert 0 == main(argv + ["-j", "1", "--json", "-p", "50"])
+            report = json.loads(sys.stdout.getvalue())
+            assert 1 == report["skipped"]
+            assert {"route", "requests", "share", "cumulative", "p50"} == set(
+                report["routes"][0]
+            )
+            sys.stdout = StringIO()
+            assert 0 == main(argv + ["-j", "1"])
+            lines = sys.stdout.getvalue().splitlines()
+        finally:
+            sys.stdout = stdout
+        assert lines[0].startswith("route")
+        assert lines[1].startswith("year")
+        assert "skipped lines: 1" == lines[-1]
@@ -0,0 +1,140 @@
+import traceback
+import unittest
+from uuid import UUID
+
+from wheezy.routing.codegen import GeneratedRouter, merge
+from wheezy.routing.config import lazy_route_builders
+from wheezy.routing.frozen import FrozenRouter
+from wheezy.routing.router import PathRouter, url
+from wheezy.routing.trie import TrieRouter
+
+urls = [
+    ("", "root", None, "root"),
+    ("posts/{year:i}", "year", {"page": "1"}, "year"),
+    (
+        "api/",
+        [
+            (
+                "v1/",
+                [
+                    ("users", "users", None, "users"),
+                    ("users/{id:i}", "user", None, "user"),
+                    ("files/{id:uuid}", "file", None, "file"),
+                ],
+                {"version": "1"},
+            )
+        ],
+        {"api": "x"},
+    ),
+    (
+        "{locale:(en|ru)}/",
+        [
+            ("signin", "signin", None, "signin"),
+            ("{user:w}", "profile", None, "profile"),
+        ],
+    ),
+    (
+        "{tenant}/",
+        [
+            ("about", "about", None, "about"),
+            ("{id:i}", "item", {"tenant": "x"}, "item"),
+            ("empty/{id:i}", "", None, "empty"),
+        ],
+    ),
+    ("(?P<a>\\d+)/", [("(?P<b>\\d+)", "ab", None, "ab")]),
+    url("items", "list", None, "items", ["GET"]),
+    ("{any:any}", "not_found", None, "not_found"),
+]
+
+paths = [
+    "",
+    "posts/2011",
+    "posts/x",
+    "api/v1/users",
+    "api/v1/users/1",
+    "api/v1/files/2c5ea4c0-4067-11e9-8bad-9b1deb4d3b7d",
+    "api/v1/files/x",
+    "api/v2/users",
+    "en/signin",
+    "ru/john",
+    "uk/john",
+    "acme/about",
+    "acme/12",
+    "acme/empty/1",
+    "1/2",
+    "items",
+    "x",
+    "a/b/c\n",
+]
+
+
+class GeneratedRouterTestCase(unittest.TestCase):
+    def assert_same(self, router, paths=paths, pos=0, expected=None):
+        g = GeneratedRouter(router)
+        expected = expected or router
+        for path in paths:
+            assert expected.match(path, pos) == g.match(path, pos), path
+
+    def test_match(self):
+        r = PathRouter()
+        r.add_routes(urls)
+        self.assert_same(r)
+        self.assert_same(r, ["x/" + p for p in paths], 2)
+        r.add_route("{id:uuid}", "u", None, "u")
+        g = GeneratedRouter(r)
+        assert "file" == g.match(paths[5])[0]
+        assert isinstance(g.match(paths[5])[1]["id"], UUID)
+
+    def test_fused_trie_lazy(self):
+        for router in (
+            TrieRouter(),
+            PathRouter(lazy_route_builders),
+        ):
+            router.add_routes(urls)
+            router.fuse()
+            # nested routers are inlined the way ``freeze`` does
+            self.assert_same(router, expected=FrozenRouter(router))
+        r = PathRouter()
+        r.include("lazy/", "wheezy.routing.tests.test_codegen:urls")
+        self.assert_same(r, ["lazy/" + p for p in paths])
+
+    def test_choice(self):
+        r = PathRouter()
+        r.add_routes(
+            [
+                ("{x:(a|ab)}", [("{y}", "scan", None, "scan")]),
+                ("{l:(en|en-gb|ru)}/", [("{y}", "lookup", None, "lookup")]),
+            ]
+        )
+        self.assert_same(r, ["ab", "abc", "en/1", "en-gb/1", "ru/", "de/1"])
+
+    def test_debug(self):
+        r = PathRouter()
+        r.add_routes([("{x:i}", "x", None, "x")])
+        assert r.generate().source is None
+        self.assertRaises(RuntimeError, lambda: r.add_routes(urls))
+        r = PathRouter()
+        r.add_routes([("{x:i}", "x", None, "x")])
+        g = r.generate(debug=True)
+        assert "def match(path, pos=0):" in g.source
+        try:
+            g.match(None)
+        except TypeError:
+            tb = traceback.format_exc()
+        assert "m = c1(path, p0)" in tb
+
+    def test_path_for(self):
+        r = PathRouter()
+        r.add_routes(urls)
+        g = r.generate()
+        assert "api/v1/users/1" == g.path_for("user", id=1)
+        assert ["ru/signin"] == g.path_for_many([("signin", {"locale": "ru"})])
+        assert ("list", {"route_name": "items"}) == g.match_method(
+            "items", "HEAD"
+        )[:2]
+
+    def test_merge(self):
+        a = {"a": 1}
+        assert a is merge(None, a)
+        assert a is merge(a, {})
+        assert {"a": 1, "b": 2} == merge(a, {"b": 2})
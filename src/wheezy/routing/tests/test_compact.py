@@ -0,0 +1,241 @@
+import gc
+import os
+import tracemalloc
+import unittest
+
+from wheezy.routing import compact
+from wheezy.routing.compact import FUSED, REGEX, TYPED
+from wheezy.routing.frozen import FOREIGN, NESTED, PREFIX
+from wheezy.routing.router import PathRouter
+
+
+class CompactRouterTestCase(unittest.TestCase):
+    urls = [
+        ("", "root", None, "root"),
+        ("posts/{year:i}", "year", {"page": "1"}, "year"),
+        (r"(?P<a>\w+)/(?P<b>\d+)/x$", "ab", None, "ab"),
+        (r"tags/(?P<tag>\w+)$", "tag", {"page": "1"}, "tag"),
+        (r"opt/((?P<id>\d+)/)?x$", "opt", None, "opt"),
+        (
+            "api/",
+            [
+                (
+                    "v1/",
+                    [
+                        ("users", "users", None, "users"),
+                        ("users/{id:i}", "user", None, "user"),
+                        ("users/{name:w}", "name", None, "name"),
+                    ],
+                    {"version": "1"},
+                )
+            ],
+            {"api": "x"},
+        ),
+        (
+            "{locale:(en|ru)}/",
+            [
+                ("signin", "signin", None, "signin"),
+                ("{user:w}", "profile", None, "profile"),
+            ],
+        ),
+        ("{any:any}", "not_found", None, "not_found"),
+    ]
+    paths = (
+        "",
+        "posts/2011",
+        "a/1/x",
+        "tags/python",
+        "opt/x",
+        "opt/12/x",
+        "api/v1/users",
+        "api/v1/users/1",
+        "api/v1/users/bob",
+        "en/signin",
+        "ru/bob",
+        "t/12/x",
+    )
+
+    def setUp(self):
+        self.r = PathRouter()
+        self.r.add_routes(self.urls)
+
+    def test_match(self):
+        expected = [self.r.match(p) for p in self.paths]
+        c = self.r.compact()
+        assert isinstance(c, compact.CompactRouter)
+        assert expected == [c.match(p) for p in self.paths]
+
+    def test_fused(self):
+        self.r.fuse()
+        f = self.r.freeze()
+        expected = [f.match(p) for p in self.paths]
+        c = compact.CompactRouter(f)
+        assert expected == [c.match(p) for p in self.paths]
+
+    def test_entries(self):
+        c = self.r.compact()
+        kinds = [e[0] for e in c.entries]
+        assert [FUSED, PREFIX, PREFIX, PREFIX, REGEX] == kinds
+        assert 5 == len(c.entries[0][2])
+        kind, prefix, kwargs, entries = c.entries[1]
+        assert [FUSED] == [e[0] for e in entries]
+        r = PathRouter()
+        r.add_routes([("{tenant}/", [("{id:i}", "item", None, "item")])])
+        assert [NESTED] == [e[0] for e in r.compact().entries]
+
+    def test_top_level_alternation(self):
+        r = PathRouter()
+        r.add_routes(
+            [
+                ("x|y/(?P<id>\\d+)", "xy", None, "xy"),
+                ("z/(?P<id>\\d+)", "z", None, "z"),
+            ]
+        )
+        c = r.compact()
+        assert [FUSED] == [e[0] for e in c.entries]
+        for path in ("x", "y/1", "z/1", "y/"):
+            assert r.match(path) == c.match(path), path
+
+    def test_converters(self):
+        r = PathRouter()
+        r.add_routes(
+            [
+                ("d/{d:date}", "date", None, "date"),
+                ("d/{s}", "s", None, "s"),
+                ("n/{id:int}", "n", {"page": "1"}, "n"),
+            ]
+        )
+        paths = ("d/2019-03-08", "d/2019-13-08", "n/1", "n/x")
+        r.fuse()
+        c = r.compact()
+        assert [FUSED] == [e[0] for e in c.entries]
+        for path in paths:
+            assert r.match(path) == c.match(path), path
+        assert ("s", {"s": "2019-13-08", "route_name": "s"}) == c.match(
+            "d/2019-13-08"
+        )
+        r = PathRouter()
+        r.add_routes([("n/{id:int}", "n", {"page": "1"}, "n")])
+        c = r.compact()
+        assert [TYPED] == [e[0] for e in c.entries]
+        for path in paths:
+            assert r.match(path) == c.match(path), path
+
+    def test_foreign(self):
+        class Matcher(object):
+            def match(self, path, pos=0):
+                return "m", {"rest": path[pos:]}
+
+        r = PathRouter()
+        r.add_routes([("x/{id}/", Matcher())])
+        expected = r.match("x/1/")
+        c = r.compact()
+        assert [FOREIGN] == [e[0] for e in c.entries]
+        assert "m" == expected[0]
+        assert expected == c.match("x/1/")
+
+    def test_interned(self):
+        on = "".join(["o", "n"])
+        r = PathRouter()
+        r.add_routes(
+            [
+                ("a/{x}", "a", {"flag": on}, "a"),
+                ("b", "b", {"flag": "".join(["o", "n"])}, "b"),
+            ]
+        )
+        c = r.compact()
+        kwargs = c.match("a/1")[1]
+        assert kwargs["flag"] is c.match("b")[1]["flag"]
+        assert kwargs is not c.match("a/1")[1]
+
+    def test_path_for(self):
+        c = self.r.compact()
+        assert "posts/2011" == c.path_for("year", year=2011)
+        assert "api/v1/users/1" == c.path_for("user", id=1)
+        assert ["ru/signin"] == c.path_for_many([("signin", {"locale": "ru"})])
+        self.assertRaises(KeyError, lambda: c.path_for("x"))
+
+
+def retained(build):
+    """Returns the size of memory kept by the router that ``build``
+    returns, the path router it is built from is released.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        r = PathRouter()
+        r.add_routes(
+            [
+                ("r%d/{id}/x" % i, "h", {"a": "1"}, "r%d" % i)
+                for i in range(200)
+            ]
+        )
+        router = build(r)
+        del r
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        del router
+        return size
+    finally:
+        tracemalloc.stop()
+
+
+class MemoryTestCase(unittest.TestCase):
+    def test_less_than_frozen(self):
+        retained(PathRouter.freeze)
+        assert retained(PathRouter.compact) < retained(PathRouter.freeze)
+
+
+def private_dirty():
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Private_Dirty:"):
+                return int(line.split()[1])
+
+
+@unittest.skipUnless(
+    hasattr(os, "fork") and os.path.exists("/proc/self/smaps_rollup"),
+    "requires fork and /proc/self/smaps_rollup",
+)
+class CopyOnWriteTestCase(unittest.TestCase):
+    """Memory pages that a worker copies while matching paths."""
+
+    def setUp(self):
+        r = PathRouter()
+        r.add_routes(
+            [
+                ("r%d/{id}/x" % i, "h", {"a": "1"}, "r%d" % i)
+                for i in range(1000)
+            ]
+        )
+        self.router = r.compact()
+        self.paths = ["r%d/1/x" % i for i in range(1000)]
+        gc.collect()
+
+    def worker(self):
+        rfd, wfd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: nocover
+            try:
+                before = private_dirty()
+                for path in self.paths:
+                    self.router.match(path)
+                gc.collect()
+                os.write(wfd, str(private_dirty() - before).encode())
+            finally:
+                os._exit(0)
+        os.close(wfd)
+        with os.fdopen(rfd) as f:
+            dirty = int(f.read())
+        os.waitpid(pid, 0)
+        return dirty
+
+    def test_gc_freeze(self):
+        if not hasattr(gc, "freeze"):  # pragma: nocover
+            self.skipTest("requires gc.freeze")
+        gc.freeze()
+        try:
+            frozen = self.worker()
+        finally:
+            gc.unfreeze()
+        assert frozen < self.worker()
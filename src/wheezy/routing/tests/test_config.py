@@ -15,7 +15,7 @@ class RouteBuildersTestCase(unittest.TestCase):
         """Ensure items in ``route_builders`` list are
         callable(pattern, kwargs=None)
         """
-        for builder in config.route_builders:
+        for builder in config.route_builders + config.lazy_route_builders:
             assert builder
             assert callable(builder)
             spec = inspect.getfullargspec(builder)
@@ -1,13 +1,20 @@
 import re
 import unittest
+from datetime import date
+from uuid import UUID
 
 from wheezy.routing import config
 from wheezy.routing.curly import (
     convert,
+    converters,
     default_pattern,
+    find_converters,
     parse,
     patterns,
+    register_converter,
     replace,
+    translate,
+    translate_cache,
     try_build_curly_route,
 )
 
@@ -35,7 +42,7 @@ class PatternsTestCase(unittest.TestCase):
 
     def test_synonyms(self):
         """Make sure ``default_pattern`` is in ``patterns``."""
-        self.assertEqual(13, len(patterns))
+        self.assertEqual(16, len(patterns))
         synonyms_map = (
             ("i", ("int", "digits", "number")),
             ("w", ("word",)),
@@ -110,3 +117,62 @@ class ParseTestCase(unittest.TestCase):
 
         self.assertEqual("abc", group_name)
         self.assertEqual("i", pattern_name)
+
+
+class ConvertersTestCase(unittest.TestCase):
+    """Test the ``curly.converters``."""
+
+    def test_find_converters(self):
+        """only pattern names with a converter are found"""
+        c = find_converters("{d:date}/{id:i}/{n}")
+
+        self.assertEqual(["d"], list(c))
+
+    def test_int(self):
+        """digits are converted to int by the int pattern only"""
+        r = try_build_curly_route("posts/{year:int}", True, None, "x")
+
+        self.assertEqual(
+            (10, {"year": 2019, "route_name": "x"}), r.match("posts/2019")
+        )
+        self.assertEqual("posts/2019", r.path({"year": 2019}))
+        r = try_build_curly_route("posts/{year:i}", True, None, "x")
+
+        self.assertEqual(
+            (10, {"year": "2019", "route_name": "x"}), r.match("posts/2019")
+        )
+
+    def test_match(self):
+        """values are converted for match and path"""
+        r = try_build_curly_route("{d:date}/{id:uuid}", True, None, "x")
+        u = "2c5ea4c0-4067-11e9-8bad-9b1deb4d3b7d"
+
+        matched, kwargs = r.match("2019-03-08/" + u)
+        self.assertEqual(date(2019, 3, 8), kwargs["d"])
+        self.assertEqual(UUID(u), kwargs["id"])
+        self.assertEqual("2019-03-08/" + u, r.path(kwargs))
+
+    def test_mismatch(self):
+        """a value that can not be converted is a mismatch"""
+        r = try_build_curly_route("{d:date}", True, None, "x")
+
+        self.assertEqual((-1, None), r.match("2019-13-08"))
+
+
+class RegisterConverterTestCase(unittest.TestCase):
+    """Test the ``curly.register_converter``."""
+
+    def tearDown(self):
+        del patterns["hex"], converters["hex"]
+        translate_cache.clear()
+
+    def test_register(self):
+        """a registered pattern is converted both ways"""
+        translate("{n:hex}")
+        register_converter(
+            "hex", r"[0-9a-f]+", lambda s: int(s, 16), lambda n: "%x" % n
+        )
+        r = try_build_curly_route("x/{n:hex}", True, None, "x")
+
+        self.assertEqual((4, {"n": 255, "route_name": "x"}), r.match("x/ff"))
+        self.assertEqual("x/ff", r.path({"n": 255}))
@@ -0,0 +1,134 @@
+import unittest
+
+from wheezy.routing import frozen
+from wheezy.routing.frozen import LEAF, NESTED, PREFIX
+from wheezy.routing.router import PathRouter
+
+
+class FrozenRouterTestCase(unittest.TestCase):
+    urls = [
+        ("", "root", None, "root"),
+        ("posts/{year:i}", "year", {"page": "1"}, "year"),
+        (
+            "api/",
+            [
+                (
+                    "v1/",
+                    [
+                        ("users", "users", None, "users"),
+                        ("users/{id:i}", "user", None, "user"),
+                    ],
+                    {"version": "1"},
+                )
+            ],
+            {"api": "x"},
+        ),
+        (
+            "{locale:(en|ru)}/",
+            [
+                ("signin", "signin", None, "signin"),
+                ("{user:w}", "profile", None, "profile"),
+            ],
+        ),
+        (
+            "{tenant}/",
+            [
+                ("about", "about", None, "about"),
+                ("{id:i}", "item", {"tenant": "x"}, "item"),
+            ],
+        ),
+        ("{any:any}", "not_found", None, "not_found"),
+    ]
+    paths = (
+        "",
+        "posts/2011",
+        "api/v1/users",
+        "api/v1/users/1",
+        "api/v1/x",
+        "en/signin",
+        "ru/bob",
+        "t/about",
+        "t/12",
+        "t/12/x",
+    )
+
+    def setUp(self):
+        self.r = PathRouter()
+        self.r.add_routes(self.urls)
+
+    def test_match(self):
+        expected = [self.r.match(p) for p in self.paths]
+        f = self.r.freeze()
+        assert isinstance(f, frozen.FrozenRouter)
+        assert expected == [f.match(p) for p in self.paths]
+
+    def test_no_match(self):
+        r = PathRouter()
+        r.add_routes(self.urls[:-1])
+        f = r.freeze()
+        assert (None, {}) == f.match("t/12/x")
+
+    def test_entries(self):
+        f = self.r.freeze()
+        kinds = [e[0] for e in f.entries]
+        assert [LEAF, PREFIX, PREFIX, PREFIX, NESTED, LEAF] == kinds
+        kind, prefix, kwargs, entries = f.entries[1]
+        assert "api/v1/" == prefix
+        assert {"api": "x", "version": "1"} == kwargs
+        assert 1 == len(entries)
+        # a choice include is flattened to a prefix per choice
+        assert ("en/", {"locale": "en"}) == f.entries[2][1:3]
+        assert ("ru/", {"locale": "ru"}) == f.entries[3][1:3]
+
+    def test_regex_include(self):
+        r = PathRouter()
+        r.add_routes(
+            [
+                ("(?P<x>a|b)/", [("(?P<id>\\d+)", "id", None, "id")]),
+                ("(?P<y>a|ab)", [("/(?P<id>\\d+)", "y", None, "y")]),
+            ]
+        )
+        f = r.freeze()
+        assert [PREFIX, PREFIX, NESTED] == [e[0] for e in f.entries]
+        for path in ("a/1", "b/2", "ab/3", "c/4"):
+            assert r.match(path) == f.match(path), path
+
+    def test_index(self):
+        r = PathRouter()
+        r.add_routes(
+            [("{a}/0", "zero", None, "zero")]
+            + [("p%d/{id:i}" % i, "p", None, "p%d" % i) for i in range(10)]
+            + [("{any:any}", "any", None, "any")]
+        )
+        f = r.freeze()
+        assert 10 == len(f.index)
+        # a path is tried with routes of its first segment and routes
+        # with no literal prefix only
+        assert 3 == len(f.index["p5"])
+        paths = ["p5/1", "p5/0", "p1/x", "x/1", "p5", ""]
+        expected = {path: r.match(path) for path in paths}
+        assert expected == {path: f.match(path) for path in paths}
+        assert expected == f.match_batch(paths)
+        assert ("p", {"id": "1", "route_name": "p5"}) == f.match("p5/1")
+        assert "zero" == f.match("p5/0")[0]
+
+    def test_fused(self):
+        self.r.fuse()
+        expected = [self.r.match(p) for p in self.paths]
+        f = self.r.freeze()
+        assert expected == [f.match(p) for p in self.paths]
+
+    def test_path_for(self):
+        f = self.r.freeze()
+        assert "" == f.path_for("root")
+        assert "posts/2011" == f.path_for("year", year=2011)
+        assert "api/v1/users/1" == f.path_for("user", id=1)
+        assert "ru/signin" == f.path_for("signin", locale="ru")
+        self.assertRaises(KeyError, lambda: f.path_for("x"))
+
+    def test_frozen(self):
+        self.r.freeze()
+        self.assertRaises(
+            RuntimeError, lambda: self.r.add_route("x", "h", None, "x")
+        )
+        self.assertRaises(RuntimeError, lambda: self.r.include("x/", []))
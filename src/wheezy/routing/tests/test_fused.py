@@ -0,0 +1,135 @@
+import unittest
+
+from wheezy.routing.fused import FusedRouter, fuse, is_fusable, match_empty
+from wheezy.routing.plain import PlainRoute
+from wheezy.routing.regex import RegexRoute
+from wheezy.routing.router import PathRouter
+
+
+class IsFusableTestCase(unittest.TestCase):
+    def test_finishing_regex(self):
+        r = RegexRoute("abc/(?P<id>\\d+)", True, None, "a")
+        assert is_fusable(r.match, "h")
+
+    def test_intermediate(self):
+        r = RegexRoute("abc/", False)
+        assert not is_fusable(r.match, PathRouter())
+
+    def test_not_regex(self):
+        r = PlainRoute("abc", True)
+        assert not is_fusable(r.match, "h")
+
+    def test_unsafe(self):
+        for p in ("(?P<x>(a)\\2)", "(?P<x>a)(?P<y>(?(x)b|c))"):
+            r = RegexRoute(p, True, None, "a")
+            assert not is_fusable(r.match, "h"), p
+
+
+class FuseTestCase(unittest.TestCase):
+    def test_min_size(self):
+        r = RegexRoute("a", True, None, "a")
+        mapping = [(r.match, "h")]
+        assert mapping == fuse(mapping)
+
+    def test_runs(self):
+        routes = [
+            RegexRoute("a(?P<x>\\d)", True, None, "a"),
+            RegexRoute("b(?P<x>\\d)", True, None, "b"),
+            RegexRoute("c/", False),
+            RegexRoute("d(?P<x>\\d)", True, None, "d"),
+        ]
+        mapping = [(r.match, "h") for r in routes]
+        mapping[2] = (routes[2].match, PathRouter())
+        fused = fuse(mapping)
+        assert 3 == len(fused)
+        match, handler = fused[0]
+        assert match_empty == match
+        assert isinstance(handler, FusedRouter)
+        assert mapping[:2] == list(handler.entries)
+        assert mapping[2:] == fused[1:]
+
+    def test_idempotent(self):
+        mapping = [
+            (RegexRoute(p, True, None, p).match, "h") for p in ("a", "b")
+        ]
+        fused = fuse(mapping)
+        fused.append((RegexRoute("c", True, None, "c").match, "h"))
+        fused = fuse(fused)
+        assert 1 == len(fused)
+        assert 3 == len(fused[0][1].entries)
+
+
+class FusedRouterTestCase(unittest.TestCase):
+    def setUp(self):
+        routes = [
+            RegexRoute("abc/(?P<id>\\d+)", True, None, "a"),
+            RegexRoute("abc/(?P<id>(x|y))", True, {"lang": "en"}, "b"),
+            RegexRoute("abc/(?P<n>\\w+)", True, None, "c"),
+            RegexRoute("(?P<any>.+)", True, None, "d"),
+        ]
+        self.mapping = [(r.match, r.name) for r in routes[:1]]
+        self.mapping += [(r.match, "h" + str(i)) for i, r in enumerate(routes)]
+        self.r = FusedRouter(self.mapping[1:])
+
+    def scan(self, path):
+        for match, handler in self.mapping[1:]:
+            matched, kwargs = match(path)
+            if matched >= 0:
+                return handler, kwargs
+        return None, {}
+
+    def test_match(self):
+        for path in ("abc/1", "abc/x", "abc/z", "x/y", "abc/", ""):
+            assert self.scan(path) == self.r.match(path), path
+
+    def test_first_match_wins(self):
+        assert ("h0", {"id": "1", "route_name": "a"}) == self.r.match("abc/1")
+        assert (
+            "h1",
+            {"id": "y", "lang": "en", "route_name": "b"},
+        ) == self.r.match("abc/y")
+
+    def test_no_match(self):
+        assert (None, {}) == self.r.match("")
+
+    def test_kwargs_are_copied(self):
+        handler, kwargs = self.r.match("abc/x")
+        kwargs["lang"] = "de"
+        assert "en" == self.r.match("abc/x")[1]["lang"]
+
+    def test_replace(self):
+        r = self.r.replace(0)
+        assert r.regex is self.r.regex
+        self.mapping[1] = (r.entries[0][0], None)
+        for path in ("abc/1", "abc/x", "x/y", ""):
+            assert self.scan(path) == r.match(path), path
+        route = RegexRoute("x/(?P<id>\\d+)", True, None, "e")
+        r = r.replace(2, (route.match, "e"))
+        self.mapping[3] = (route.match, "e")
+        assert (2,) == r.stale
+        for path in ("abc/1", "abc/x", "abc/z", "x/1", "x/y", ""):
+            assert self.scan(path) == r.match(path), path
+
+    def test_rejected_by_route(self):
+        r = PathRouter()
+        r.add_routes(
+            [("{d:date}", "date", None, "date"), ("{x}", "x", None, "x")]
+        )
+        r.fuse()
+        assert "date" == r.match("2019-03-08")[0]
+        assert "x" == r.match("2019-13-08")[0]
+
+    def test_top_level_alternation(self):
+        r = PathRouter()
+        r.add_routes(
+            [
+                ("x|y/(?P<id>\\d+)", "xy", None, "xy"),
+                ("z/(?P<id>\\d+)", "z", None, "z"),
+            ]
+        )
+        r.fuse()
+        assert isinstance(r.mapping[0][1], FusedRouter)
+        assert ("xy", {"id": None, "route_name": "xy"}) == r.match("x")
+        assert "xy" == r.match("y/1")[0]
+        assert "z" == r.match("z/1")[0]
+        assert (None, {}) == r.match("y/")
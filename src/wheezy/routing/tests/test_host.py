@@ -0,0 +1,108 @@
+import unittest
+from urllib.parse import urlencode
+
+from wheezy.routing.host import HostRouter
+from wheezy.routing.router import PathRouter
+
+
+class HostRouterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.r = HostRouter(cache_size=10)
+        self.www = [("/", "home", None, "home")]
+        self.r.add_host("www.example.com", self.www)
+        self.r.add_host(
+            "{tenant}.example.com",
+            [("/users/{id:i}", "user", None, "user")],
+            {"zone": "eu"},
+        )
+        self.r.add_host("*.{region:(us|eu)}.example.net", self.www)
+
+    def test_exact(self):
+        assert ("home", {"route_name": "home"}) == self.r.match(
+            "WWW.example.com:8080", "/"
+        )
+
+    def test_pattern(self):
+        assert (
+            "user",
+            {
+                "tenant": "acme",
+                "zone": "eu",
+                "id": "1",
+                "route_name": "user",
+            },
+        ) == self.r.match("acme.example.com", "/users/1")
+        assert (
+            "home",
+            {"region": "us", "route_name": "home"},
+        ) == self.r.match("a.us.example.net", "/")
+
+    def test_no_match(self):
+        assert (None, {}) == self.r.match("example.com", "/")
+        assert (None, {}) == self.r.match("a.b.example.com", "/")
+        assert (None, {}) == self.r.match("acme.example.com", "/x")
+
+    def test_default(self):
+        default = PathRouter()
+        default.add_routes([("/about", "about", None, "about")])
+        r = HostRouter(default)
+        assert "about" == r.match("x.org", "/about")[0]
+        assert (None, "/about") == r.path_for("about")
+
+    def test_cache(self):
+        router, kwargs = self.r.match_host("acme.example.com")
+        assert (router, kwargs) == self.r.match_host("acme.example.com")
+        assert 1 == self.r.cache.hits
+        self.r.match_host("example.org")
+        assert 1 == len(self.r.cache)
+        self.r.add_host("x.example.org", [])
+        assert 0 == len(self.r.cache)
+
+    def test_match_method(self):
+        assert ("home", {"route_name": "home"}, None) == (
+            self.r.match_method("www.example.com", "/", "GET")
+        )
+
+    def test_path_for(self):
+        assert ("www.example.com", "/") == self.r.path_for("home")
+        assert ("acme.example.com", "/users/1") == self.r.path_for(
+            "user", tenant="acme", id=1
+        )
+        self.assertRaises(KeyError, lambda: self.r.path_for("x"))
+
+    def test_path_for_host_names(self):
+        class QueryRouter(object):
+            path_map = {"docs": None}
+
+            def match(self, path):  # pragma: nocover
+                return None, {}
+
+            def path_for(self, name, **kwargs):
+                return "/%s?%s" % (name, urlencode(sorted(kwargs.items())))
+
+        self.r.add_host("{tenant}.example.org", QueryRouter())
+        assert ("acme.example.org", "/docs?page=2") == self.r.path_for(
+            "docs", tenant="acme", page=2
+        )
+
+    def test_frozen_router(self):
+        router = PathRouter()
+        router.add_routes(self.www)
+        self.r.add_host("frozen.example.org", router.freeze())
+        assert "home" == self.r.match("frozen.example.org", "/")[0]
+
+    def test_patterns_fused_on_match(self):
+        assert self.r.regex is None
+        self.r.match_host("acme.example.com")
+        regex = self.r.regex
+        assert regex is not None
+        self.r.add_host("{x}.example.org", self.www)
+        assert self.r.regex is None
+        assert "home" == self.r.match("a.example.org", "/")[0]
+        assert "home" == self.r.match("a.eu.example.net", "/")[0]
+
+    def test_segment_is_label(self):
+        r = HostRouter()
+        r.add_host("{tenant:s}.example.com", self.www)
+        assert "home" == r.match("acme.example.com", "/")[0]
+        assert (None, {}) == r.match("a.b.example.com", "/")
@@ -0,0 +1,118 @@
+import threading
+import unittest
+
+from wheezy.routing.host import HostRouter
+from wheezy.routing.lazy import LazyRouter, import_name
+from wheezy.routing.router import PathRouter
+from wheezy.routing.trie import TrieRouter
+
+MODULE = "wheezy.routing.tests.test_lazy"
+
+billing_urls = [
+    ("invoices", "invoices", None, "invoices"),
+    ("invoices/{id:i}", "invoice", None, "invoice"),
+    ("{locale:(en|ru)}/", LazyRouter(MODULE + ":help_urls")),
+]
+
+help_urls = [("help", "help", None, "help")]
+
+SOURCE = MODULE + ":billing_urls"
+
+
+class ImportNameTestCase(unittest.TestCase):
+    def test_import(self):
+        assert help_urls == import_name(MODULE + ":help_urls")
+        assert help_urls == import_name(MODULE + ".help_urls")
+        assert MODULE.title() == import_name(MODULE + ":MODULE.title")()
+        self.assertRaises(ImportError, lambda: import_name("x.y"))
+        self.assertRaises(AttributeError, lambda: import_name("os:x"))
+
+
+class LazyIncludeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.r = PathRouter()
+        self.r.add_routes(
+            [
+                ("/", [("billing/", LazyRouter(SOURCE))]),
+                ("/about", "about", None, "about"),
+            ]
+        )
+        self.lazy = self.r.lazy_includes[0][1]
+
+    def test_match(self):
+        assert ("about", {"route_name": "about"}) == self.r.match("/about")
+        assert self.lazy.router is None
+        assert (None, {}) == self.r.match("/billing/x")
+        router = self.lazy.router
+        assert router.__class__ is PathRouter
+        assert ("invoice", {"id": "1", "route_name": "invoice"}) == (
+            self.r.match("/billing/invoices/1")
+        )
+        assert router.match == self.lazy.match
+        assert ("help", {"locale": "ru", "route_name": "help"}) == (
+            self.r.match("/billing/ru/help")
+        )
+
+    def test_path_for(self):
+        assert "/about" == self.r.path_for("about")
+        assert self.lazy.router is None
+        assert "/billing/invoices/1" == self.r.path_for("invoice", id=1)
+        assert self.lazy.router is not None
+        assert "/billing/en/help" == self.r.path_for("help", locale="en")
+        assert not self.r.lazy_includes
+        self.assertRaises(KeyError, lambda: self.r.path_for("x"))
+
+    def test_path_for_many(self):
+        assert ["/about", "/billing/invoices"] == self.r.path_for_many(
+            [("about", None), ("invoices", None)]
+        )
+        assert not self.r.lazy_includes
+
+    def test_freeze(self):
+        frozen = self.r.freeze()
+        assert self.lazy.router is not None
+        assert "/billing/invoices" == frozen.path_for("invoices")
+        assert ("invoices", {"route_name": "invoices"}) == frozen.match(
+            "/billing/invoices"
+        )
+
+    def test_callable(self):
+        calls = []
+        barrier = threading.Barrier(4)
+
+        def urls():
+            calls.append(1)
+            return billing_urls
+
+        r = PathRouter()
+        r.include("/billing/", urls)
+        results = []
+
+        def target():
+            barrier.wait()
+            results.append(r.match("/billing/invoices")[0])
+
+        threads = [threading.Thread(target=target) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert ["invoices"] * 4 == results
+        assert [1] == calls
+
+    def test_trie_router(self):
+        r = TrieRouter()
+        r.include("/billing/", SOURCE)
+        r.add_route("/{page}", "page", None, "page")
+        assert ("invoices", {"route_name": "invoices"}) == r.match(
+            "/billing/invoices"
+        )
+        assert r.lazy_includes[0][1].router.__class__ is TrieRouter
+        assert "/billing/invoices" == r.path_for("invoices")
+
+    def test_host_router(self):
+        h = HostRouter()
+        h.add_host("www.example.com", self.r)
+        assert ("www.example.com", "/billing/invoices") == h.path_for(
+            "invoices"
+        )
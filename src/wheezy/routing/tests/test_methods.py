@@ -0,0 +1,93 @@
+import unittest
+
+from wheezy.routing.methods import MethodHandlers, resolve_method
+from wheezy.routing.router import PathRouter, url
+from wheezy.routing.trie import TrieRouter
+
+
+class MethodHandlersTestCase(unittest.TestCase):
+    def test_head(self):
+        h = MethodHandlers()
+        h.add(["GET"], "get", "x")
+        assert "get" == h.resolve("HEAD", {})[0]
+        h.add(["HEAD"], "head", "x")
+        h.add(["GET"], "get2", "x")
+        assert "head" == h.resolve("HEAD", {})[0]
+
+    def test_route_name(self):
+        h = MethodHandlers()
+        h.add(["GET"], "get", "x")
+        kwargs = {"route_name": "x"}
+        assert kwargs is h.resolve("GET", kwargs)[1]
+        assert {"route_name": "x"} == h.resolve("GET", None)[1]
+
+    def test_resolve_method(self):
+        assert ("h", {}, None) == resolve_method(("h", {}), "GET")
+        assert (None, {}, None) == resolve_method((None, {}), "GET")
+
+
+class RouterMethodsTestCase(unittest.TestCase):
+    urls = [
+        url("items", "list", None, "items", ["GET"]),
+        url("items", "create", None, "create_item", ["POST"]),
+        url("items/{id:i}", "item", None, "item", ["GET", "PUT"]),
+        url("items/{id:i}", "delete", None, "item", ["DELETE"]),
+        ("items/{id:i}/x", "any", None, "any"),
+    ]
+
+    def setUp(self):
+        self.r = PathRouter()
+        self.r.add_routes(self.urls)
+
+    def test_exact(self):
+        handler, kwargs, allowed = self.r.match_method("items", "POST")
+        assert "create" == handler
+        assert {"route_name": "create_item"} == kwargs
+        assert {"GET", "HEAD", "POST"} == allowed
+        assert "list" == self.r.match_method("items", "GET")[0]
+
+    def test_dynamic(self):
+        handlers, name = self.r.method_tables["items/{id:i}"]
+        assert "item" == name
+        assert 2 == len(self.r.mapping)
+        assert (
+            "delete",
+            {"id": "1", "route_name": "item"},
+            frozenset(["GET", "HEAD", "PUT", "DELETE"]),
+        ) == self.r.match_method("items/1", "DELETE")
+
+    def test_not_allowed(self):
+        handler, kwargs, allowed = self.r.match_method("items/1", "POST")
+        assert handler is None
+        assert {"GET", "HEAD", "PUT", "DELETE"} == allowed
+
+    def test_any_method(self):
+        assert ("any", {"id": "1", "route_name": "any"}, None) == (
+            self.r.match_method("items/1/x", "POST")
+        )
+        assert (None, {}, None) == self.r.match_method("x", "GET")
+
+    def test_path_for(self):
+        assert "items" == self.r.path_for("create_item")
+        assert "items/1" == self.r.path_for("item", id=1)
+
+    def test_included(self):
+        r = PathRouter()
+        r.include("api/", self.urls)
+        assert "create" == r.match_method("api/items", "POST")[0]
+        assert "delete" == r.match_method("api/items/1", "DELETE")[0]
+        f = r.freeze()
+        assert "delete" == f.match_method("api/items/1", "DELETE")[0]
+
+    def test_trie_router(self):
+        r = TrieRouter()
+        r.add_routes(self.urls)
+        for path, method in (
+            ("items", "POST"),
+            ("items/1", "DELETE"),
+            ("items/1", "POST"),
+            ("items/1/x", "GET"),
+        ):
+            assert self.r.match_method(path, method) == (
+                r.match_method(path, method)
+            )
@@ -0,0 +1,43 @@
+import unittest
+
+from wheezy.routing.choice import ChoiceRoute
+from wheezy.routing.curly import try_build_curly_route
+from wheezy.routing.fused import match_empty
+from wheezy.routing.order import literal_prefix, reorder, route_prefixes
+from wheezy.routing.plain import PlainRoute
+
+
+class LiteralPrefixTestCase(unittest.TestCase):
+    def test_prefix(self):
+        for pattern, prefix in (
+            ("abc", "abc"),
+            ("ab+", "a"),
+            ("ab{2}", "a"),
+            ("a\\/b\\d", "a/b"),
+            ("a\\", "a"),
+            ("(?P<x>a)b", ""),
+            ("[ab]", ""),
+            ("(?i)abc", ""),
+            ("a(b|c)", "a"),
+        ):
+            assert prefix == literal_prefix(pattern), pattern
+
+
+class RoutePrefixesTestCase(unittest.TestCase):
+    def test_routes(self):
+        assert ("abc",) == route_prefixes(PlainRoute("abc", False).match)
+        r = ChoiceRoute("x/{locale:(en|ru)}/", False)
+        assert ("x/en/", "x/ru/") == route_prefixes(r.match)
+        r = try_build_curly_route("posts/{id:i}")
+        assert ("posts/",) == route_prefixes(r.match)
+        assert ("",) == route_prefixes(match_empty)
+
+
+class ReorderTestCase(unittest.TestCase):
+    def test_overlapping_keep_order(self):
+        mapping = [
+            (try_build_curly_route(p).match, p)
+            for p in ("a/{id:i}", "a/{id:w}", "b/{id:i}")
+        ]
+        assert [2, 0, 1] == reorder(mapping, {1: 5, 2: 3})
+        assert [0, 1, 2] == reorder(mapping, {})
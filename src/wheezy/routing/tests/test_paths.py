@@ -0,0 +1,72 @@
+import unittest
+
+from wheezy.routing.choice import ChoiceRoute
+from wheezy.routing.curly import try_build_curly_route
+from wheezy.routing.paths import compile_path, path_template
+from wheezy.routing.plain import PlainRoute
+from wheezy.routing.regex import RegexRoute
+from wheezy.routing.route import Route
+
+
+class PathTemplateTestCase(unittest.TestCase):
+    def test_choice_with_default(self):
+        r = ChoiceRoute("{locale:(en|ru)}/", False, {"locale": "en"})
+        assert ("%(locale)s/", {"locale": "en"}) == path_template(r.path)
+
+    def test_regex(self):
+        r = RegexRoute("(?P<a>\\w+)/(?P<b>\\d+)", True, {"b": "1", "c": 2})
+        assert ("%(a)s/%(b)s", {"a": "", "b": "1"}) == path_template(r.path)
+
+    def test_not_known(self):
+        r = try_build_curly_route("{d:date}")
+        assert not path_template(r.path)
+        assert not path_template(Route().path)
+
+
+class CompilePathTestCase(unittest.TestCase):
+    def test_constant(self):
+        p = compile_path((PlainRoute("a", True).path,))
+        assert "a" == p()
+        assert "a" == p({"x": 1})
+
+    def test_defaults(self):
+        p = compile_path(
+            (
+                ChoiceRoute("{locale:(en|ru)}/", False, {"locale": "en"}).path,
+                RegexRoute("(?P<id>\\d+)", True, {"id": "1"}).path,
+            )
+        )
+        assert "en/1" == p()
+        assert "en/1" == p({})
+        assert "ru/2" == p({"locale": "ru", "id": 2})
+
+    def test_no_defaults(self):
+        p = compile_path((RegexRoute("a/(?P<id>\\d+)%%").path,))
+        assert "a/1%" == p({"id": 1})
+        self.assertRaises(KeyError, lambda: p({}))
+
+    def test_not_known(self):
+        r = try_build_curly_route("{d:date}")
+        paths = (PlainRoute("a/", False).path, r.path)
+        p = compile_path(paths)
+        assert "a/2019-03-08" == p({"d": "2019-03-08"})
+        assert r.path == compile_path(paths[1:])
+
+    def test_conflicting_defaults(self):
+        p = compile_path(
+            (
+                RegexRoute("(?P<x>\\w+)/", False, {"x": "a"}).path,
+                RegexRoute("(?P<x>\\w+)", True, {"x": "b"}).path,
+            )
+        )
+        assert "a/b" == p()
+
+    def test_shared_code(self):
+        a = compile_path((RegexRoute("a/(?P<id>\\d+)", True, {"id": 1}).path,))
+        b = compile_path((RegexRoute("a/(?P<id>\\w+)", True, {"id": 2}).path,))
+        assert a.__code__ is b.__code__
+        assert ("a/1", "a/2") == (a(), b())
+
+    def test_literal_percent(self):
+        r = RegexRoute("a%/(?P<id>\\d+)")
+        assert r.path == compile_path((r.path,))
@@ -40,6 +40,17 @@ class PlainRouteTestCase(unittest.TestCase):
         matched, kwargs = r.match("ab")
         r.exact_matches = None
 
+    def test_match_pos(self):
+        """Match at position."""
+        r = PlainRoute("abc", finishing=True, kwargs={}, name="test")
+        assert (5, {"route_name": "test"}) == r.match("x/abc", 2)
+        assert (-1, None) == r.match("x/abcd", 2)
+        assert (-1, None) == r.match("x/ab", 2)
+
+        r = PlainRoute("abc", finishing=False, kwargs={}, name=None)
+        assert (5, {}) == r.match("x/abcd", 2)
+        assert (-1, None) == r.match("x/ab", 2)
+
     def test_path(self):
         """Returns pattern."""
         r = PlainRoute("abc", finishing=False, kwargs={}, name=None)
@@ -1,6 +1,12 @@
+import pickle
 import unittest
 
-from wheezy.routing.regex import RegexRoute, try_build_regex_route
+from wheezy.routing.regex import (
+    LazyRegex,
+    RegexRoute,
+    literals,
+    try_build_regex_route,
+)
 
 
 class TryRegexRouteTestCase(unittest.TestCase):
@@ -60,6 +66,18 @@ class RegexRouteTestCase(unittest.TestCase):
 
         assert (-1, None) == r.match("abc/")
 
+    def test_match_pos(self):
+        r = RegexRoute(
+            "abc/(?P<id>[^/]+)", finishing=True, kwargs=None, name="test"
+        )
+        assert (9, {"id": "123", "route_name": "test"}) == r.match(
+            "x/abc/123", 2
+        )
+        assert (-1, None) == r.match("x/abc/123", 1)
+
+        r = RegexRoute("abc/", finishing=False, kwargs={"x": "1"})
+        assert (6, {"x": "1"}) == r.match("x/abc/123", 2)
+
     def test_path_no_kwargs(self):
         r = RegexRoute(
             "abc/(?P<id>[^/]+)", finishing=True, kwargs=None, name="test"
@@ -79,3 +97,73 @@ class RegexRouteTestCase(unittest.TestCase):
 
         assert "abc/123" == r.path({"id": "123"})
         assert "abc/1" == r.path()
+
+    def test_converters(self):
+        r = RegexRoute(
+            "abc/(?P<id>\\d+)",
+            finishing=True,
+            kwargs={"id": 1},
+            name="test",
+            converters={"id": (int, str), "x": (int, str)},
+        )
+
+        assert (("id", int, str),) == r.converters
+        assert (7, {"id": 123, "route_name": "test"}) == r.match("abc/123")
+        assert "abc/123" == r.path({"id": 123})
+        assert "abc/1" == r.path()
+
+    def test_converters_mismatch(self):
+        r = RegexRoute(
+            "abc/(?P<n>\\w+)",
+            finishing=False,
+            converters={"n": (int, str)},
+        )
+
+        assert (5, {"n": 1}) == r.match("abc/1")
+        assert (-1, None) == r.match("abc/x")
+        assert "abc/1" == r.path({"n": 1})
+
+    def test_converters_no_kwargs(self):
+        r = RegexRoute(
+            "abc/(?P<id>\\d+)", name="test", converters={"id": (int, str)}
+        )
+
+        assert (6, {"id": 12, "route_name": "test"}) == r.match("abc/12")
+        assert (-1, None) == r.match("abc/x")
+
+
+class LazyRegexTestCase(unittest.TestCase):
+    def test_compiled_on_first_match(self):
+        r = RegexRoute("abc/(?P<id>\\d+)", name="test", lazy=True)
+        assert isinstance(r.regex, LazyRegex)
+        assert r.regex.compiled is None
+        assert (-1, None) == r.match("abc/x")
+        compiled = r.regex.compiled
+        assert compiled
+        assert r.regex.match == compiled.match
+        assert (5, {"id": "1", "route_name": "test"}) == r.match("abc/1")
+        assert compiled is r.regex.compile()
+
+    def test_path(self):
+        r = RegexRoute("abc/(?P<id>\\d+)", lazy=True)
+        assert "abc/1" == r.path({"id": 1})
+        assert r.regex.compiled is None
+
+    def test_pickle(self):
+        r = LazyRegex("abc$")
+        r.compile()
+        r = pickle.loads(pickle.dumps(r))
+        assert "abc$" == r.pattern
+        assert r.compiled is None
+        assert r.match("abc")
+
+
+class LiteralsTestCase(unittest.TestCase):
+    def test_escaped(self):
+        assert ["a.b"] == literals(r"a\.b")
+        assert ["x*"] == literals(r"x\*")
+        assert ["a\\.b"] == literals(r"a\\\.b")
+
+    def test_not_parsed(self):
+        for p in (r"a\d", r"a\w", "[^/]", "a.b", r"a\\.b", "a+", "a*"):
+            assert literals(p) is None, p
@@ -1,7 +1,9 @@
 import unittest
 from unittest.mock import Mock
 
+from wheezy.routing.config import lazy_route_builders
 from wheezy.routing.router import PathRouter, url
+from wheezy.routing.trie import TrieRouter
 
 
 class RouterTestCase(unittest.TestCase):
@@ -65,6 +67,49 @@ class RouterMatchTestCase(unittest.TestCase):
 
         assert (None, {}) == self.r.match("x")
 
+    def test_match_pos(self):
+        self.r.include("{locale:(en|ru)}/", [("m/{id}", "h", None, "msg")])
+        self.r.include("{tenant}/", [("about", "a", None, "about")])
+
+        handler, kwargs = self.r.match("/en/m/1", 1)
+        assert "h" == handler
+        assert {"id": "1", "locale": "en", "route_name": "msg"} == kwargs
+        assert ("a", {"tenant": "t", "route_name": "about"}) == self.r.match(
+            "/t/about", 1
+        )
+
+    def test_promoted_after_dynamic(self):
+        self.r.add_route("posts/{id}", "post", name="post")
+        self.r.add_route("{page}", "page", name="page")
+        self.r.add_route("^about$", "about", name="about")
+        self.r.add_route("posts/(?P<id>new)", "new", name="new")
+        assert not self.r.match_map
+        assert ("page", {"page": "about", "route_name": "page"}) == (
+            self.r.match("about")
+        )
+        assert "post" == self.r.match("posts/new")[0]
+        r = PathRouter()
+        r.add_route("posts/{id}", "post", name="post")
+        r.add_route("^about$", "about", name="about")
+        assert ["about"] == list(r.match_map)
+
+    def test_match_empty_rest(self):
+        self.r.include("{tenant}/", [("", "index", None, "index")])
+        expected = ("index", {"tenant": "acme", "route_name": "index"})
+
+        assert expected == self.r.match("acme/")
+        assert expected == self.r.match("/acme/", 1)
+        assert [expected] == list(self.r.match_many(["acme/"]))
+        r = PathRouter(cache_size=10)
+        r.include("{tenant}/", [("", "index", None, "index")])
+        assert expected == r.match("acme/")
+        assert expected == r.match("acme/")
+        for router in (self.r.freeze(), self.r.compact(), self.r.generate()):
+            assert expected == router.match("acme/")
+        trie = TrieRouter()
+        trie.include("{tenant}/", [("", "index", None, "index")])
+        assert expected == trie.match("acme/")
+
     def test_scan_hierarchical_merge(self):
         self.r.include("m/", [("{id}", "h", {"a": "2"}, "msg")], {"a": "1"})
 
@@ -77,6 +122,70 @@ class RouterMatchTestCase(unittest.TestCase):
         assert (None, {}) == self.r.match("x")
 
 
+class RouterCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.r = PathRouter(cache_size=2)
+        self.r.add_routes(
+            [
+                ("", "h", None, "root"),
+                ("m/{id}", "m", {"a": "1"}, "msg"),
+                ("p/{id}", "p", None, "post"),
+            ]
+        )
+
+    def test_disabled(self):
+        assert PathRouter().cache is None
+
+    def test_exact_not_cached(self):
+        self.r.match("")
+        assert 0 == len(self.r.cache)
+
+    def test_hit(self):
+        expected = ("m", {"a": "1", "id": "1", "route_name": "msg"})
+        assert expected == self.r.match("m/1")
+        assert expected == self.r.match("m/1")
+        assert 1 == self.r.cache.hits
+
+    def test_miss_not_cached(self):
+        assert (None, {}) == self.r.match("x")
+        assert 0 == len(self.r.cache)
+
+    def test_kwargs_are_copied(self):
+        handler, kwargs = self.r.match("m/1")
+        kwargs["id"] = "2"
+        handler, kwargs = self.r.match("m/1")
+        assert "1" == kwargs["id"]
+        kwargs["id"] = "3"
+        assert "1" == self.r.match("m/1")[1]["id"]
+
+    def test_evictions(self):
+        for path in ("m/1", "m/2", "p/1", "m/1"):
+            self.r.match(path)
+        assert 2 == self.r.cache.evictions
+        assert 0 == self.r.cache.hits
+
+
+class RouterFuseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.r = PathRouter()
+
+    def test_fuse(self):
+        self.r.add_routes(
+            [
+                ("posts/{year:i}", "y", None, "year"),
+                ("posts/{year:i}/{month:i}", "m", {"day": "1"}, "month"),
+                ("", "h", None, "root"),
+                ("{locale:(en|ru)}/", [("{id:i}", "i", None, "item")]),
+                ("{any:any}", "n", None, "not_found"),
+            ]
+        )
+        paths = ("posts/2011", "posts/2011/09", "", "en/1", "ru/x", "x")
+        expected = [self.r.match(p) for p in paths]
+        self.r.fuse()
+        assert 3 == len(self.r.mapping)
+        assert expected == [self.r.match(p) for p in paths]
+
+
 class RouterPathForTestCase(unittest.TestCase):
     def setUp(self):
         self.r = PathRouter()
@@ -97,6 +206,256 @@ class RouterPathForTestCase(unittest.TestCase):
         assert "/en/signin" == self.r.path_for("signin")
         self.assertRaises(KeyError, lambda: self.r.path_for("x"))
 
+    def test_path_for_many(self):
+        self.r.add_routes(
+            [
+                ("/{locale:(en|ru)}/", [("posts/{id:i}", "h", None, "post")]),
+                ("/about", "h", None, "about"),
+            ]
+        )
+
+        assert ["/ru/posts/1", "/about"] == self.r.path_for_many(
+            [("post", {"locale": "ru", "id": 1}), ("about", None)]
+        )
+
+    def test_compiled_on_first_use(self):
+        self.r.add_routes(
+            [
+                ("/{locale:(en|ru)}/", [("posts/{id:i}", "h", None, "post")]),
+                ("/about", "h", None, "about"),
+            ]
+        )
+        assert {} == self.r.path_builders
+        assert "/about" == self.r.path_for("about")
+        assert ["about"] == list(self.r.path_builders)
+        path = self.r.path_builders["about"]
+        assert "/about" == self.r.path_for("about")
+        assert path is self.r.path_builders["about"]
+        self.r.replace_route("about", "/about-us", "h")
+        assert "/about-us" == self.r.path_for("about")
+        assert ["/en/posts/1"] == self.r.path_for_many(
+            [("post", {"locale": "en", "id": 1})]
+        )
+
+
+class RouterWarmTestCase(unittest.TestCase):
+    def setUp(self):
+        self.r = PathRouter(lazy_route_builders)
+        self.r.add_routes(
+            [
+                ("/{locale:(en|ru)}/", [("posts/{id:i}", "h", None, "post")]),
+                ("/admin/{id:i}", "h", None, "admin"),
+                ("/about", "h", None, "about"),
+            ]
+        )
+
+    def compiled(self):
+        paths = list(self.r.path_map.values())
+        for inner_paths in self.r.inner_path_map.values():
+            paths.extend(inner_paths)
+        regexes = [getattr(p.__self__, "regex", None) for p in paths]
+        return sorted(set([r.pattern for r in regexes if r and r.compiled]))
+
+    def test_lazy(self):
+        assert [] == self.compiled()
+        assert "/about" == self.r.path_for("about")
+        assert "/ru/posts/1" == self.r.path_for("post", locale="ru", id=1)
+        assert [] == self.compiled()
+        assert ("h", {"id": "1", "route_name": "admin"}) == self.r.match(
+            "/admin/1"
+        )
+        assert ["/admin/(?P<id>\\d+)$"] == self.compiled()
+
+    def test_warm_names(self):
+        self.r.warm(["post", "about"])
+        assert ["posts/(?P<id>\\d+)$"] == self.compiled()
+        self.assertRaises(KeyError, lambda: self.r.warm(["x"]))
+
+    def test_warm_all(self):
+        self.r.warm()
+        assert 2 == len(self.compiled())
+
+
+class RouterRemoveTestCase(unittest.TestCase):
+    def setUp(self):
+        self.r = PathRouter(cache_size=10)
+        self.r.add_routes(
+            [
+                ("about", "about", None, "about"),
+                ("{locale:(en|ru)}", "home", None, "home"),
+                ("a/{id:i}", "a", None, "a"),
+                ("b/{id:i}", "b", None, "b"),
+                ("c/{id:i}", "c", None, "c"),
+                (
+                    "api/",
+                    [
+                        ("users", "users", None, "users"),
+                        ("users/{id:i}", "user", None, "user"),
+                        ("v1/", [("ping", "ping", None, "ping")]),
+                    ],
+                    {"api": "1"},
+                ),
+                (
+                    "{locale:(en|ru)}/",
+                    [("signin", "signin", None, "signin")],
+                ),
+                (
+                    "{tenant}/",
+                    [
+                        ("about", "t_about", None, "t_about"),
+                        ("{id:i}", "item", None, "item"),
+                    ],
+                ),
+                ("{any:any}", "any", None, "any"),
+            ]
+        )
+
+    def test_remove_exact(self):
+        self.r.remove_route("about")
+        assert "any" == self.r.match("about")[0]
+        self.r.remove_route("home")
+        assert "any" == self.r.match("ru")[0]
+        self.r.remove_route("ping")
+        assert "any" == self.r.match("api/v1/ping")[0]
+        self.r.remove_route("signin")
+        assert "any" == self.r.match("en/signin")[0]
+        self.r.remove_route("t_about")
+        assert "any" == self.r.match("acme/about")[0]
+        for name in ("about", "home", "ping", "signin", "t_about"):
+            self.assertRaises(KeyError, self.r.path_for, name)
+        assert ["api/users"] == list(self.r.match_map)
+
+    def test_remove_nested(self):
+        assert "user" == self.r.match("api/users/1")[0]
+        assert 1 == len(self.r.cache)
+        self.r.remove_route("user")
+        assert 0 == len(self.r.cache)
+        assert ("any", {"any": "api/users/1", "route_name": "any"}) == (
+            self.r.match("api/users/1")
+        )
+        assert "users" == self.r.match("api/users")[0]
+        self.r.remove_route("item")
+        assert "any" == self.r.match("acme/1")[0]
+        self.assertRaises(KeyError, lambda: self.r.remove_route("item"))
+
+    def test_remove_fused(self):
+        self.r.fuse()
+        assert 4 == len(self.r.mapping)
+        regex = self.r.mapping[0][1].regex
+        self.r.remove_route("b")
+        assert 4 == len(self.r.mapping)
+        assert regex is self.r.mapping[0][1].regex
+        assert "a" == self.r.match("a/1")[0]
+        assert "item" == self.r.match("b/1")[0]
+        assert "c" == self.r.match("c/1")[0]
+        self.r.remove_route("a")
+        self.r.remove_route("c")
+        assert (None, {}) == self.r.mapping[0][1].match("c/1")
+        self.r.fuse()
+        assert 3 == len(self.r.mapping)
+
+    def test_remove_methods(self):
+        r = PathRouter()
+        r.add_routes(
+            [
+                url("items", "list", None, "items", ["GET"]),
+                url("items", "create", None, "create_item", ["POST"]),
+            ]
+        )
+        r.remove_route("create_item")
+        assert not r.match_map
+        assert not r.path_map
+        assert not r.method_tables
+
+    def test_replace(self):
+        self.r.fuse()
+        self.r.replace_route("b", "b/{id:w}", "b2")
+        assert ("b2", {"id": "x", "route_name": "b"}) == self.r.match("b/x")
+        assert "b/x" == self.r.path_for("b", id="x")
+        assert "c" == self.r.match("c/1")[0]
+        self.r.replace_route("user", "users/{id:w}", "user2")
+        assert "user2" == self.r.match("api/users/x")[0]
+        assert "api/users/x" == self.r.path_for("user", id="x")
+        self.r.replace_route("users", "people", "people")
+        assert ("people", {"api": "1", "route_name": "users"}) == (
+            self.r.match("api/people")
+        )
+        self.r.replace_route("ping", "pong", "pong")
+        assert "pong" == self.r.match("api/v1/pong")[0]
+        self.r.replace_route("about", "{x:i}", "x")
+        assert "about" not in self.r.match_map
+        assert "x" == self.r.mapping[-1][1]
+        assert "1" == self.r.path_for("about", x=1)
+
+    def test_replace_exact_only(self):
+        self.assertRaises(
+            ValueError,
+            lambda: self.r.replace_route("ping", "{x:i}", "ping"),
+        )
+        assert "ping" == self.r.match("api/v1/ping")[0]
+
+    def test_trie_router(self):
+        r = TrieRouter()
+        r.add_routes([("a", "a")])
+        self.assertRaises(TypeError, lambda: r.remove_route("a"))
+        self.assertRaises(TypeError, lambda: r.replace_route("a", "b", "b"))
+        t = TrieRouter()
+        t.add_route("{id:i}", "y", None, "y")
+        r = PathRouter()
+        r.include("{p}/", t)
+        self.assertRaises(TypeError, lambda: r.remove_route("y"))
+
+
+class RouterPromoteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.r = PathRouter()
+        self.r.add_routes(
+            [
+                ("^about$", "about", None, "about"),
+                (r"help\.html", "help", None, "help"),
+                ("page-{n:(a|b)}", "page", None, "page"),
+                (
+                    "(?P<locale>en|ru)/",
+                    [
+                        ("signin", "signin", None, "signin"),
+                        ("{id:i}", "item", None, "item"),
+                    ],
+                ),
+            ]
+        )
+
+    def test_exact(self):
+        assert {
+            "about",
+            "help.html",
+            "page-a",
+            "page-b",
+            "en/signin",
+            "ru/signin",
+        } == set(self.r.match_map)
+        assert 1 == len(self.r.mapping)
+        assert ("page", {"n": "b", "route_name": "page"}) == (
+            self.r.match("page-b")
+        )
+        assert ("signin", {"locale": "ru", "route_name": "signin"}) == (
+            self.r.match("ru/signin")
+        )
+        assert "item" == self.r.match("en/1")[0]
+        assert (None, {}) == self.r.match("page-c")
+
+    def test_path_for(self):
+        assert "about" == self.r.path_for("about")
+        assert "help.html" == self.r.path_for("help")
+        assert "page-a" == self.r.path_for("page", n="a")
+        assert "ru/signin" == self.r.path_for("signin", locale="ru")
+
+    def test_remove(self):
+        self.r.remove_route("page")
+        assert (None, {}) == self.r.match("page-a")
+        self.r.replace_route("help", r"help\.htm", "help2")
+        assert "help2" == self.r.match("help.htm")[0]
+        assert "help.html" not in self.r.match_map
+
 
 class UrlTestCase(unittest.TestCase):
     def test_url(self):
@@ -0,0 +1,150 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from wheezy.routing import snapshot
+from wheezy.routing.config import lazy_route_builders, route_builders
+from wheezy.routing.lazy import LazyRouter
+from wheezy.routing.router import PathRouter, url
+from wheezy.routing.trie import TrieRouter
+
+
+def home(environ, start_response):  # pragma: nocover
+    return []
+
+
+urls = [
+    ("", home),
+    ("posts/{year:i}", "year", None, "year"),
+    ("{locale:(en|ru)}/", [("signin", "signin", None, "signin")]),
+    ("files/{id:uuid}", "file", None, "file"),
+    url("items", "list", None, "items", ["GET"]),
+    url("items", "create", None, "create", ["POST"]),
+]
+
+MODULE = __name__
+
+included = [("invoices", "invoices", None, "invoices")]
+
+
+class SnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp, "routes.pickle")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def assert_same(self, a, b):
+        for path in ("", "posts/2011", "en/signin", "files/x"):
+            assert a.match(path) == b.match(path), path
+        assert a.match_method("items", "POST") == b.match_method(
+            "items", "POST"
+        )
+        for name, kwargs in (
+            ("home", {}),
+            ("year", {"year": 1}),
+            ("signin", {"locale": "ru"}),
+        ):
+            assert a.path_for(name, **kwargs) == b.path_for(name, **kwargs)
+
+    def test_round_trip(self):
+        r = PathRouter(cache_size=10)
+        r.add_routes(urls)
+        snapshot.dump(r, self.filename, "x")
+        loaded = snapshot.load(self.filename, "x")
+        assert PathRouter is loaded.__class__
+        assert 10 == loaded.cache.size
+        assert 0 == len(loaded.cache)
+        self.assert_same(r, loaded)
+        assert os.listdir(self.tmp) == ["routes.pickle"]
+
+    def test_trie_router(self):
+        r = TrieRouter()
+        r.add_routes(urls)
+        r.match("posts/2011")
+        snapshot.dump(r, self.filename, "x")
+        loaded = snapshot.load(self.filename, "x")
+        assert loaded.trie is None
+        assert loaded.route_builders is route_builders
+        assert loaded.splittable()
+        loaded.add_route("tags/{tag}", "tag", None, "tag")
+        assert ["tags", ("s",)] == loaded.records[-1][0]
+        assert 1 == len(loaded.fallback)
+        assert ("tag", {"tag": "x", "route_name": "tag"}) == loaded.match(
+            "tags/x"
+        )
+        self.assert_same(r, loaded)
+
+    def test_lazy(self):
+        r = PathRouter(lazy_route_builders)
+        r.add_routes(urls)
+        r.warm()
+        snapshot.dump(r, self.filename, "x")
+        loaded = snapshot.load(self.filename, "x")
+        assert loaded.route_builders is lazy_route_builders
+        regex = loaded.path_map["year"].__self__.regex
+        assert regex.compiled is None
+        self.assert_same(r, loaded)
+        assert regex.compiled
+
+    def test_lazy_include(self):
+        r = PathRouter()
+        r.include("billing/", "wheezy.routing.tests.test_lazy:billing_urls")
+        r.path_for("invoices")
+        r.include("help/", "wheezy.routing.tests.test_lazy:help_urls")
+        snapshot.dump(r, self.filename, "x")
+        loaded = snapshot.load(self.filename, "x")
+        billing, lazy = [handler for match, handler in loaded.mapping]
+        assert billing.router is not None
+        assert lazy.router is None
+        assert lazy.route_builders is route_builders
+        assert "billing/invoices" == loaded.path_for("invoices")
+        assert ("help", {"route_name": "help"}) == loaded.match("help/help")
+
+    def test_stale(self):
+        assert snapshot.load(self.filename, "x") is None
+        r = PathRouter()
+        r.add_routes(urls)
+        snapshot.dump(r, self.filename, "x")
+        assert snapshot.load(self.filename, "y") is None
+
+    def test_load_or_build(self):
+        r = snapshot.load_or_build(self.filename, urls)
+        assert os.path.exists(self.filename)
+        self.assert_same(r, snapshot.load_or_build(self.filename, urls))
+        h = snapshot.routes_hash(urls)
+        assert snapshot.load(self.filename, h) is not None
+        assert h != snapshot.routes_hash(urls[:-1])
+
+    def test_instrumented(self):
+        r = PathRouter()
+        r.add_routes(urls)
+        r.instrument()
+        self.assertRaises(
+            ValueError, lambda: snapshot.dump(r, self.filename, "x")
+        )
+        assert not os.listdir(self.tmp)
+
+    def test_routes_hash_router(self):
+        self.assertRaises(
+            TypeError, lambda: snapshot.routes_hash([("", PathRouter())])
+        )
+        lazy = LazyRouter(PathRouter)
+        self.assertRaises(
+            TypeError, lambda: snapshot.routes_hash([("", lazy)])
+        )
+
+    def test_routes_hash_lazy(self):
+        lazy = LazyRouter(MODULE + ":included")
+        h = snapshot.routes_hash([("a/", lazy)])
+        assert h == snapshot.routes_hash([("a/", included)])
+        assert h == snapshot.routes_hash(
+            [("a/", LazyRouter(lambda: included))]
+        )
+        included.append(("help", "help", None, "help"))
+        try:
+            assert h != snapshot.routes_hash([("a/", lazy)])
+        finally:
+            included.pop()
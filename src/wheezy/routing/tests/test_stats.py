@@ -0,0 +1,123 @@
+import unittest
+
+from wheezy.routing.router import PathRouter
+from wheezy.routing.trie import TrieRouter
+
+
+class InstrumentTestCase(unittest.TestCase):
+    def setUp(self):
+        self.r = PathRouter()
+        self.r.add_routes(
+            [
+                ("", "root", None, "root"),
+                ("posts/{year:i}", "year", None, "year"),
+                ("{locale:(en|ru)}/", [("user/{id:i}", "user", None, "user")]),
+                ("{p:any}", "any", None, "any"),
+            ]
+        )
+
+    def test_disabled(self):
+        assert PathRouter is self.r.__class__
+        assert self.r.stats() is None
+
+    def test_stats(self):
+        self.r.instrument()
+        for path in ("", "posts/1", "en/user/1", "en/user/x", "x"):
+            self.r.match(path)
+        stats = self.r.stats()
+        assert 5 == stats["matches"]
+        assert 4 == stats["scans"]
+        assert 0 == stats["misses"]
+        assert {1: 1, 2: 1, 3: 2} == stats["tries"]
+        assert 5 == sum(stats["latency"].values())
+        routes = stats["routes"]
+        assert [1, 1, 2] == [r["hits"] for r in routes]
+        assert "posts/(?P<year>\\d+)$" == routes[0]["route"]
+        nested = routes[1]["nested"]
+        assert 2 == nested["matches"]
+        assert 1 == nested["misses"]
+        assert "nested" not in routes[2]
+
+    def test_uninstrument(self):
+        self.r.instrument()
+        self.r.uninstrument()
+        assert PathRouter is self.r.__class__
+        assert (
+            "year",
+            {"year": "1", "route_name": "year"},
+        ) == self.r.match("posts/1")
+        assert self.r.stats() is None
+
+    def test_instrument_twice(self):
+        self.r.instrument()
+        self.r.match("x")
+        self.r.instrument()
+        assert 0 == self.r.stats()["matches"]
+        self.r.uninstrument()
+        assert PathRouter is self.r.__class__
+
+    def test_trie_router(self):
+        r = TrieRouter()
+        r.add_routes([("posts/{year:i}", "year", None, "year")])
+        r.instrument()
+        assert isinstance(r, TrieRouter)
+        assert ("year", {"year": "1", "route_name": "year"}) == r.match(
+            "posts/1"
+        )
+        assert 1 == r.stats()["matches"]
+        r.uninstrument()
+        assert TrieRouter is r.__class__
+
+    def test_trie_router_hits(self):
+        r = TrieRouter()
+        r.add_routes(
+            [
+                ("posts/{year:i}", "year", None, "year"),
+                (r"x-(?P<n>\d+)", "x", None, "x"),
+                ("{p:any}", "any", None, "any"),
+            ]
+        )
+        assert 1 == len(r.fallback)
+        r.instrument()
+        for path in ("posts/1", "x-1", "x-2", "y", "posts/1\n"):
+            r.match(path)
+        stats = r.stats()
+        assert [2, 2, 1] == [route["hits"] for route in stats["routes"]]
+        assert {1: 4, 2: 1} == stats["tries"]
+        assert 0 == stats["misses"]
+
+
+class ReorderTestCase(unittest.TestCase):
+    urls = [
+        ("a/{id:i}", "a", None, "a"),
+        ("{p:any}", "any", None, "any"),
+        ("b/{id:i}", "b", None, "b"),
+        ("c/{id:i}", "c", None, "c"),
+        ("c/{id:w}", "cw", None, "cw"),
+    ]
+
+    def setUp(self):
+        self.r = PathRouter()
+        self.r.add_routes(self.urls)
+
+    def test_not_instrumented(self):
+        self.assertRaises(RuntimeError, self.r.reorder)
+
+    def test_reorder(self):
+        self.r.instrument()
+        for path in ("a/1", "x", "x", "a/1", "a/1"):
+            self.r.match(path)
+        self.r.reorder()
+        assert ["a", "any", "b", "c", "cw"] == [h for m, h in self.r.mapping]
+        assert {0: 1, 1: 1} == self.r.route_stats.hits
+
+    def test_reorder_every(self):
+        self.r.add_route("d/{id:i}", "d", None, "d")
+        self.r.mapping.pop(1)
+        paths = ("d/1", "c/x", "c/1", "x")
+        expected = [self.r.match(p) for p in paths]
+        self.r.instrument(reorder_every=3)
+        for _ in range(3):
+            self.r.match("d/1")
+        assert ["d", "a", "b", "c", "cw"] == [h for m, h in self.r.mapping]
+        assert expected == [self.r.match(p) for p in paths]
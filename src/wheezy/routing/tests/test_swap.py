@@ -0,0 +1,149 @@
+import threading
+import unittest
+
+from wheezy.routing.router import PathRouter, url
+from wheezy.routing.swap import SwapRouter
+from wheezy.routing.trie import TrieRouter
+
+
+def urls():
+    return [
+        ("", "root", None, "root"),
+        ("posts/{year:i}", "year", None, "year"),
+        (
+            "api/",
+            [
+                ("users", "users", None, "users"),
+                ("users/{id:i}", "user", None, "user"),
+            ],
+        ),
+        (
+            "{locale:(en|ru)}/",
+            [
+                ("signin", "signin", None, "signin"),
+                ("{user:w}", "profile", None, "profile"),
+            ],
+        ),
+        url("items", "list", None, "items", ["GET"]),
+        url("items", "create", None, "create_item", ["POST"]),
+    ]
+
+
+class PathRouterCopyTestCase(unittest.TestCase):
+    def test_copy(self):
+        r = PathRouter(cache_size=10)
+        r.add_routes(urls())
+        r.match("posts/2011")
+        c = r.copy()
+        assert 0 == len(c.cache)
+        assert c.mapping[0] == r.mapping[0]
+        c.add_route("beta", "beta", None, "beta", ["GET"])
+        c.add_route("items", "delete", None, "delete_item", ["DELETE"])
+        assert (None, {}) == r.match("beta")
+        assert "beta" == c.match_method("beta", "GET")[0]
+        assert "delete" == c.match_method("items", "DELETE")[0]
+        assert r.match_method("items", "DELETE")[0] is None
+        self.assertRaises(KeyError, lambda: r.path_for("beta"))
+        assert "beta" == c.path_for("beta")
+
+    def test_trie_router(self):
+        r = TrieRouter()
+        r.add_routes(urls()[:-2])
+        r.match("posts/2011")
+        c = r.copy()
+        assert c.trie is r.trie
+        c.add_route("{x:i}", "x", None, "x")
+        assert "x" == c.match("1")[0]
+        assert r.match("1")[0] is None
+
+
+class SwapRouterTestCase(unittest.TestCase):
+    def setUp(self):
+        r = PathRouter()
+        r.add_routes(urls())
+        self.r = SwapRouter(r)
+
+    def test_add(self):
+        old = self.r.router
+        with self.r.transaction() as t:
+            t.add_route("beta/{id:i}", "beta", None, "beta")
+            t.include("flags/", [("on", "on", None, "on")])
+            assert self.r.router is old
+        assert self.r.router is not old
+        assert ("beta", {"id": "1", "route_name": "beta"}) == self.r.match(
+            "beta/1"
+        )
+        assert "flags/on" == self.r.path_for("on")
+        assert ["flags/on"] == self.r.path_for_many([("on", None)])
+        assert (None, {}) == old.match("flags/on")
+
+    def test_match_of_current_router(self):
+        match = self.r.match
+        assert match.__self__ is self.r.router
+        with self.r.transaction() as t:
+            t.add_route("beta", "beta", None, "beta")
+        assert self.r.match.__self__ is self.r.router
+        assert (None, {}) == match("beta")
+        assert "beta" == self.r.match("beta")[0]
+
+    def test_remove(self):
+        old = self.r.router
+        with self.r.transaction() as t:
+            t.remove_route("year")
+            t.remove_route("user")
+            t.remove_route("signin")
+            t.remove_route("items")
+        for path in ("posts/2011", "api/users/1", "items"):
+            assert (None, {}) == self.r.match(path), path
+            assert old.match(path)[0], path
+        assert "users" == self.r.match("api/users")[0]
+        assert "profile" == self.r.match("en/signin")[0]
+        assert "signin" == old.match("en/signin")[0]
+        for name in ("year", "user", "signin", "items", "create_item"):
+            self.assertRaises(KeyError, self.r.path_for, name)
+            assert old.path_for(name, year=1, id=1, locale="en")
+        t = self.r.transaction()
+        t.remove_route("unknown")
+        self.assertRaises(KeyError, t.commit)
+
+    def test_remove_trie_router(self):
+        r = SwapRouter(TrieRouter())
+        t = r.transaction()
+        t.add_routes(urls())
+        t.commit()
+        t.remove_route("root")
+        self.assertRaises(TypeError, t.commit)
+
+    def test_rollback(self):
+        old = self.r.router
+        try:
+            with self.r.transaction() as t:
+                t.add_route("beta", "beta")
+                raise ValueError()
+        except ValueError:
+            pass
+        assert self.r.router is old
+        assert ("list", {"route_name": "items"}) == self.r.match_method(
+            "items", "GET"
+        )[:2]
+
+    def test_concurrent_match(self):
+        stop = threading.Event()
+        errors = []
+
+        def target():
+            while not stop.is_set():
+                if self.r.match("api/users/1")[0] != "user":
+                    errors.append(1)
+
+        threads = [threading.Thread(target=target) for i in range(4)]
+        for t in threads:
+            t.start()
+        for i in range(50):
+            with self.r.transaction() as t:
+                t.add_route("beta%d" % i, "beta", None, "beta%d" % i)
+        stop.set()
+        for t in threads:
+            t.join()
+        assert not errors
+        assert "beta" == self.r.match("beta49")[0]
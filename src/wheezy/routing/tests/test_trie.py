@@ -0,0 +1,158 @@
+import unittest
+
+from wheezy.routing.router import PathRouter
+from wheezy.routing.trie import SegmentTrie, TrieRouter, split_pattern
+
+
+class SplitPatternTestCase(unittest.TestCase):
+    def test_plain(self):
+        assert (True, [(["a", "b"], {"route_name": "x"}, (), ())]) == (
+            split_pattern("a/b", True, None, "x")
+        )
+        assert (True, [([""], {}, (), ())]) == split_pattern("", False)
+
+    def test_curly(self):
+        exact, variants = split_pattern("a/{id:i}/{n:w}", True, {"x": 1}, "y")
+        assert not exact
+        segments, defaults, names, converters = variants[0]
+        assert ["a", ("i",), ("w",)] == segments
+        assert {"id": "", "n": "", "x": 1, "route_name": "y"} == defaults
+        assert ("id", "n") == names
+        assert () == converters
+
+    def test_rest(self):
+        exact, variants = split_pattern("a/{p:any}", True, None, "y")
+        assert ["a", ("*",)] == variants[0][0]
+        assert not split_pattern("{p:any}/a", True, None, "y")
+        assert not split_pattern("a/{p:any}", False)
+
+    def test_not_representable(self):
+        for p in (
+            "a/{id:i}.html",
+            "a.b/{id}",
+            "[{locale:(en|ru)}/]home",
+            "a/{x:(a|b)}/{y}",
+            "{id}/{id}",
+            "posts/(?P<year>\\d+)",
+        ):
+            assert not split_pattern(p, True, None, "y"), p
+
+
+class SegmentTrieTestCase(unittest.TestCase):
+    def test_lookup(self):
+        t = SegmentTrie()
+        t.insert(["a", ("i",)], ((1,), "h1", (({"x": "1"}, ("id",), ()),)))
+        t.insert(["a", "1"], ((2,), "h2", (({}, (), ()),)))
+        t.insert(["a", ("*",)], ((0, 3), "h3", (({}, ("p",), ()),)))
+        assert [(0, 3), "h3", {"p": "1"}] == t.lookup("a/1")
+        assert [(0, 3), "h3", {"p": "b/c"}] == t.lookup("a/b/c")
+        assert not t.lookup("b/1")
+        assert not t.lookup("a/")
+
+    def test_lookup_converters(self):
+        t = SegmentTrie()
+        t.insert(["a", ("w",)], ((1,), "h1", (({}, ("id",), (("id", int),)),)))
+        t.insert(["a", ("s",)], ((2,), "h2", (({}, ("n",), ()),)))
+        assert [(1,), "h1", {"id": 1}] == t.lookup("a/1")
+        assert [(2,), "h2", {"n": "x"}] == t.lookup("a/x")
+
+
+class TrieRouterTestCase(unittest.TestCase):
+    urls = [
+        ("", "root"),
+        ("posts/{year:i}", "year", {"page": "1"}, "year"),
+        ("posts/{year:i}/{month:i}", "month", None, "month"),
+        ("posts/latest", "latest", None, "latest"),
+        ("posts/{slug}", "post", None, "post"),
+        (
+            "{locale:(en|ru)}/",
+            [
+                ("signin", "signin", None, "signin"),
+                ("{user:w}", "user", None, "user"),
+                ("u/(?P<id>\\d+)", "regex", None, "regex"),
+            ],
+        ),
+        ("files/{p:any}", "files", None, "files"),
+        (
+            "{tenant}/",
+            [
+                ("about", "about", None, "about"),
+                ("{id:i}", "item", {"tenant": "x"}, "item"),
+            ],
+            {"a": "1"},
+        ),
+        ("{any:any}", "not_found", None, "not_found"),
+    ]
+    paths = (
+        "",
+        "posts/2011",
+        "posts/2011/09",
+        "posts/latest",
+        "posts/x",
+        "posts/",
+        "en/signin",
+        "en/bob",
+        "en/u/1",
+        "de/bob",
+        "files/a/b.txt",
+        "t/about",
+        "t/12",
+        "t/12/x",
+        "x\n",
+        "posts/2011\n",
+    )
+
+    def test_same_as_path_router(self):
+        r = PathRouter()
+        r.add_routes(self.urls)
+        t = TrieRouter()
+        t.add_routes(self.urls)
+        for path in self.paths:
+            assert r.match(path) == t.match(path), path
+
+    def test_fallback(self):
+        t = TrieRouter()
+        t.add_routes(self.urls)
+        assert 1 == len(t.fallback)
+        assert not t.indexable
+
+    def test_no_match(self):
+        t = TrieRouter()
+        t.add_routes(self.urls[:-1])
+        assert (None, {}) == t.match("t/12/x")
+
+    def test_included_router(self):
+        inner = TrieRouter()
+        inner.add_routes([("{id:i}", "item", None, "item")])
+        t = TrieRouter()
+        t.include("{tenant}/", inner)
+        assert not t.fallback
+        assert (
+            "item",
+            {"tenant": "a", "id": "1", "route_name": "item"},
+        ) == t.match("a/1")
+        assert "a/1" == t.path_for("item", tenant="a", id=1)
+
+    def test_custom_route_builders(self):
+        from wheezy.routing.config import route_builders
+
+        t = TrieRouter(list(route_builders))
+        t.add_routes([("posts/{year:i}", "year", None, "year")])
+        assert not t.records
+        assert ("year", {"year": "1", "route_name": "year"}) == t.match(
+            "posts/1"
+        )
+
+    def test_converters(self):
+        from wheezy.routing import curly
+
+        curly.converters["i"] = (int, str)
+        try:
+            t = TrieRouter()
+            t.add_routes(self.urls)
+        finally:
+            del curly.converters["i"]
+        assert ("year", {"year": 2011, "page": "1", "route_name": "year"}) == (
+            t.match("posts/2011")
+        )
+        assert "t/12" == t.path_for("item", tenant="t", id=12)
@@ -0,0 +1,476 @@
+import re
+
+from wheezy.routing import curly
+from wheezy.routing.choice import (
+    RE_CHOICE_ROUTE,
+    expand_choices,
+    expandable,
+    parse_choices,
+)
+from wheezy.routing.config import route_builders as default_route_builders
+from wheezy.routing.frozen import merge
+from wheezy.routing.lazy import LazyRouter
+from wheezy.routing.plain import RE_PLAIN_ROUTE
+from wheezy.routing.router import PathRouter
+from wheezy.routing.stats import instrumented_scan
+from wheezy.routing.utils import route_name
+
+RE_PLACEHOLDER = re.compile(r"^\{(?P<n>\w+)(?::(?P<p>[^{}]*))?\}$")
+RE_STATIC = re.compile(r"^[\w-]*$")
+RE_WORD = re.compile(r"\w+")
+
+# curly pattern regex => wildcard type
+wildcard_types = {r"\d+": "i", r"\w+": "w", r"[^/]+": "s", r".+": "*"}
+
+checks = {
+    "i": str.isdecimal,
+    "w": RE_WORD.fullmatch,
+    "s": bool,
+}
+
+
+def split_pattern(pattern, finishing=True, kwargs=None, name=None):
+    """Splits ``pattern`` into ``/`` delimited segments. Returns
+    a tuple of ``exact`` flag and a list of variants
+    ``(segments, defaults, names, converters)``, or ``None`` if the
+    pattern can not be represented by segments.
+
+    A segment is either a string or a wildcard tuple of one of
+    types: ``i`` (digits), ``w`` (word), ``s`` (segment) or ``*``
+    (the rest of path).
+
+    >>> split_pattern('posts/{year:i}', name='y')
+    (False, [(['posts', ('i',)], {'route_name': 'y'}, ('year',), ())])
+    >>> split_pattern('{locale:(en|ru)}/', False)
+    ... # doctest: +NORMALIZE_WHITESPACE
+    (True, [(['en', ''], {'locale': 'en'}, (), ()),
+            (['ru', ''], {'locale': 'ru'}, (), ())])
+    >>> split_pattern('posts/(?P<year>\\\\d+)')
+    """
+    if not isinstance(pattern, str):
+        return None
+    kwargs = kwargs and kwargs.copy() or {}
+    if pattern == "" or RE_PLAIN_ROUTE.match(pattern):
+        if finishing and name:
+            kwargs["route_name"] = name
+        return True, [(pattern.split("/"), kwargs, (), ())]
+    if RE_CHOICE_ROUTE.match(pattern):
+        return split_choices(pattern, kwargs, name)
+    return split_curly(pattern, finishing, kwargs, name)
+
+
+def split_curly(pattern, finishing, kwargs, name=None):
+    """Splits curly ``pattern`` into segments, the same way as
+    ``split_pattern`` does. Returns ``None`` if a placeholder is
+    not a whole segment or its pattern is not a known wildcard.
+
+    >>> split_curly('{id:i}/{rest:*}', True, {})
+    (False, [([('i',), ('*',)], {'route_name': None}, ('id', 'rest'), ())])
+    >>> split_curly('a{id:i}', True, {})
+    """
+    split = split_segments(pattern)
+    if split is None:
+        return None
+    segments, names, converters = split
+    if not names or ("*",) in segments[:-1]:
+        return None
+    if not finishing and ("*",) in segments:
+        return None
+    if kwargs:
+        kwargs = dict(dict.fromkeys(names, ""), **kwargs)
+    if finishing:
+        kwargs["route_name"] = name
+    return False, [(segments, kwargs, tuple(names), tuple(converters))]
+
+
+def split_segments(pattern):
+    """Returns a tupple of (segments, names, converters) of curly
+    ``pattern`` split by ``/`` or ``None``.
+    """
+    segments = []
+    names = []
+    converters = []
+    for segment in pattern.split("/"):
+        m = RE_PLACEHOLDER.match(segment)
+        if m:
+            n, p = m.groups()
+            p = p or curly.default_pattern
+            t = wildcard_types.get(curly.patterns.get(p, p))
+            if not t or n == "route_name" or n in names:
+                return None
+            names.append(n)
+            segments.append((t,))
+            if p in curly.converters:
+                converters.append((n, curly.converters[p][0]))
+        elif RE_STATIC.match(segment):
+            segments.append(segment)
+        else:
+            return None
+    return segments, names, converters
+
+
+def split_choices(pattern, kwargs, name=None):
+    """Splits every path of choice ``pattern`` into segments, the
+    same way as ``split_pattern`` does. Returns ``None`` if there
+    are too many combinations of choices.
+
+    >>> split_choices('{a:(x|y)}/{b:(z)}', {})
+    ... # doctest: +NORMALIZE_WHITESPACE
+    (True, [(['x', 'z'], {'a': 'x', 'b': 'z'}, (), ()),
+            (['y', 'z'], {'a': 'y', 'b': 'z'}, (), ())])
+    """
+    texts, names, choices = parse_choices(pattern)
+    if not expandable(choices):
+        return None
+    if name:
+        kwargs["route_name"] = name
+    return True, [
+        (path.split("/"), kw, (), ())
+        for path, kw in expand_choices(texts, names, choices, kwargs)
+    ]
+
+
+def join_segments(prefix, segments):
+    """Concatenates segments of an intermediate route with
+    segments of a nested route. Returns ``None`` if the join
+    mixes a wildcard with a string in one segment.
+
+    >>> join_segments(['api', ''], ['users'])
+    ['api', 'users']
+    >>> join_segments([('s',)], ['', 'x'])
+    [('s',), 'x']
+    >>> join_segments(['v'], [('i',)])
+    """
+    last, first = prefix[-1], segments[0]
+    if isinstance(last, str) and isinstance(first, str):
+        return prefix[:-1] + [last + first] + segments[1:]
+    if last == "":
+        return prefix[:-1] + segments
+    if first == "":
+        return prefix + segments[1:]
+    return None
+
+
+class TrieNode(object):
+    """A node of segment trie."""
+
+    __slots__ = ("static", "wildcards", "rest", "leaf", "key")
+
+    def __init__(self):
+        self.static = {}
+        self.wildcards = []
+        self.rest = None
+        self.leaf = None
+        self.key = None
+
+
+class SegmentTrie(object):
+    """Radix tree of ``/`` delimited segments. Every leaf keeps
+    a record ``(key, handler, levels)`` where ``key`` is the order
+    of the route in the route table and ``levels`` is a tuple of
+    ``(defaults, names, converters)`` per nested router used to build
+    kwargs.
+    """
+
+    __slots__ = ("root",)
+
+    def __init__(self):
+        self.root = TrieNode()
+
+    def insert(self, segments, record):
+        """Adds the record for given segments."""
+        key = record[0]
+        node = self.root
+        for segment in segments:
+            if node.key is None or key < node.key:
+                node.key = key
+            if isinstance(segment, str):
+                child = node.static.get(segment)
+                if child is None:
+                    child = node.static[segment] = TrieNode()
+            elif segment[0] == "*":
+                if node.rest is None or key <= node.rest[0]:
+                    node.rest = record
+                return
+            else:
+                t = segment[0]
+                child = next((c for w, _, c in node.wildcards if w == t), None)
+                if child is None:
+                    child = TrieNode()
+                    node.wildcards.append((t, checks[t], child))
+            node = child
+        if node.key is None or key < node.key:
+            node.key = key
+        if node.leaf is None or key <= node.leaf[0]:
+            node.leaf = record
+
+    def lookup(self, path):
+        """Returns a tuple of ``(key, handler, kwargs)`` for the
+        first route in the route table that matches ``path``,
+        otherwise ``None``.
+        """
+        best = [None, None, None]
+        search(self.root, path.split("/"), 0, [], best)
+        if best[0] is None:
+            return None
+        return best
+
+
+def make_kwargs(levels, values):
+    """Returns kwargs for captured values or ``None`` if a value
+    can not be converted.
+    """
+    values = iter(values)
+    kwargs = {}
+    try:
+        for defaults, names, converters in levels:
+            kwargs.update(defaults)
+            for name in names:
+                kwargs[name] = next(values)
+            for name, to_python in converters:
+                kwargs[name] = to_python(kwargs[name])
+    except ValueError:
+        return None
+    return kwargs
+
+
+def accept(record, values, best):
+    kwargs = make_kwargs(record[2], values)
+    if kwargs is not None:
+        best[:] = record[0], record[1], kwargs
+
+
+def search(node, segments, i, values, best):
+    key = best[0]
+    if key is not None and node.key >= key:
+        return
+    if i == len(segments):
+        leaf = node.leaf
+        if leaf is not None and (key is None or leaf[0] < key):
+            accept(leaf, values, best)
+        return
+    segment = segments[i]
+    child = node.static.get(segment)
+    if child is not None:
+        search(child, segments, i + 1, values, best)
+    if segment:
+        for _, check, child in node.wildcards:
+            if check(segment):
+                values.append(segment)
+                search(child, segments, i + 1, values, best)
+                values.pop()
+    rest = node.rest
+    if rest is not None and (best[0] is None or rest[0] < best[0]):
+        value = "/".join(segments[i:])
+        if value and "\n" not in value:
+            accept(rest, values + [value], best)
+
+
+class TrieRouter(PathRouter):
+    """Path router that keeps plain, choice and curly routes made of
+    ``/`` delimited segments in a radix tree, so match cost depends
+    on the path depth rather than the number of routes. Other routes
+    are scanned in order as usual, the first route in the route
+    table that matches still wins.
+    """
+
+    __slots__ = ("records", "fallback", "indexable", "trie")
+
+    def __init__(self, route_builders=None, cache_size=None):
+        super(TrieRouter, self).__init__(route_builders, cache_size)
+        self.records = []
+        self.fallback = []
+        self.indexable = True
+        self.trie = None
+
+    def add_route(
+        self, pattern, handler, kwargs=None, name=None, methods=None
+    ):
+        """Adds a pattern to route table"""
+        name = name or route_name(handler)
+        index = len(self.mapping)
+        added = methods and pattern in self.method_tables
+        super(TrieRouter, self).add_route(
+            pattern, handler, kwargs, name, methods
+        )
+        if added:
+            return
+        if methods:
+            handler = self.method_tables[pattern][0]
+        split = self.splittable() and split_pattern(
+            pattern, True, kwargs, name
+        )
+        if split:
+            exact, variants = split
+            key = exact and (-1,) or (index,)
+            for segments, defaults, names, converters in variants:
+                record = (key, handler, ((defaults, names, converters),))
+                self.records.append((segments, record))
+            self.trie = None
+        else:
+            self.add_fallback(index)
+
+    def include(self, pattern, included, kwargs=None):
+        """Includes nested routes below the current."""
+        if isinstance(included, str) or callable(included):
+            included = LazyRouter(included, TrieRouter, self.route_builders)
+        if not isinstance(included, (PathRouter, LazyRouter)):
+            router = TrieRouter(self.route_builders)
+            router.add_routes(included)
+            included = router
+        index = len(self.mapping)
+        records = None
+        if isinstance(included, TrieRouter) and included.indexable:
+            split = self.splittable() and split_pattern(pattern, False, kwargs)
+            if split:
+                records = join_records(index, split, included.records)
+        super(TrieRouter, self).include(pattern, included, kwargs)
+        if records is not None:
+            self.records.extend(records)
+            self.trie = None
+        else:
+            self.add_fallback(index)
+
+    def copy_into(self, router):
+        """Copies the route table of this router to the ``router``,
+        the segment trie is shared until a route is added.
+        """
+        super(TrieRouter, self).copy_into(router)
+        router.records = list(self.records)
+        router.fallback = list(self.fallback)
+        router.indexable = self.indexable
+        router.trie = self.trie
+
+    def replace_handlers(self, replaced):
+        """Replaces handlers in route table and segment trie records
+        by ``replaced``, a mapping of ``id`` of a handler to the new
+        one.
+        """
+        super(TrieRouter, self).replace_handlers(replaced)
+        self.records = [
+            (segments, (key, replaced.get(id(handler), handler), levels))
+            for segments, (key, handler, levels) in self.records
+        ]
+        self.fallback = [
+            (index, match, replaced.get(id(handler), handler))
+            for index, match, handler in self.fallback
+        ]
+        self.trie = None
+
+    def remove_route(self, name, copy_nested=False):
+        """Routes can not be removed, records of the segment trie
+        refer to positions in route table.
+        """
+        raise TypeError("TrieRouter: routes can not be removed.")
+
+    def replace_route(
+        self,
+        name,
+        pattern,
+        handler,
+        kwargs=None,
+        methods=None,
+        copy_nested=False,
+    ):
+        """Routes can not be replaced, see ``remove_route``."""
+        raise TypeError("TrieRouter: routes can not be removed.")
+
+    def splittable(self):
+        return self.route_builders is default_route_builders
+
+    def add_fallback(self, index):
+        self.indexable = False
+        self.trie = None
+        if len(self.mapping) > index:
+            match, handler = self.mapping[index]
+            self.fallback.append((index, match, handler))
+
+    def reorder(self):
+        """Routes are kept in order, the segment trie already finds
+        a match regardless of the route position.
+        """
+
+    def scan(self, path, pos=0):
+        """Tries to find a match for the given path in the segment
+        trie and ordered routes. Returns a tupple of (handler, kwargs)
+        """
+        if path[-1:] == "\n":
+            # regex ``$`` matches before the trailing newline
+            return super(TrieRouter, self).scan(path, pos)
+        trie = self.trie or self.segment_trie()
+        found = trie.lookup(path[pos:] if pos else path)
+        for index, match, handler in self.fallback:
+            if found and index >= found[0][0]:
+                break
+            matched, kwargs = match(path, pos)
+            if matched >= 0:
+                match = getattr(handler, "match", None)
+                if not match:
+                    return handler, kwargs
+                handler, kwargs_inner = match(path, matched)
+                if handler:
+                    return handler, merge(kwargs, kwargs_inner)
+        if found:
+            return found[1], found[2]
+        return None, {}
+
+    def instrumented_scan(self, path, pos=0):
+        """Tries to find a match the way ``scan`` does and counts hits
+        of routes, see ``instrument``. Routes found in the segment
+        trie count as tried after the ordered routes.
+        """
+        if path[-1:] == "\n":
+            return instrumented_scan(self, path, pos)
+        stats = self.route_stats
+        trie = self.trie or self.segment_trie()
+        found = trie.lookup(path[pos:] if pos else path)
+        tried = 0
+        for index, match, handler in self.fallback:
+            if found and index >= found[0][0]:
+                break
+            tried += 1
+            matched, kwargs = match(path, pos)
+            if matched >= 0:
+                match = getattr(handler, "match", None)
+                if not match:
+                    stats.hit(index, tried)
+                    return handler, kwargs
+                handler, kwargs_inner = match(path, matched)
+                if handler:
+                    stats.hit(index, tried)
+                    return handler, merge(kwargs, kwargs_inner)
+        if found:
+            stats.hit(found[0][0], tried + 1)
+            return found[1], found[2]
+        stats.miss(tried)
+        return None, {}
+
+    def segment_trie(self):
+        """Returns the segment trie, it is built on first use."""
+        trie = self.trie
+        if trie is None:
+            trie = self.trie = SegmentTrie()
+            for segments, record in self.records:
+                trie.insert(segments, record)
+        return trie
+
+
+def join_records(index, split, records):
+    """Joins the intermediate route variants with records of
+    a nested router. Returns ``None`` if any of the joined patterns
+    can not be represented by segments.
+    """
+    exact, variants = split
+    result = []
+    for prefix, defaults, names, converters in variants:
+        for segments, (key, handler, levels) in records:
+            segments = join_segments(prefix, segments)
+            if segments is None:
+                return None
+            if exact and key[0] < 0:
+                key = (-1,)
+            else:
+                key = (index,) + key
+            levels = ((defaults, names, converters),) + levels
+            result.append((segments, (key, handler, levels)))
+    return result
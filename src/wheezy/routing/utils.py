@@ -73,25 +73,23 @@ def outer_split(expression, sep="()"):
     """
     assert 2 == len(sep)
     start_sep, end_sep = sep
+    if start_sep not in expression and end_sep not in expression:
+        return [expression]
     start_count = end_count = 0
+    start = 0
     parts = []
-    part = ""
-    for token in expression:
+    for i, token in enumerate(expression):
         if token == start_sep:
             if start_count == end_count:
-                parts.append(part)
-                part = ""
-                start_count += 1
-                continue
+                parts.append(expression[start:i])
+                start = i + 1
             start_count += 1
         elif token == end_sep:
             end_count += 1
             if start_count == end_count:
-                parts.append(part)
-                part = ""
-                continue
-        part += token
+                parts.append(expression[start:i])
+                start = i + 1
     if start_count != end_count:
         raise ValueError("Expression is not balanced")
-    parts.append(part)
+    parts.append(expression[start:])
     return parts